@@ -0,0 +1,259 @@
+"""
+Benchmark de rendimiento de AutoOmegaBot
+========================================
+
+Ejecuta el bot completo contra la plataforma simulada (Benchmark/mock_server.py)
+con varios niveles de concurrencia y reporta por nivel:
+
+- URLs/min
+- Latencia por URL p50 / p95 / p99 (primera carga de página -> resultado de la API)
+- Memoria residente pico (proceso + navegadores hijos)
+
+Así cualquier cambio de rendimiento se puede verificar sin tocar la
+plataforma real. Cada ejecución parte de la configuración por defecto (no
+del config.json del usuario) con BENCHMARK_CONFIG encima: caché, limitador,
+sesión, histórico, tiempos por fase y análisis desactivados y una sola
+ventana de fechas, para medir solo el trabajo por URL. Las carpetas de
+datos (Cache, Logs, Results...) se redirigen a un directorio temporal, de
+modo que el benchmark no escribe en Documents.
+
+Uso:
+    python -m Benchmark.benchmark --urls 200 --levels 1,4,8,16 --latency-ms 300
+"""
+
+import argparse
+import csv
+import json
+import os
+import tempfile
+import threading
+import time
+
+from Benchmark.mock_server import MockBacktestServer
+from Bot.step_timing import percentile
+
+# Ajustes de config.json aplicados en cada ejecución del benchmark
+BENCHMARK_CONFIG = {
+    'cache_enabled': False,
+    'rate_limit_enabled': False,
+    'session_enabled': False,
+    'results_store_enabled': False,
+    'phase_timing_enabled': False,
+    'analytics_enabled': False,
+    'distributed_enabled': False,
+    'schedule_policy': 'fifo',
+    'sweep': {},
+    'date_windows': ['ytd'],
+}
+
+
+def default_config(work_dir):
+    """Configuración por defecto, sin leer el config.json del usuario"""
+    from Utiles.utils import load_config
+
+    return load_config(os.path.join(work_dir, 'config.json'))
+
+
+class PeakMemorySampler:
+    """
+    Muestrea en segundo plano la memoria residente del proceso y sus hijos
+
+    Usa psutil si está instalado (suma el RSS de todo el árbol de procesos,
+    navegadores incluidos). Sin psutil se recurre a resource.getrusage, que
+    solo da el pico del proceso principal y el del mayor hijo terminado.
+
+    Args:
+        interval (float): Segundos entre muestras
+    """
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._process = None
+
+    def sample(self):
+        if self._process is None:
+            return 0
+        total = 0
+        try:
+            processes = [self._process] + self._process.children(recursive=True)
+        except Exception:
+            return 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except Exception:
+                # El proceso terminó entre el listado y la lectura
+                continue
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_bytes = max(self.peak_bytes, self.sample())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        if self._process is None:
+            self.peak_bytes = _rusage_peak_bytes()
+        return False
+
+
+def _rusage_peak_bytes():
+    import resource
+    import sys
+
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def write_links_file(path, urls):
+    """Crear un archivo de links CSV con encabezado, como el que lee el bot"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['url'])
+        for url in urls:
+            writer.writerow([url])
+
+
+def run_level(server, links_file, output_dir, concurrency, workers=1, base_config=None):
+    """
+    Ejecutar el bot completo con un nivel de concurrencia
+
+    Returns:
+        dict: Métricas del nivel
+    """
+    from Bot.bot import AutoOmegaBot
+
+    config = dict(base_config if base_config is not None else default_config(output_dir))
+    config.update(BENCHMARK_CONFIG)
+    config['concurrency'] = concurrency
+    config['workers'] = workers
+
+    output_file = os.path.join(output_dir, f"bench_c{concurrency}_w{workers}.csv")
+    server.reset_stats()
+    bot = AutoOmegaBot(links_file, output_file, previous_year=None, config=config)
+
+    with PeakMemorySampler() as memory:
+        start = time.perf_counter()
+        bot.execute()
+        elapsed = time.perf_counter() - start
+
+    latencies = server.get_url_latencies()
+    server_stats = server.get_stats()
+    completed = server_stats['completed']
+
+    def ms(pct):
+        value = percentile(latencies, pct)
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        'concurrency': concurrency,
+        'workers': workers,
+        'urls': bot.processed_count,
+        'completed': completed,
+        'errors': bot.processed_count - completed,
+        'elapsed_s': round(elapsed, 2),
+        'urls_per_min': round(bot.processed_count / elapsed * 60, 1) if elapsed else 0.0,
+        'p50_ms': ms(50),
+        'p95_ms': ms(95),
+        'p99_ms': ms(99),
+        'peak_rss_mb': round(memory.peak_bytes / (1024 * 1024), 1),
+        'page_errors_injected': server_stats['page_errors'],
+        'api_errors_injected': server_stats['api_errors'],
+    }
+
+
+def format_report(rows):
+    """
+    Tabla de resultados del benchmark
+
+    Args:
+        rows (list): Resultados de run_level()
+
+    Returns:
+        str: Tabla en texto
+    """
+    header = (f"{'conc':>5} {'work':>5} {'urls':>6} {'err':>5} {'URLs/min':>9} "
+              f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS MB':>8}")
+    lines = ["📊 Benchmark de AutoOmegaBot", header, '-' * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['concurrency']:>5} {row['workers']:>5} {row['urls']:>6} {row['errors']:>5} "
+            f"{row['urls_per_min']:>9} {str(row['p50_ms']):>9} {str(row['p95_ms']):>9} "
+            f"{str(row['p99_ms']):>9} {row['peak_rss_mb']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de AutoOmegaBot contra la plataforma simulada")
+    parser.add_argument('--urls', type=int, default=100, help="URLs por nivel")
+    parser.add_argument('--levels', default='1,4,8', help="Niveles de concurrencia, separados por comas")
+    parser.add_argument('--workers', type=int, default=1, help="Procesos trabajadores")
+    parser.add_argument('--latency-ms', type=float, default=200)
+    parser.add_argument('--jitter-ms', type=float, default=50)
+    parser.add_argument('--page-latency-ms', type=float, default=0)
+    parser.add_argument('--page-error-rate', type=float, default=0.0)
+    parser.add_argument('--api-error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', dest='json_path', help="Guardar los resultados en un archivo JSON")
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.levels.split(',') if level.strip()]
+
+    from Utiles.utils import DATA_DIR_ENV
+
+    previous_data_dir = os.environ.get(DATA_DIR_ENV)
+    with tempfile.TemporaryDirectory(prefix='omegabot_bench_') as work_dir:
+        # Caché, latencias, logs e histórico en el temporal (también en los procesos hijos)
+        os.environ[DATA_DIR_ENV] = os.path.join(work_dir, 'data')
+        try:
+            rows = _run_levels(args, levels, work_dir)
+        finally:
+            if previous_data_dir is None:
+                os.environ.pop(DATA_DIR_ENV, None)
+            else:
+                os.environ[DATA_DIR_ENV] = previous_data_dir
+
+    print(format_report(rows))
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+        print(f"💾 Resultados guardados en {args.json_path}")
+    return rows
+
+
+def _run_levels(args, levels, work_dir):
+    rows = []
+    with MockBacktestServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                            page_latency_ms=args.page_latency_ms,
+                            page_error_rate=args.page_error_rate,
+                            api_error_rate=args.api_error_rate,
+                            seed=args.seed) as server:
+        for concurrency in levels:
+            # Ids distintos por nivel: ninguna ejecución reutiliza la anterior
+            links_file = os.path.join(work_dir, f"links_c{concurrency}.csv")
+            write_links_file(links_file, [server.url_for(f"c{concurrency}-{i}")
+                                          for i in range(args.urls)])
+            print(f"▶️ Nivel de concurrencia {concurrency} ({args.urls} URLs)")
+            rows.append(run_level(server, links_file, work_dir, concurrency, args.workers))
+    return rows
+
+
+if __name__ == '__main__':
+    main()
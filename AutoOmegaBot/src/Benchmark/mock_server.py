@@ -0,0 +1,359 @@
+"""
+Plataforma de backtest simulada
+===============================
+
+Servidor HTTP local que reproduce el flujo de página que recorre el bot:
+botón "New Backtest", botón YTD, campos de entrada, botón "Run" y elemento de
+resultado. Los elementos se generan a partir de SELECTORS y PARAM_SELECTORS
+de Bot/bot.py, así que el bot funciona contra él sin cambios.
+
+"Run" llama por fetch a /api/backtest/run, de modo que tanto la extracción
+por red como la lectura del DOM funcionan igual que en la plataforma real.
+
+Inyección de latencia y errores:
+    latency_ms / jitter_ms: espera de la API de backtest (uniforme ± jitter)
+    page_latency_ms: espera al servir la página
+    page_error_rate: proporción de cargas de página que responden HTTP 503
+    api_error_rate: proporción de llamadas a la API que responden HTTP 500
+
+Uso independiente:
+    python -m Benchmark.mock_server --port 8765 --latency-ms 300 --page-error-rate 0.05
+"""
+
+import argparse
+import html
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from Bot.bot import PARAM_SELECTORS, SELECTORS
+
+_BACKTEST_PATH = re.compile(r'^/backtest/([^/?#]+)')
+
+
+def _element(selector, text='', attributes=''):
+    """
+    Elemento HTML que coincide con un selector simple (#id, .clase o etiqueta)
+
+    Los selectores de ejemplo del bot son nombres de etiqueta
+    ("selector_del_boton_run"), que se generan como elementos personalizados.
+    """
+    if selector.startswith('#'):
+        return f'<button id="{selector[1:]}" {attributes}>{text}</button>'
+    if selector.startswith('.'):
+        return f'<button class="{selector[1:]}" {attributes}>{text}</button>'
+    return f'<{selector} {attributes}>{text}</{selector}>'
+
+
+def _input_element(selector):
+    # Editable: page.fill() acepta elementos contenteditable
+    style = 'style="display:inline-block;min-width:4em;border:1px solid #999"'
+    if selector.startswith('#'):
+        return f'<input id="{selector[1:]}">'
+    if selector.startswith('.'):
+        return f'<input class="{selector[1:]}">'
+    return f'<{selector} contenteditable="true" {style}>0</{selector}>'
+
+
+def _checkbox_element(selector):
+    # role=checkbox + aria-checked: page.set_checked() funciona con ellos
+    return _element(selector, 'check', 'role="checkbox" aria-checked="false" '
+                                       'onclick="toggleCheck(this)"')
+
+
+def render_backtest_page(backtest_id):
+    """
+    HTML de la página de un backtest
+
+    Args:
+        backtest_id (str): Identificador tomado de la URL
+
+    Returns:
+        str: Documento HTML
+    """
+    params = []
+    for field, selector in PARAM_SELECTORS.items():
+        if '_check_' in selector:
+            params.append(f'<label>{field} {_checkbox_element(selector)}</label>')
+        else:
+            params.append(f'<label>{field} {_input_element(selector)}</label>')
+
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Backtest {html.escape(backtest_id)}</title></head>
+<body>
+<h1>Backtest {html.escape(backtest_id)}</h1>
+{_element(SELECTORS['new_backtest_button'], 'New Backtest', 'onclick="showForm()"')}
+<div id="form" style="display:none">
+  {_element(SELECTORS['ytd_button'], 'YTD')}
+  <label>desde {_input_element(SELECTORS['start_date_input'])}</label>
+  <label>hasta {_input_element(SELECTORS['end_date_input'])}</label>
+  <label>valor {_input_element(SELECTORS['input'])}</label>
+  {''.join(params)}
+  {_element(SELECTORS['run_button'], 'Run', 'onclick="runBacktest()"')}
+</div>
+<div id="output"></div>
+<script>
+function showForm() {{
+  document.getElementById('form').style.display = 'block';
+}}
+function currentWindow() {{
+  const start = document.querySelector({json.dumps(SELECTORS['start_date_input'])});
+  const end = document.querySelector({json.dumps(SELECTORS['end_date_input'])});
+  const value = (element) => element ? (element.value || element.innerText || '') : '';
+  return value(start) + '-' + value(end);
+}}
+function toggleCheck(element) {{
+  const checked = element.getAttribute('aria-checked') === 'true';
+  element.setAttribute('aria-checked', checked ? 'false' : 'true');
+}}
+async function runBacktest() {{
+  const response = await fetch('/api/backtest/run', {{
+    method: 'POST',
+    headers: {{'Content-Type': 'application/json'}},
+    body: JSON.stringify({{id: {json.dumps(backtest_id)}, window: currentWindow()}})
+  }});
+  if (!response.ok) return;
+  const data = await response.json();
+  const output = document.getElementById('output');
+  output.innerHTML = {json.dumps(_element(SELECTORS['result'], '', 'id="result"'))};
+  document.getElementById('result').textContent =
+    'P/L: ' + data.profitLoss + ' | Win rate: ' + data.winRate +
+    ' | Max DD: ' + data.maxDrawdown + ' | Sharpe: ' + data.sharpe;
+}}
+</script>
+</body>
+</html>"""
+
+
+class MockBacktestServer:
+    """
+    Servidor de backtest simulado en un hilo de fondo
+
+    Registra por cada backtest el primer acceso a su página y la última
+    respuesta correcta de su API; la diferencia es la latencia por URL que
+    observa el bot (reintentos incluidos).
+
+    Args:
+        host (str): Interfaz de escucha
+        port (int): Puerto (0 = uno libre)
+        latency_ms (float): Latencia media de la API de backtest
+        jitter_ms (float): Variación uniforme de la latencia
+        page_latency_ms (float): Latencia al servir la página
+        page_error_rate (float): Proporción de páginas que responden 503
+        api_error_rate (float): Proporción de llamadas a la API que responden 500
+        seed (int, optional): Semilla para reproducir la inyección de errores
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=200, jitter_ms=50,
+                 page_latency_ms=0, page_error_rate=0.0, api_error_rate=0.0, seed=None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.page_latency_ms = page_latency_ms
+        self.page_error_rate = page_error_rate
+        self.api_error_rate = api_error_rate
+        self._random = random.Random(seed)
+
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    # -------------------------------------------------------------------------
+    # Ciclo de vida
+    # -------------------------------------------------------------------------
+
+    def start(self):
+        mock = self
+
+        class Handler(_MockHandler):
+            server_mock = mock
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def url_for(self, backtest_id):
+        return f"{self.base_url}/backtest/{backtest_id}"
+
+    # -------------------------------------------------------------------------
+    # Inyección y registro
+    # -------------------------------------------------------------------------
+
+    def _chance(self, rate):
+        with self._lock:
+            return self._random.random() < rate
+
+    def _api_delay(self):
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def reset_stats(self):
+        with self._lock:
+            self.page_hits = 0
+            self.api_hits = 0
+            self.page_errors = 0
+            self.api_errors = 0
+            self._first_seen = {}
+            self._completed = {}
+
+    def record_page(self, backtest_id, failed):
+        with self._lock:
+            self.page_hits += 1
+            self.page_errors += int(failed)
+            self._first_seen.setdefault(backtest_id, time.perf_counter())
+
+    def record_api(self, backtest_id, failed):
+        with self._lock:
+            self.api_hits += 1
+            self.api_errors += int(failed)
+            if not failed:
+                self._completed[backtest_id] = time.perf_counter()
+
+    def get_url_latencies(self):
+        """
+        Latencia (s) de cada backtest completado desde su primera carga
+
+        Returns:
+            list: Segundos por backtest completado
+        """
+        with self._lock:
+            return [done - self._first_seen[backtest_id]
+                    for backtest_id, done in self._completed.items()
+                    if backtest_id in self._first_seen]
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'page_hits': self.page_hits,
+                'api_hits': self.api_hits,
+                'page_errors': self.page_errors,
+                'api_errors': self.api_errors,
+                'completed': len(self._completed),
+            }
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    server_mock = None
+
+    def log_message(self, format, *args):
+        # Sin una línea por petición: el benchmark genera miles
+        pass
+
+    def do_GET(self):
+        mock = self.server_mock
+        match = _BACKTEST_PATH.match(urlsplit(self.path).path)
+        if not match:
+            self._send(404, 'text/plain', b'not found')
+            return
+
+        backtest_id = match.group(1)
+        if mock.page_latency_ms:
+            time.sleep(mock.page_latency_ms / 1000.0)
+        failed = mock._chance(mock.page_error_rate)
+        mock.record_page(backtest_id, failed)
+        if failed:
+            self._send(503, 'text/plain', b'service unavailable')
+            return
+        self._send(200, 'text/html; charset=utf-8',
+                   render_backtest_page(backtest_id).encode('utf-8'))
+
+    def do_POST(self):
+        mock = self.server_mock
+        if urlsplit(self.path).path != '/api/backtest/run':
+            self._send(404, 'text/plain', b'not found')
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            body = {}
+        backtest_id = str(body.get('id', ''))
+
+        time.sleep(mock._api_delay())
+        failed = mock._chance(mock.api_error_rate)
+        mock.record_api(backtest_id, failed)
+        if failed:
+            self._send(500, 'application/json', b'{"error": "backtest failed"}')
+            return
+
+        # Resultado determinista por id y ventana: ejecuciones repetidas dan lo mismo
+        rng = random.Random(f"{backtest_id}|{body.get('window', '')}")
+        payload = {
+            'id': backtest_id,
+            'profitLoss': round(rng.uniform(-5000, 15000), 2),
+            'winRate': f"{rng.uniform(30, 80):.1f}%",
+            'maxDrawdown': round(rng.uniform(500, 8000), 2),
+            'sharpe': round(rng.uniform(-1, 3), 2),
+        }
+        self._send(200, 'application/json', json.dumps(payload).encode('utf-8'))
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plataforma de backtest simulada")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=200)
+    parser.add_argument('--jitter-ms', type=float, default=50)
+    parser.add_argument('--page-latency-ms', type=float, default=0)
+    parser.add_argument('--page-error-rate', type=float, default=0.0)
+    parser.add_argument('--api-error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = MockBacktestServer(
+        host=args.host, port=args.port, latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, page_latency_ms=args.page_latency_ms,
+        page_error_rate=args.page_error_rate, api_error_rate=args.api_error_rate,
+        seed=args.seed,
+    ).start()
+    print(f"🧪 Plataforma simulada en {server.url_for('<id>')} (Ctrl+C para salir)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Análisis de resultados al terminar el lote
+==========================================
+
+Toma las métricas de todos los resultados ya convertidas a float64 al
+escribir cada uno (ResultColumns en Bot/result_records.py) y calcula de una
+pasada vectorizada, para todas las URLs a la vez:
+
+- z-score y percentil de cada métrica
+- puesto (1 = mejor) de cada métrica
+- puntuación compuesta: media de los z-scores ponderada por
+  analytics_weights, sobre las métricas disponibles de cada fila
+- resúmenes por grupo (estrategia, ticker, combinación del barrido)
+
+Orientación: más es mejor salvo en max_drawdown, donde se compara la
+magnitud de la caída (menor es mejor) sea cual sea su signo.
+Las métricas ausentes (errores, resultados sin dato) son NaN: no cuentan
+en medias ni desviaciones y quedan al final de los rankings. Los valores
+empatados comparten puesto (el mejor de ellos, como en 1, 1, 3), de modo
+que puestos y percentiles no dependen del orden de entrada.
+"""
+
+import numpy as np
+
+from Bot.network_extractor import METRIC_NAMES
+
+DEFAULT_WEIGHTS = {
+    'sharpe_ratio': 0.4,
+    'profit_loss': 0.3,
+    'win_rate': 0.2,
+    'max_drawdown': 0.1,
+}
+
+
+def load_metrics(records, window=0):
+    """
+    Métricas de una ventana de fechas como matriz (n_resultados × n_métricas)
+
+    Args:
+        records (list): ResultRecord de los resultados escritos
+        window (int): Posición de la ventana en record.windows
+
+    Returns:
+        np.ndarray: float64 con NaN donde no hay dato; columnas en el orden de METRIC_NAMES
+    """
+    empty = (None,) * len(METRIC_NAMES)
+    rows = [record.windows[window].as_tuple() if window < len(record.windows) else empty
+            for record in records]
+    # Con dtype float, NumPy convierte los None en NaN
+    return np.array(rows, dtype=np.float64).reshape(len(records), len(METRIC_NAMES))
+
+
+def orient(values):
+    """Matriz en la que mayor siempre es mejor (drawdown por magnitud)"""
+    oriented = values.copy()
+    column = METRIC_NAMES.index('max_drawdown')
+    oriented[:, column] = -np.abs(oriented[:, column])
+    return oriented
+
+
+def rank_columns(scores):
+    """
+    Puesto de cada fila por columna (1 = mejor; empates con el mismo puesto; NaN al final)
+
+    Returns:
+        np.ndarray: int64 con la misma forma que `scores`
+    """
+    # +inf para los NaN: ordenados de menor a mayor (negados) quedan los últimos
+    keyed = np.where(np.isnan(scores), np.inf, -scores)
+    ranks = np.empty(scores.shape, dtype=np.int64)
+    positions = np.arange(scores.shape[0])
+    for column in range(scores.shape[1]):
+        # Puesto = filas estrictamente mejores + 1, igual para todos los
+        # empatados: la posición donde empieza su tramo en el orden
+        order = np.argsort(keyed[:, column], kind='stable')
+        ordered = keyed[order, column]
+        starts = np.r_[True, ordered[1:] != ordered[:-1]]
+        ranks[order, column] = np.maximum.accumulate(np.where(starts, positions, 0)) + 1
+    return ranks
+
+
+def compute_scores(values, weights=None):
+    """
+    z-scores, percentiles, puestos y puntuación compuesta
+
+    Args:
+        values (np.ndarray): Matriz de load_metrics()
+        weights (dict, optional): Peso de cada métrica en la puntuación compuesta
+
+    Returns:
+        dict: Arrays 'z', 'percentile', 'rank' (n × métricas), 'composite' y
+            'composite_rank' (n)
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    scores = orient(values)
+    valid = ~np.isnan(scores)
+    n_valid = valid.sum(axis=0)
+
+    # Media y desviación solo sobre las filas con dato
+    seen = np.maximum(n_valid, 1)
+    mean = np.where(valid, scores, 0.0).sum(axis=0) / seen
+    deviation = np.where(valid, scores - mean, 0.0)
+    std = np.sqrt((deviation ** 2).sum(axis=0) / seen)
+    z = np.where(valid & (std > 0), deviation / np.where(std > 0, std, 1.0), 0.0)
+    z[~valid] = np.nan
+
+    ranks = rank_columns(scores)
+    # Percentil: 100 el mejor, 0 el peor, sobre las filas con dato; los
+    # empatados comparten el del mejor puesto del empate
+    percentile = np.where(n_valid > 1, (n_valid - ranks) / np.maximum(n_valid - 1, 1) * 100.0, 100.0)
+    percentile[~valid] = np.nan
+
+    weight_row = np.array([float(weights.get(name, 0.0)) for name in METRIC_NAMES])
+    used = np.where(valid, weight_row, 0.0)
+    total_weight = used.sum(axis=1)
+    weighted = (np.nan_to_num(z) * used).sum(axis=1)
+    composite = np.where(total_weight > 0, weighted / np.maximum(total_weight, 1e-12), np.nan)
+    composite_rank = rank_columns(composite[:, None])[:, 0]
+
+    return {
+        'z': z,
+        'percentile': percentile,
+        'rank': ranks,
+        'composite': composite,
+        'composite_rank': composite_rank,
+    }
+
+
+def group_summary(labels, values, composite):
+    """
+    Resumen por grupo, agregado con bincount (sin bucles por fila)
+
+    Args:
+        labels (list): Etiqueta de grupo de cada fila
+        values (np.ndarray): Matriz de load_metrics()
+        composite (np.ndarray): Puntuación compuesta de cada fila
+
+    Returns:
+        list: Diccionarios por grupo (de mejor a peor puntuación media) con
+            count, with_data, mean_<métrica>, best_sharpe_ratio y mean_composite
+    """
+    if not len(labels):
+        return []
+    groups, inverse = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    size = len(groups)
+    counts = np.bincount(inverse, minlength=size)
+    summary = {'count': counts}
+
+    def nan_mean(column):
+        present = ~np.isnan(column)
+        total = np.bincount(inverse, weights=np.where(present, column, 0.0), minlength=size)
+        seen = np.bincount(inverse, weights=present, minlength=size)
+        return np.where(seen > 0, total / np.maximum(seen, 1), np.nan), seen
+
+    mean_composite, with_data = nan_mean(composite)
+    summary['with_data'] = with_data.astype(np.int64)
+    for position, name in enumerate(METRIC_NAMES):
+        summary[f"mean_{name}"] = nan_mean(values[:, position])[0]
+
+    # Máximo por grupo: ordenar por grupo y reducir por tramos
+    sharpe = values[:, METRIC_NAMES.index('sharpe_ratio')]
+    order = np.argsort(inverse, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(inverse[order]) != 0])
+    keyed = np.where(np.isnan(sharpe[order]), -np.inf, sharpe[order])
+    best = np.maximum.reduceat(keyed, starts)
+    summary['best_sharpe_ratio'] = np.where(np.isinf(best), np.nan, best)
+    summary['mean_composite'] = mean_composite
+
+    keyed_composite = np.where(np.isnan(summary['mean_composite']), -np.inf, summary['mean_composite'])
+    rows = []
+    for position in np.argsort(-keyed_composite, kind='stable'):
+        row = {'group': str(groups[position])}
+        for key, column in summary.items():
+            value = column[position].item()
+            row[key] = None if isinstance(value, float) and value != value else value
+        rows.append(row)
+    return rows
+
+
+def _cell(value):
+    # NaN no es válido en Excel ni útil en CSV
+    return None if value is None or (isinstance(value, float) and value != value) else value
+
+
+def build_sheets(columns, window_names, groups=None, weights=None):
+    """
+    Hojas de análisis para el archivo de resultados
+
+    Args:
+        columns (ResultColumns): Resultados escritos, en columnas
+        window_names (list): Ventanas de fechas; se analiza la primera
+        groups (dict, optional): Título de hoja -> etiqueta de grupo por fila
+        weights (dict, optional): Pesos de la puntuación compuesta
+
+    Returns:
+        list: Tuplas (nombre_de_hoja, columnas, valores por columna) para
+            ResultWriter.close(); las columnas numéricas van como arrays de NumPy
+    """
+    values = columns.values()
+    scores = compute_scores(values, weights)
+    window = window_names[0] if window_names else ''
+
+    names = (['rank', 'composite_score', 'url', 'sweep_key', 'status'] + list(METRIC_NAMES)
+             + [f"z_{name}" for name in METRIC_NAMES]
+             + [f"pct_{name}" for name in METRIC_NAMES])
+    # Empates de puntuación en el orden de escritura (el del archivo de
+    # links), no en el de llegada: orden estable sobre claves numéricas
+    order = np.argsort(scores['composite_rank'], kind='stable')
+
+    def labels(items):
+        return np.asarray(items, dtype=object)[order]
+
+    ranking = ([scores['composite_rank'][order], np.round(scores['composite'][order], 4),
+                labels(columns.urls), labels(columns.sweep_keys), labels(columns.statuses)]
+               + list(values[order].T)
+               + list(np.round(scores['z'][order], 4).T)
+               + list(np.round(scores['percentile'][order], 2).T))
+    sheets = [(f"Ranking {window}".strip(), names, ranking)]
+
+    group_columns = (['group', 'count', 'with_data'] + [f"mean_{name}" for name in METRIC_NAMES]
+                     + ['best_sharpe_ratio', 'mean_composite'])
+    for title, group_labels in (groups or {}).items():
+        rows = group_summary(group_labels, values, scores['composite'])
+        sheets.append((title, group_columns,
+                       [[_cell(row[column]) for row in rows] for column in group_columns]))
+    return sheets
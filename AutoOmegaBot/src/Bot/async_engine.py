@@ -0,0 +1,270 @@
+"""
+Motor asíncrono de backtests para AutoOmegaBot
+==============================================
+
+Ejecuta varios backtests en paralelo sobre playwright.async_api con un
+límite de concurrencia. Mientras una página espera al servidor remoto las
+demás siguen avanzando, de modo que el tiempo total deja de ser la suma de
+las esperas individuales.
+
+Los resultados se devuelven en el mismo orden que las URLs de entrada y un
+fallo en una URL se registra en su propio resultado sin cancelar al resto.
+La E/S de disco (caché, journal, escritor de resultados) se hace en el hilo
+de E/S del bot (bot.run_io) para no detener el event loop.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class AsyncBrowserPool:
+    """
+    Versión asíncrona de BrowserPool (ver Bot/browser_pool.py).
+
+    Varias páginas pueden estar abiertas a la vez en el mismo contexto. Al
+    reciclar, el contexto anterior queda retirado y se cierra cuando su
+    última página se libera.
+
+    Args:
+        headless (bool): Lanzar Chromium sin ventana
+        pages_per_context (int): Páginas servidas antes de reciclar el contexto
+        max_memory_mb (float, optional): Heap JS (MB) a partir del cual se recicla
+        launch_options (dict, optional): Opciones extra para chromium.launch()
+        context_options (dict, optional): Opciones extra para browser.new_context()
+        on_context (callable, optional): Llamada con cada contexto nuevo antes de
+            entregar páginas (p.ej. para instalar rutas de red); debe ser async.
+            Si falla, el contexto se cierra y no se usa
+    """
+
+    def __init__(self, headless=True, pages_per_context=1, max_memory_mb=None,
+                 launch_options=None, context_options=None, on_context=None):
+        self.headless = headless
+        self.pages_per_context = max(1, int(pages_per_context or 1))
+        self.max_memory_mb = max_memory_mb
+        self.launch_options = launch_options or {}
+        self.context_options = context_options or {}
+        self.on_context = on_context
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._context_pages = 0
+        self._recycle_pending = False
+        # Páginas abiertas por contexto, para cerrar contextos retirados a tiempo
+        self._open_pages = {}
+        self._retired = set()
+        self._lock = asyncio.Lock()
+
+        self.launches = 0
+        self.contexts_created = 0
+        self.context_recycles = 0
+        self.pages_served = 0
+
+    async def start(self):
+        """Iniciar Playwright y lanzar el navegador"""
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        if self._browser is None or not self._browser.is_connected():
+            await self._launch_browser()
+        return self
+
+    async def stop(self):
+        """Cerrar todos los contextos, el navegador y Playwright"""
+        for context in list(self._open_pages):
+            await self._close_context(context)
+        self._context = None
+        try:
+            if self._browser is not None:
+                await self._browser.close()
+        except Exception as e:
+            print(f"Error cerrando navegador: {e}")
+        self._browser = None
+        try:
+            if self._playwright is not None:
+                await self._playwright.stop()
+        except Exception as e:
+            print(f"Error deteniendo Playwright: {e}")
+        self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop()
+        return False
+
+    async def acquire_page(self):
+        """
+        Obtener una página nueva desde el contexto activo
+
+        Returns:
+            Page: Página asíncrona de Playwright
+        """
+        async with self._lock:
+            await self.start()
+            if (self._context is None or self._recycle_pending
+                    or self._context_pages >= self.pages_per_context):
+                await self._new_context()
+            context = self._context
+            self._context_pages += 1
+            self._open_pages[context] += 1
+            self.pages_served += 1
+
+        try:
+            return await context.new_page()
+        except Exception:
+            await self._page_done(context)
+            raise
+
+    async def release_page(self, page):
+        """Cerrar la página y cerrar su contexto si ya fue retirado"""
+        context = page.context
+        try:
+            if self.max_memory_mb and await self._page_memory_mb(page) >= self.max_memory_mb:
+                if context is self._context:
+                    self._recycle_pending = True
+        except Exception:
+            pass
+
+        try:
+            await page.close()
+        except Exception:
+            if context is self._context:
+                self._recycle_pending = True
+
+        await self._page_done(context)
+
+    @asynccontextmanager
+    async def page(self):
+        """Context manager asíncrono que adquiere y libera una página"""
+        page = await self.acquire_page()
+        try:
+            yield page
+        finally:
+            await self.release_page(page)
+
+    def get_stats(self):
+        """Métricas de uso del pool (mismo formato que BrowserPool)"""
+        served = self.pages_served
+        return {
+            'launches': self.launches,
+            'contexts_created': self.contexts_created,
+            'context_recycles': self.context_recycles,
+            'pages_served': served,
+            'browser_reuse_rate': (1 - self.launches / served) if served else 0.0,
+            'context_reuse_rate': (1 - self.contexts_created / served) if served else 0.0,
+        }
+
+    async def _launch_browser(self):
+        self._browser = await self._playwright.chromium.launch(
+            headless=self.headless, **self.launch_options
+        )
+        self.launches += 1
+
+    async def _new_context(self):
+        old = self._context
+        if old is not None:
+            self.context_recycles += 1
+            self._retired.add(old)
+            self._context = None
+            if self._open_pages.get(old, 0) == 0:
+                await self._close_context(old)
+
+        if not self._browser.is_connected():
+            await self._launch_browser()
+        context = await self._browser.new_context(**self.context_options)
+        if self.on_context is not None:
+            try:
+                await self.on_context(context)
+            except Exception:
+                # Solo se registra un contexto ya preparado: el siguiente
+                # acquire_page() vuelve a intentarlo con uno nuevo
+                await self._close_context(context)
+                raise
+        self._context = context
+        self._open_pages[context] = 0
+        self._context_pages = 0
+        self._recycle_pending = False
+        self.contexts_created += 1
+
+    async def _page_done(self, context):
+        async with self._lock:
+            if context in self._open_pages:
+                self._open_pages[context] -= 1
+                if context in self._retired and self._open_pages[context] <= 0:
+                    await self._close_context(context)
+
+    async def _close_context(self, context):
+        self._open_pages.pop(context, None)
+        self._retired.discard(context)
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    async def _page_memory_mb(page):
+        used = await page.evaluate(
+            "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+        )
+        return (used or 0) / (1024 * 1024)
+
+
+async def run_backtests_async(bot, jobs, concurrency, on_result=None):
+    """
+    Ejecutar los backtests de `jobs` con como máximo `concurrency` en vuelo
+
+    Los trabajos se consumen de forma perezosa: solo se toma el siguiente
+    cuando queda un hueco libre, por lo que `jobs` puede ser un generador que
+    aún está leyendo el archivo de links.
+
+    Args:
+        bot (AutoOmegaBot): Bot que define el flujo por página
+        jobs (iterable): Tuplas (índice, url, parámetros) a procesar (lista o
+            generador); parámetros es None fuera de un barrido
+        concurrency (int): Número máximo de páginas simultáneas
+        on_result (callable, optional): Llamada con (índice, resultado) en
+            cuanto termina cada URL, para procesar resultados en streaming;
+            se ejecuta en el hilo de E/S del bot, una llamada tras otra
+
+    Returns:
+        tuple: (resultados en el orden de entrada, estadísticas del pool y del bot).
+            Con `on_result` los resultados no se retienen y la lista va vacía.
+    """
+    concurrency = max(1, int(concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {}
+    tasks = set()
+
+    try:
+        async with bot.create_async_pool() as pool:
+
+            async def worker(index, url, params):
+                try:
+                    try:
+                        record = await bot.run_backtest_async(pool, url, params)
+                    except Exception as e:
+                        # El error queda en su resultado; el resto sigue ejecutándose
+                        record = bot.make_result(url, error=e, params=params)
+                    if on_result is not None:
+                        await bot.run_io(on_result, index, record)
+                    else:
+                        results[index] = record
+                finally:
+                    semaphore.release()
+
+            for index, url, params in jobs:
+                await semaphore.acquire()
+                task = asyncio.create_task(worker(index, url, params))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+            stats = dict(pool.get_stats(), **bot.get_engine_stats())
+    finally:
+        # Espera a las escrituras pendientes antes de cerrar el journal
+        bot.close_io()
+
+    return [results[index] for index in sorted(results)], stats
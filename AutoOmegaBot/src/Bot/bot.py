@@ -1,53 +1,1063 @@
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
+
+from Bot.browser_pool import BrowserPool, format_pool_stats
+from Bot.checkpoint import CheckpointJournal, journal_path_for
+from Bot.date_windows import build_date_windows, window_columns
+from Bot.network_extractor import METRIC_NAMES, NetworkResultExtractor
+from Bot.phase_timing import PhaseTimer, PhaseTimingRecorder
+from Bot.rate_limiter import RateLimiter
+from Bot.resource_filter import ResourceFilter, format_filter_stats
+from Bot.result_cache import ResultCache, make_cache_key
+from Bot.result_records import ResultColumns, parse_result_text
+from Bot.result_writer import RESULT_COLUMNS, ResultWriter, sheet_rows
+from Bot.results_store import ResultsStore
+from Bot.retry import (
+    BacktestHTTPError,
+    CircuitBreaker,
+    RetryPolicy,
+    classify_error,
+    host_of,
+)
+from Bot.scheduler import LatencyHistory, Scheduler
+from Bot.session import SessionManager
+from Bot.step_timing import AdaptiveTimeouts, format_step_stats
+from Bot.sweep import expand_grid, format_sweep_progress, job_key, sweep_key
+from Bot.url_reader import iter_link_rows, iter_urls, link_columns
+from Utiles.utils import (
+    compute_config_hash,
+    format_execution_summary,
+    get_backtest_params,
+    get_cache_folder,
+    get_config_folder,
+    get_current_timestamp,
+    get_logs_folder,
+    get_results_folder,
+    load_config,
+)
+
+
+# Selectores de la plataforma de backtest
+SELECTORS = {
+    'new_backtest_button': '#newBacktestBtn',
+    'ytd_button': 'selector_del_boton_ytd',
+    'input': 'selector_del_input',
+    'run_button': 'selector_del_boton_run',
+    'result': 'selector_del_resultado',
+    'start_date_input': 'selector_del_input_fecha_inicio',
+    'end_date_input': 'selector_del_input_fecha_fin',
+}
+
+# Espera a que el texto del resultado cambie respecto al de la ventana anterior
+RESULT_CHANGED_SCRIPT = '''([selector, previous]) => {
+    const element = document.querySelector(selector);
+    return element !== null && element.innerText !== previous;
+}'''
+
+# Campo del formulario de cada parámetro que puede variar en un barrido
+PARAM_SELECTORS = {
+    'dte': 'selector_del_input_dte',
+    'percent': 'selector_del_input_percent',
+    'pct_type': 'selector_del_input_pct_type',
+    'buy_sell': 'selector_del_input_buy_sell',
+    'call_put': 'selector_del_input_call_put',
+    'qty': 'selector_del_input_qty',
+    'starting_funds': 'selector_del_input_starting_funds',
+    'margin_allocation_percent': 'selector_del_input_margin_allocation',
+    'max_contracts_per_trade': 'selector_del_input_max_contracts',
+    'max_open_trades': 'selector_del_input_max_open_trades',
+    'max_allocation_amount': 'selector_del_input_max_allocation',
+    'prune_oldest_trades': 'selector_del_check_prune_oldest',
+    'ignore_margin_requirements': 'selector_del_check_ignore_margin',
+}
+
+
 class AutoOmegaBot:
-    def __init__(self, urls_file, output_file, previous_year, template_file=None):
+    def __init__(self, urls_file, output_file, previous_year, template_file=None,
+                 pages_per_context=None, max_memory_mb=None, config=None, resume=False):
         self.urls_file = urls_file
         self.output_file = output_file
         self.previous_year = previous_year
         self.template_file = template_file
         self.urls = []
         self.results = []
+        # Escritor incremental activo durante execute()
+        self.writer = None
+        self.processed_count = 0
+        # Llamada con (procesados, resultado) por cada URL terminada
+        self.on_progress = None
+        # Hilo único de E/S de disco del motor asíncrono (ver run_io)
+        self._io_executor = None
+        # Cancelación cooperativa (p. ej. desde la interfaz): no se inician
+        # trabajos nuevos y lo ya procesado se guarda como siempre
+        self.cancel_event = threading.Event()
+
+        # Journal de progreso; con resume se saltan las URLs ya completadas
+        self.resume = resume
+        self.journal = None
+        self.completed_before = {}
+        self.resumed_count = 0
+
+        # Configuración persistente (config.json) salvo que se pase explícita
+        self.config = config if config is not None else load_config()
+        self.concurrency = max(1, int(self.config.get('concurrency', 1) or 1))
+        self.workers = max(1, int(self.config.get('workers', 1) or 1))
+
+        # Pool de navegador reutilizado durante toda la ejecución
+        # 1 = un contexto aislado por URL; más de 1 comparte cookies/localStorage
+        self.pages_per_context = max(1, int(pages_per_context
+                                            or self.config.get('pages_per_context', 1) or 1))
+        self.max_memory_mb = max_memory_mb
+        self.pool = None
+        self.run_stats = {}
+
+        # Caché de resultados por URL + parámetros (se abre al primer uso)
+        self.cache_enabled = bool(self.config.get('cache_enabled', True))
+        self.cache = None
+
+        # Filtro de imágenes, fuentes, analítica y scripts de terceros
+        self.resource_filter = ResourceFilter.from_config(self.config)
+
+        # Extracción desde la respuesta JSON de la API (DOM como respaldo)
+        self.network_extractor = NetworkResultExtractor.from_config(self.config)
+
+        # Timeouts por paso ajustados al p95 de latencia observado
+        self.step_timeouts = AdaptiveTimeouts.from_config(self.config)
+
+        # Reintentos por clase de error y pausa global si el host falla en masa
+        # (la apertura del circuito se comparte con los demás procesos de la máquina)
+        self.retry_policy = RetryPolicy.from_config(self.config)
+        self.circuit_breaker = CircuitBreaker.from_config(
+            self.config, os.path.join(get_cache_folder(), 'rate_limiter.sqlite'))
+
+        # Límite de peticiones/segundo y de backtests en vuelo por dominio,
+        # compartido entre hilos y procesos a través de un archivo SQLite
+        self.rate_limiter = RateLimiter.from_config(
+            self.config, os.path.join(get_cache_folder(), 'rate_limiter.sqlite'))
+
+        # Login único: cookies y localStorage guardados y aplicados a cada contexto
+        self.session = SessionManager.from_config(
+            self.config, os.path.join(get_config_folder(), 'session_state.json'))
+
+        # Orden de ejecución: prioridad del archivo de links y política
+        # (fifo, shortest_first con la latencia histórica, round_robin)
+        self.latency_history = LatencyHistory(
+            os.path.join(get_cache_folder(), 'latency_history.sqlite'))
+        self.scheduler = Scheduler.from_config(self.config, self.latency_history)
+        self.scheduled = False
+
+        # Barrido de parámetros: cada URL se ejecuta con cada combinación
+        self.sweep_grid = expand_grid(self.config.get('sweep') or {})
+        self.sweep_progress = {}
+
+        # Ventanas de fechas (YTD, fechas personalizadas, años anteriores)
+        # ejecutadas en la misma página y combinadas en un registro por URL
+        self.date_windows = build_date_windows(self.config, previous_year)
+        self.window_names = [window['name'] for window in self.date_windows]
+
+        # Tiempos por fase de cada URL (histogramas + exportación en Logs)
+        self.phase_timing_enabled = bool(self.config.get('phase_timing_enabled', True))
+        self.phase_timing = None
+
+        # Rankings, percentiles y resúmenes por grupo al terminar el lote
+        self.analytics_enabled = bool(self.config.get('analytics_enabled', True))
+        # Métricas (float64) y etiquetas de cada fila escrita, para el análisis
+        self.result_columns = None
+
+        # Histórico consultable de resultados de todas las ejecuciones
+        self.results_store_enabled = bool(self.config.get('results_store_enabled', True))
+        self.results_store = None
+        self.run_id = None
+
+    def cancel(self):
+        """Pedir que la ejecución termine tras los trabajos en curso (seguro desde otro hilo)"""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
 
     def load_urls(self):
-        import pandas as pd
-        
-        # Cargar el archivo Excel con las URLs
-        df = pd.read_excel(self.urls_file)
-        self.urls = df.iloc[:, 0].dropna().tolist()  # Suponiendo que las URLs están en la primera columna
+        # Cargar todas las URLs en memoria (necesario para repartir entre procesos)
+        self.urls = list(self.iter_urls())
 
-    def run_backtest(self, url):
-        from playwright.sync_api import sync_playwright
-        
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page()
-            page.goto(url)
+    def iter_urls(self):
+        # Leer las URLs en streaming: la ejecución empieza con la primera fila
+        return iter_urls(self.urls_file)
+
+    def uses_scheduler(self):
+        """True si el orden de ejecución no es simplemente el del archivo"""
+        return self.scheduler.policy != 'fifo' or 'priority' in link_columns(self.urls_file)
+
+    def iter_jobs(self):
+        """
+        Generar los trabajos pendientes, registrando al vuelo los ya completados
+
+        Yields:
+            tuple: (índice, url, parámetros); parámetros es None salvo en un
+                barrido, donde es la combinación {campo: valor} del trabajo
+        """
+        if not self.scheduled:
+            urls = self.iter_urls()
+        else:
+            # Ordenar exige conocer todas las filas: la lista se carga completa
+            rows = list(enumerate(iter_link_rows(self.urls_file)))
+            urls = (url for _, url in self.scheduler.order(rows))
+
+        combinations = self.sweep_grid or [None]
+        seen = set()
+        index = 0
+        for url in urls:
+            for params in combinations:
+                if self.cancelled:
+                    # Lo no iniciado queda fuera del journal: --resume lo retoma
+                    return
+                key = job_key(url, sweep_key(params))
+                if self.sweep_grid:
+                    # Un mismo (URL, combinación) repetido en el archivo se ejecuta una vez
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                if not self._take_completed(index, key):
+                    yield index, url, params
+                index += 1
+
+    def _take_completed(self, index, key):
+        # Con resume, registrar el resultado ya existente en lugar de repetirlo
+        record = self.completed_before.get(key)
+        if record is None:
+            return False
+        self.resumed_count += 1
+        self.record_result(index, record, journal=False)
+        return True
+
+    def get_result_columns(self):
+        """
+        Columnas del archivo de resultados
+
+        En un barrido se añade una por campo barrido y, con varias ventanas de
+        fechas, las métricas de cada ventana secundaria.
+        """
+        columns = list(RESULT_COLUMNS)
+        if self.sweep_grid:
+            columns = ['url', 'sweep_key'] + list(self.sweep_grid[0]) + columns[1:]
+        return columns + window_columns(self.date_windows)
+
+    def get_config_hash(self):
+        return compute_config_hash(self.config, {
+            'previous_year': self.previous_year,
+            'date_windows': list(self.window_names),
+        })
+
+    def get_worker_options(self):
+        """Argumentos (serializables) para reconstruir el bot en otro proceso"""
+        return {
+            'urls_file': self.urls_file,
+            'output_file': self.output_file,
+            'previous_year': self.previous_year,
+            'template_file': self.template_file,
+            'pages_per_context': self.pages_per_context,
+            'max_memory_mb': self.max_memory_mb,
+            'config': dict(self.config),
+        }
+
+    def create_pool(self):
+        return BrowserPool(
+            pages_per_context=self.pages_per_context,
+            max_memory_mb=self.max_memory_mb,
+            on_context=self.setup_context,
+        )
+
+    def create_async_pool(self):
+        from Bot.async_engine import AsyncBrowserPool
+
+        return AsyncBrowserPool(
+            pages_per_context=self.pages_per_context,
+            max_memory_mb=self.max_memory_mb,
+            on_context=self.setup_context_async,
+        )
+
+    def setup_context(self, context):
+        # Preparar cada contexto nuevo del pool síncrono
+        if self.resource_filter is not None:
+            self.resource_filter.install_sync(context)
+        if self.session is not None:
+            self.session.ensure(context)
+
+    async def setup_context_async(self, context):
+        # Preparar cada contexto nuevo del pool asíncrono
+        if self.resource_filter is not None:
+            await self.resource_filter.install_async(context)
+        if self.session is not None:
+            await self.session.ensure_async(context)
+
+    def make_result(self, url, result=None, error=None, attempts=1, params=None, timings=None):
+        """Construir el registro de resultado de una URL (y combinación de barrido)"""
+        record = {
+            'url': url,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'status': 'error' if error is not None else 'completed',
+            'source': '',
+            'result': result,
+            'attempts': attempts,
+            'error_class': classify_error(error) if error is not None else '',
+            'error': f"{type(error).__name__}: {error}" if error is not None else '',
+            # Tiempos por fase (ms); no es columna del archivo de resultados
+            'timings': timings.as_ms() if timings is not None else {},
+        }
+        record.update(dict.fromkeys(METRIC_NAMES))
+
+        windows = result.get('windows') if isinstance(result, dict) else None
+        if windows:
+            # Varias ventanas de fechas: la primera en las columnas principales
+            names = list(windows)
+            self._apply_result(record, windows[names[0]])
+            for name in names[1:]:
+                self._apply_result(record, windows[name], prefix=f"{name}_")
+        else:
+            self._apply_result(record, result)
+
+        if params:
+            record.update(params)
+            record['sweep_key'] = sweep_key(params)
+        return record
+
+    @staticmethod
+    def _apply_result(record, result, prefix=''):
+        if isinstance(result, dict):
+            # Resultado estructurado de la API: métricas tipadas en columnas propias
+            for name in METRIC_NAMES:
+                record[prefix + name] = result.get(name)
+            record[prefix + 'result'] = json.dumps(result.get('raw'), default=str)
+            source = 'network'
+        else:
+            # Texto del DOM: las métricas se extraen de las etiquetas del resultado
+            for name, value in parse_result_text(result).items():
+                record[prefix + name] = value
+            record[prefix + 'result'] = result
+            source = 'dom' if result is not None else ''
+        if not prefix:
+            record['source'] = source
+
+    def get_cache(self):
+        if self.cache is None and self.cache_enabled:
+            self.cache = ResultCache(
+                os.path.join(get_cache_folder(), 'results_cache.sqlite'),
+                ttl_seconds=float(self.config.get('cache_ttl_hours', 24) or 0) * 3600,
+                max_bytes=int(float(self.config.get('cache_max_mb', 200) or 0) * 1024 * 1024),
+            )
+        return self.cache
+
+    def get_cache_key(self, url, params=None):
+        backtest_params = get_backtest_params(self.config)
+        backtest_params.update(params or {})
+        backtest_params['previous_year'] = self.previous_year
+        backtest_params['date_windows'] = list(self.window_names)
+        return make_cache_key(url, backtest_params)
+
+    def get_cached_result(self, url, params=None):
+        """Buscar en caché el resultado de la URL con la configuración actual"""
+        cache = self.get_cache()
+        if cache is None:
+            return None
+        try:
+            record = cache.get(self.get_cache_key(url, params))
+        except Exception as e:
+            print(f"Error leyendo caché de resultados: {e}")
+            return None
+        if record is not None:
+            record = dict(record, url=url, cached=True, timings={})
+        return record
+
+    def store_cached_result(self, url, record, params=None):
+        """Guardar en caché un resultado completado"""
+        cache = self.get_cache()
+        if cache is None or record.get('status') != 'completed':
+            return
+        try:
+            cache.put(self.get_cache_key(url, params), record)
+        except Exception as e:
+            print(f"Error guardando en caché de resultados: {e}")
+
+    def get_engine_stats(self):
+        """Estadísticas del bot (no del navegador) para el resumen final"""
+        stats = {}
+        if self.cache is not None:
+            stats.update(self.cache.get_stats())
+        if self.resource_filter is not None:
+            stats.update(self.resource_filter.get_stats())
+        if self.network_extractor is not None:
+            stats.update(self.network_extractor.get_stats())
+        stats.update(self.retry_policy.get_stats())
+        stats.update(self.circuit_breaker.get_stats())
+        if self.rate_limiter is not None:
+            stats.update(self.rate_limiter.get_stats())
+        if self.session is not None:
+            stats.update(self.session.get_stats())
+        stats['step_latency'] = self.step_timeouts.get_stats()
+        return stats
+
+    def throttle(self, host):
+        # Esperar un token del dominio antes de una petición a la plataforma
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait_token(host)
+
+    async def throttle_async(self, host):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.wait_token_async(host)
+
+    @contextmanager
+    def in_flight_slot(self, host):
+        # Ocupar un hueco de backtest en vuelo del dominio durante el bloque
+        if self.rate_limiter is None:
+            yield
+            return
+        with self.rate_limiter.slot(host):
+            yield
+
+    @asynccontextmanager
+    async def in_flight_slot_async(self, host):
+        if self.rate_limiter is None:
+            yield
+            return
+        async with self.rate_limiter.slot_async(host):
+            yield
+
+    async def run_io(self, func, *args):
+        """
+        Ejecutar E/S de disco (caché, latencias, journal, escritor) fuera del
+        event loop
+
+        Todas las llamadas pasan por un mismo hilo, en el orden en que se
+        piden: las conexiones SQLite y los archivos nunca se usan a la vez.
+        """
+        import asyncio
+
+        if self._io_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='omegabot-io')
+        call = asyncio.get_running_loop().run_in_executor(self._io_executor, func, *args)
+        # Cancelar la tarea no descarta una escritura ya encargada
+        return await asyncio.shield(call)
+
+    def close_io(self):
+        """Esperar a la E/S pendiente y cerrar el hilo de run_io()"""
+        if self._io_executor is not None:
+            self._io_executor.shutdown(wait=True)
+            self._io_executor = None
+
+    def report_rate_limit_cap(self):
+        # El límite de backtests en vuelo puede quedar por debajo de la concurrencia pedida
+        if self.rate_limiter is None:
+            return
+        cap = int(self.rate_limiter.limits['default'].get('max_in_flight') or 0)
+        requested = self.concurrency * self.workers
+        if cap and requested > cap:
+            print(f"🚦 Límite de tasa: {requested} páginas simultáneas ({self.concurrency} × "
+                  f"{self.workers} procesos) pero como máximo {cap} backtests en vuelo por dominio; "
+                  f"el resto espera turno (rate_limits.max_in_flight)")
 
-            # Hacer clic en el botón "New Backtest"
-            page.click('#newBacktestBtn')
+    def record_latency(self, url, seconds):
+        try:
+            self.latency_history.record(url, seconds)
+        except Exception as e:
+            print(f"Error guardando la latencia histórica: {e}")
 
+    def record_result(self, index, record, journal=True):
+        """Enviar un resultado al journal y al escritor incremental (o a memoria)"""
+        started = time.perf_counter()
+        self.processed_count += 1
+        key = record.get('sweep_key') or ''
+        if journal and self.journal is not None:
+            self.journal.append(index, job_key(record['url'], key), record)
+        if key:
+            progress = self.sweep_progress.setdefault(key, {'completed': 0, 'errors': 0})
+            progress['completed' if record.get('status') == 'completed' else 'errors'] += 1
+        if self.writer is not None:
+            self.writer.write(index, record)
+        else:
+            self.results.append(record)
+        if journal and self.results_store is not None:
+            self.results_store.add(self.run_id, record,
+                                   windows=self.window_names)
+        if journal and self.phase_timing is not None:
+            self.phase_timing.record(record, time.perf_counter() - started)
+        if self.on_progress is not None:
+            self.on_progress(self.processed_count, record)
+
+    def record_network_fallback(self):
+        # Tras varias esperas seguidas sin métricas de la API se usa solo el DOM
+        extractor = self.network_extractor
+        if extractor.record_fallback():
+            print(f"⚠️ Extracción por red desactivada: {extractor.consecutive_fallbacks} esperas "
+                  f"seguidas sin métricas de {extractor.url_pattern.pattern}; se lee el DOM")
+
+    def run_backtest(self, url, index=None, params=None):
+        # Consultar la caché antes de abrir ninguna página
+        record = self.get_cached_result(url, params)
+
+        if record is None:
+            # Sin pool activo (llamada aislada) se usa uno temporal
+            if self.pool is None:
+                with self.create_pool() as self.pool:
+                    record = self._run_with_retry(url, params)
+                self.pool = None
+            else:
+                record = self._run_with_retry(url, params)
+            self.store_cached_result(url, record, params)
+
+        if index is None:
+            index = self.processed_count
+        self.record_result(index, record)
+
+    def _run_with_retry(self, url, params=None):
+        """Ejecutar una URL con reintentos por clase de error y circuit breaker"""
+        host = host_of(url)
+        used = {}
+        attempt = 0
+        # Las fases se suman a lo largo de los reintentos
+        timings = PhaseTimer()
+        while True:
+            self.circuit_breaker.wait(host)
+            started = time.perf_counter()
+            try:
+                timings.start('acquire')
+                with self.in_flight_slot(host), self.pool.page() as page:
+                    timings.stop('acquire')
+                    result = self._run_backtest_on_page(page, url, params, timings)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # Interrupción sin resultado: no dejar el circuito esperando la prueba
+                    self.circuit_breaker.release(host)
+                    raise
+                error_class = classify_error(e)
+                self.circuit_breaker.record_failure(host)
+                if not self.retry_policy.should_retry(error_class, used):
+                    return self.make_result(url, error=e, attempts=attempt + 1, params=params,
+                                            timings=timings)
+                used[error_class] = used.get(error_class, 0) + 1
+                self.retry_policy.count_retry(error_class)
+                time.sleep(self.retry_policy.delay_for(attempt))
+                attempt += 1
+                continue
+
+            self.circuit_breaker.record_success(host)
+            self.record_latency(url, time.perf_counter() - started)
+            return self.make_result(url, result, attempts=attempt + 1, params=params,
+                                    timings=timings)
+
+    async def run_backtest_async(self, pool, url, params=None):
+        """
+        Versión asíncrona de run_backtest: caché, reintentos y circuit breaker
+
+        Returns:
+            dict: Resultado de la URL (nunca lanza por fallos del backtest)
+        """
+        import asyncio
+
+        # Un acierto de caché no ocupa página del navegador
+        record = await self.run_io(self.get_cached_result, url, params)
+        if record is not None:
+            return record
+
+        host = host_of(url)
+        used = {}
+        attempt = 0
+        timings = PhaseTimer()
+        while True:
+            await self.circuit_breaker.wait_async(host)
+            started = time.perf_counter()
+            try:
+                timings.start('acquire')
+                async with self.in_flight_slot_async(host), pool.page() as page:
+                    timings.stop('acquire')
+                    result = await self.run_backtest_on_page_async(page, url, params, timings)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # Cancelación de la tarea: no dejar el circuito esperando la prueba
+                    self.circuit_breaker.release(host)
+                    raise
+                error_class = classify_error(e)
+                await self.circuit_breaker.record_failure_async(host)
+                if not self.retry_policy.should_retry(error_class, used):
+                    return self.make_result(url, error=e, attempts=attempt + 1, params=params,
+                                            timings=timings)
+                used[error_class] = used.get(error_class, 0) + 1
+                self.retry_policy.count_retry(error_class)
+                await asyncio.sleep(self.retry_policy.delay_for(attempt))
+                attempt += 1
+                continue
+
+            self.circuit_breaker.record_success(host)
+            await self.run_io(self.record_latency, url, time.perf_counter() - started)
+            record = self.make_result(url, result, attempts=attempt + 1, params=params,
+                                      timings=timings)
+            await self.run_io(self.store_cached_result, url, record, params)
+            return record
+
+    def _goto(self, page, url, timings):
+        with self.step_timeouts.step('goto') as timeout, timings.phase('navigation'):
+            response = page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+            if response is not None and response.status >= 500:
+                raise BacktestHTTPError(response.status, url)
+
+    async def _goto_async(self, page, url, timings):
+        with self.step_timeouts.step('goto') as timeout, timings.phase('navigation'):
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+            if response is not None and response.status >= 500:
+                raise BacktestHTTPError(response.status, url)
+
+    def _run_backtest_on_page(self, page, url, params=None, timings=None):
+        # Cada paso espera una condición explícita con su timeout adaptativo
+        steps = self.step_timeouts
+        timings = timings if timings is not None else PhaseTimer()
+        host = host_of(url)
+
+        self.throttle(host)
+        self._goto(page, url, timings)
+        if self.session is not None and self.session.is_login_page(page):
+            # Sesión caducada: renovarla y volver a cargar la URL
+            self.session.refresh(page.context)
+            self.throttle(host)
+            self._goto(page, url, timings)
+
+        # Hacer clic en el botón "New Backtest"
+        with steps.step('new_backtest') as timeout, timings.phase('new_backtest'):
+            page.wait_for_selector(SELECTORS['new_backtest_button'], state='visible', timeout=timeout)
+            page.click(SELECTORS['new_backtest_button'], timeout=timeout)
+
+        # Cada ventana de fechas se ejecuta sobre la misma página ya cargada
+        results = {}
+        previous_text = None
+        for window in self.date_windows:
+            self._select_window(page, window, timings)
+            self._fill_params(page, params, timings)
+            results[window['name']], previous_text = self._run_and_extract(
+                page, host, timings, previous_text)
+        return self._merge_windows(results)
+
+    def _select_window(self, page, window, timings):
+        if window['start'] is None:
             # Hacer clic en el botón "YTD"
-            page.click('selector_del_boton_ytd')
+            with self.step_timeouts.step('ytd') as timeout, timings.phase('fill'):
+                page.wait_for_selector(SELECTORS['ytd_button'], state='visible', timeout=timeout)
+                page.click(SELECTORS['ytd_button'], timeout=timeout)
+            return
+        with self.step_timeouts.step('dates') as timeout, timings.phase('fill'):
+            for selector, value in ((SELECTORS['start_date_input'], window['start']),
+                                    (SELECTORS['end_date_input'], window['end'])):
+                page.wait_for_selector(selector, state='visible', timeout=timeout)
+                page.fill(selector, value, timeout=timeout)
+
+    def _fill_params(self, page, params, timings):
+        # Cambiar los datos necesarios antes de pulsar "Run"
+        with self.step_timeouts.step('fill') as timeout, timings.phase('fill'):
+            if params:
+                # Barrido: rellenar cada campo con el valor de la combinación
+                for field, value in params.items():
+                    selector = PARAM_SELECTORS[field]
+                    page.wait_for_selector(selector, state='visible', timeout=timeout)
+                    if isinstance(value, bool):
+                        page.set_checked(selector, value, timeout=timeout)
+                    else:
+                        page.fill(selector, str(value), timeout=timeout)
+            else:
+                page.wait_for_selector(SELECTORS['input'], state='visible', timeout=timeout)
+                page.fill(SELECTORS['input'], 'nuevo_valor', timeout=timeout)  # Cambiar el valor según sea necesario
+
+    def _run_and_extract(self, page, host, timings, previous_text):
+        """
+        Pulsar "Run" y obtener el resultado de la ventana actual
+
+        Returns:
+            tuple: (resultado, texto del resultado en el DOM o el anterior)
+        """
+        steps = self.step_timeouts
+
+        # Preferir el JSON de la API; si no llega, leer el resultado del DOM
+        self.throttle(host)
+        clicked = False
+        if self.network_extractor is not None and self.network_extractor.enabled:
+            try:
+                # Paso propio: el p95 de la API no se mezcla con lecturas del DOM
+                with steps.step('api_response') as timeout:
+                    with page.expect_response(self.network_extractor.matches,
+                                              timeout=timeout) as response_info:
+                        with steps.step('run') as run_timeout, timings.phase('run'):
+                            page.click(SELECTORS['run_button'], timeout=run_timeout)
+                        clicked = True
+                        timings.start('result_wait')
+                    response = response_info.value
+                    timings.stop('result_wait')
+                with timings.phase('extraction'):
+                    result = self.network_extractor.build_result(response.json())
+            except Exception:
+                if not clicked:
+                    # Falló el propio clic en "Run": no es un problema de la API
+                    raise
+                timings.stop('result_wait')
+                result = None
+            if result is not None:
+                return result, previous_text
+            # Sin respuesta de la API o una respuesta sin métricas: leer el DOM
+            self.record_network_fallback()
+        else:
+            with steps.step('run') as timeout, timings.phase('run'):
+                page.click(SELECTORS['run_button'], timeout=timeout)
+
+        # Esperar a que se muestre el resultado y extraer los datos
+        with steps.step('result') as timeout, timings.phase('result_wait'):
+            page.wait_for_selector(SELECTORS['result'], state='visible', timeout=timeout)
+            if previous_text is not None:
+                # El resultado de la ventana anterior sigue visible hasta que cambie
+                page.wait_for_function(RESULT_CHANGED_SCRIPT,
+                                       arg=[SELECTORS['result'], previous_text], timeout=timeout)
+        with timings.phase('extraction'):
+            text = page.inner_text(SELECTORS['result'])
+        return text, text
+
+    async def run_backtest_on_page_async(self, page, url, params=None, timings=None):
+        # Mismo flujo que _run_backtest_on_page sobre playwright.async_api
+        steps = self.step_timeouts
+        timings = timings if timings is not None else PhaseTimer()
+        host = host_of(url)
+
+        await self.throttle_async(host)
+        await self._goto_async(page, url, timings)
+        if self.session is not None and await self.session.is_login_page_async(page):
+            await self.session.refresh_async(page.context)
+            await self.throttle_async(host)
+            await self._goto_async(page, url, timings)
+
+        with steps.step('new_backtest') as timeout, timings.phase('new_backtest'):
+            await page.wait_for_selector(SELECTORS['new_backtest_button'], state='visible', timeout=timeout)
+            await page.click(SELECTORS['new_backtest_button'], timeout=timeout)
+
+        results = {}
+        previous_text = None
+        for window in self.date_windows:
+            await self._select_window_async(page, window, timings)
+            await self._fill_params_async(page, params, timings)
+            results[window['name']], previous_text = await self._run_and_extract_async(
+                page, host, timings, previous_text)
+        return self._merge_windows(results)
+
+    async def _select_window_async(self, page, window, timings):
+        if window['start'] is None:
+            with self.step_timeouts.step('ytd') as timeout, timings.phase('fill'):
+                await page.wait_for_selector(SELECTORS['ytd_button'], state='visible', timeout=timeout)
+                await page.click(SELECTORS['ytd_button'], timeout=timeout)
+            return
+        with self.step_timeouts.step('dates') as timeout, timings.phase('fill'):
+            for selector, value in ((SELECTORS['start_date_input'], window['start']),
+                                    (SELECTORS['end_date_input'], window['end'])):
+                await page.wait_for_selector(selector, state='visible', timeout=timeout)
+                await page.fill(selector, value, timeout=timeout)
+
+    async def _fill_params_async(self, page, params, timings):
+        with self.step_timeouts.step('fill') as timeout, timings.phase('fill'):
+            if params:
+                for field, value in params.items():
+                    selector = PARAM_SELECTORS[field]
+                    await page.wait_for_selector(selector, state='visible', timeout=timeout)
+                    if isinstance(value, bool):
+                        await page.set_checked(selector, value, timeout=timeout)
+                    else:
+                        await page.fill(selector, str(value), timeout=timeout)
+            else:
+                await page.wait_for_selector(SELECTORS['input'], state='visible', timeout=timeout)
+                await page.fill(SELECTORS['input'], 'nuevo_valor', timeout=timeout)
+
+    async def _run_and_extract_async(self, page, host, timings, previous_text):
+        steps = self.step_timeouts
 
-            # Cambiar los datos necesarios y hacer clic en "Run"
-            page.fill('selector_del_input', 'nuevo_valor')  # Cambiar el valor según sea necesario
-            page.click('selector_del_boton_run')
+        await self.throttle_async(host)
+        clicked = False
+        if self.network_extractor is not None and self.network_extractor.enabled:
+            try:
+                # Paso propio: el p95 de la API no se mezcla con lecturas del DOM
+                with steps.step('api_response') as timeout:
+                    async with page.expect_response(self.network_extractor.matches,
+                                                    timeout=timeout) as response_info:
+                        with steps.step('run') as run_timeout, timings.phase('run'):
+                            await page.click(SELECTORS['run_button'], timeout=run_timeout)
+                        clicked = True
+                        timings.start('result_wait')
+                    response = await response_info.value
+                    timings.stop('result_wait')
+                with timings.phase('extraction'):
+                    payload = await response.json()
+                    result = self.network_extractor.build_result(payload)
+            except Exception:
+                if not clicked:
+                    # Falló el propio clic en "Run": no es un problema de la API
+                    raise
+                timings.stop('result_wait')
+                result = None
+            if result is not None:
+                return result, previous_text
+            self.record_network_fallback()
+        else:
+            with steps.step('run') as timeout, timings.phase('run'):
+                await page.click(SELECTORS['run_button'], timeout=timeout)
 
-            # Esperar a que se muestre el resultado y extraer los datos
-            result = page.query_selector('selector_del_resultado').inner_text()
-            self.results.append(result)
+        with steps.step('result') as timeout, timings.phase('result_wait'):
+            await page.wait_for_selector(SELECTORS['result'], state='visible', timeout=timeout)
+            if previous_text is not None:
+                await page.wait_for_function(RESULT_CHANGED_SCRIPT,
+                                             arg=[SELECTORS['result'], previous_text], timeout=timeout)
+        with timings.phase('extraction'):
+            text = await page.inner_text(SELECTORS['result'])
+        return text, text
 
-            # Cerrar la página
-            browser.close()
+    @staticmethod
+    def _merge_windows(results):
+        # Con una sola ventana el resultado es el de siempre (texto o métricas)
+        if len(results) == 1:
+            return next(iter(results.values()))
+        return {'windows': results}
 
     def save_results(self):
+        # Informe con la plantilla (template_file), fila a fila desde los resultados
+        on_rows = self.render_template_report if self.template_file else None
+
+        # Con escritor incremental las filas ya están en disco: el análisis
+        # (hojas extra) usa las columnas completadas al escribir cada fila
+        if self.writer is not None:
+            self.writer.close(extra_sheets=lambda: self.run_analytics(self.result_columns),
+                              on_rows=on_rows)
+            self.writer = None
+            return
+
+        # Rankings y resúmenes por grupo como hojas extra del archivo de salida
+        columns = ResultColumns()
+        for record in self.results:
+            columns.add(record)
+        extra_sheets = self.run_analytics(columns)
+
         import pandas as pd
         
         # Guardar los resultados en un archivo Excel
-        df = pd.DataFrame(self.results, columns=['Resultados'])
-        df.to_excel(self.output_file, index=False)
+        df = pd.DataFrame(self.results, columns=self.get_result_columns())
+        with pd.ExcelWriter(self.output_file) as writer:
+            df.to_excel(writer, sheet_name='Resultados', index=False)
+            for name, names, values in extra_sheets:
+                pd.DataFrame(list(sheet_rows(values)), columns=names).to_excel(
+                    writer, sheet_name=name[:31], index=False)
+        if on_rows is not None:
+            on_rows(iter(self.results))
+
+    def render_template_report(self, rows):
+        """
+        Generar <salida>_informe.xlsx con la plantilla template_file
+
+        La plantilla se analiza una vez y se reutiliza desde la caché mientras
+        el archivo no cambie (ver Bot/report_template.py).
+
+        Args:
+            rows (iterable): Resultados como diccionarios
+        """
+        from Bot.report_template import get_template_cache, render_report
+
+        try:
+            cache = get_template_cache(os.path.join(get_cache_folder(), 'templates'))
+            template = cache.get(self.template_file)
+            report_file = os.path.splitext(self.output_file)[0] + '_informe.xlsx'
+            # Filas ya escritas: las fórmulas del encabezado se ajustan sin leerlas antes
+            total = self.writer.rows_written if self.writer is not None else len(self.results)
+            count = render_report(template, report_file, rows, count=total)
+            print(f"💾 Informe de plantilla ({count} filas) guardado en {report_file}")
+        except Exception as e:
+            # Sin informe la ejecución no se pierde: los resultados ya están guardados
+            print(f"Error generando el informe con la plantilla: {e}")
+
+    def run_analytics(self, columns):
+        """
+        Análisis vectorizado de todos los resultados (ver Bot/analytics.py)
+
+        Las métricas ya están en columnas float64, convertidas al escribir
+        cada resultado: aquí no se vuelve a analizar ningún texto.
+
+        Args:
+            columns (ResultColumns): Resultados escritos, en columnas
+
+        Returns:
+            list: Hojas (nombre, columnas, valores por columna); vacía si está
+                desactivado o falla
+        """
+        if not self.analytics_enabled or columns is None or not len(columns):
+            return []
+        try:
+            from Bot.analytics import build_sheets
+
+            started = time.perf_counter()
+            sheets = build_sheets(columns, self.window_names,
+                                  groups=self.get_result_groups(columns),
+                                  weights=self.config.get('analytics_weights'))
+            print(f"📈 Análisis de {len(columns)} resultados en "
+                  f"{time.perf_counter() - started:.2f}s")
+            return sheets
+        except Exception as e:
+            # El análisis es un extra: los resultados se guardan igualmente
+            print(f"Error analizando resultados: {e}")
+            return []
+
+    def get_result_groups(self, columns):
+        """
+        Etiqueta de estrategia, ticker y combinación de cada resultado
+
+        El ticker y la estrategia salen de las columnas del archivo de links
+        si existen; si no, de la configuración.
+
+        Args:
+            columns (ResultColumns): Resultados de run_analytics()
+
+        Returns:
+            dict: Título de hoja -> lista de etiquetas alineada con `columns`
+        """
+        rows = {}
+        if {'ticker', 'strategy'} & set(link_columns(self.urls_file)):
+            for row in iter_link_rows(self.urls_file):
+                rows.setdefault(row['url'], row)
+
+        def labels(field):
+            default = str(self.config.get(field, ''))
+            if not rows:
+                return [default] * len(columns)
+            values = []
+            for url in columns.urls:
+                value = (rows.get(url) or {}).get(field)
+                values.append(str(value) if value not in (None, '') else default)
+            return values
+
+        groups = {
+            'Por estrategia': labels('strategy'),
+            'Por ticker': labels('ticker'),
+        }
+        if self.sweep_grid:
+            groups['Por combinación'] = list(columns.sweep_keys)
+        return groups
+
+    def open_results_store(self):
+        try:
+            self.results_store = ResultsStore(os.path.join(get_results_folder(), 'results.sqlite'))
+            self.results_store.start_run(self.run_id, self.get_config_hash(),
+                                         self.urls_file, self.output_file)
+        except Exception as e:
+            # Sin histórico la ejecución sigue; el Excel/CSV se escribe igual
+            print(f"Error abriendo el histórico de resultados: {e}")
+            self.results_store = None
+
+    def close_results_store(self):
+        try:
+            self.results_store.finish_run(self.run_id)
+            self.results_store.close()
+        except Exception as e:
+            print(f"Error cerrando el histórico de resultados: {e}")
+        self.results_store = None
+
+    def create_writer(self):
+        # Con planificador las filas se escriben según terminan, no en orden de archivo
+        on_write = self.result_columns.add if self.result_columns is not None else None
+        return ResultWriter(self.output_file, columns=self.get_result_columns(),
+                            ordered=not self.scheduled, on_write=on_write)
 
     def execute(self):
-        self.load_urls()
-        for url in self.urls:
-            self.run_backtest(url)
-        self.save_results()
\ No newline at end of file
+        start_time = get_current_timestamp()
+        self.journal = CheckpointJournal(journal_path_for(self.output_file),
+                                         self.get_config_hash())
+        self.completed_before = self.journal.load_completed() if self.resume else {}
+        self.journal.open()
+        self.scheduled = self.uses_scheduler()
+        if self.scheduled:
+            print(f"🗂️ Planificación: política {self.scheduler.policy} con prioridades del archivo")
+        if self.sweep_grid:
+            print(f"🧮 Barrido de parámetros: {len(self.sweep_grid)} combinaciones por URL")
+        self.report_rate_limit_cap()
+        self.result_columns = ResultColumns() if self.analytics_enabled else None
+        self.writer = self.create_writer().open()
+        self.run_id = time.strftime('%Y%m%d_%H%M%S')
+        if self.phase_timing_enabled:
+            self.phase_timing = PhaseTimingRecorder(get_logs_folder(), run_id=self.run_id)
+        if self.results_store_enabled:
+            self.open_results_store()
+        try:
+            if self.config.get('distributed_enabled'):
+                self.execute_distributed()
+            elif self.workers > 1:
+                self.execute_sharded()
+            elif self.concurrency > 1:
+                self.execute_async()
+            else:
+                self.execute_sync()
+
+            print(format_pool_stats(self.run_stats))
+            if self.resource_filter is not None:
+                print(format_filter_stats(self.run_stats))
+            if self.run_stats.get('step_latency'):
+                print(format_step_stats(self.run_stats['step_latency']))
+            phase_stats = self.phase_timing.get_stats() if self.phase_timing is not None else None
+            print(format_execution_summary(start_time, get_current_timestamp(),
+                                           self.processed_count, cache_stats=self.run_stats,
+                                           phase_stats=phase_stats))
+            if self.sweep_progress:
+                print(format_sweep_progress(self.sweep_progress))
+            if self.resumed_count:
+                print(f"♻️ Reanudado: {self.resumed_count} enlaces ya completados se omitieron")
+            if self.cancelled:
+                print(f"⏹️ Ejecución cancelada: {self.processed_count} resultados guardados")
+        finally:
+            # Incluso si la ejecución falla, lo ya procesado queda guardado
+            self.save_results()
+            self.journal.close()
+            self.journal = None
+            if self.phase_timing is not None:
+                self.phase_timing.close()
+                self.phase_timing = None
+            if self.results_store is not None:
+                self.close_results_store()
+            if self.cache is not None:
+                self.cache.close()
+                self.cache = None
+            if self.rate_limiter is not None:
+                self.rate_limiter.close()
+            self.circuit_breaker.close()
+            self.latency_history.close()
+
+    def execute_sync(self):
+        # Un solo navegador para todo el lote
+        with self.create_pool() as self.pool:
+            try:
+                for index, url, params in self.iter_jobs():
+                    self.run_backtest(url, index, params)
+            finally:
+                self.run_stats = dict(self.pool.get_stats(), **self.get_engine_stats())
+        self.pool = None
+
+    def execute_async(self):
+        import asyncio
+        from Bot.async_engine import run_backtests_async
+
+        _, self.run_stats = asyncio.run(
+            run_backtests_async(self, self.iter_jobs(), self.concurrency,
+                                on_result=self.record_result)
+        )
+
+    def execute_sharded(self):
+        from Bot.sharded_runner import ShardedRunner
+
+        # Un navegador por proceso; el proceso principal es el único escritor
+        runner = ShardedRunner(self, self.workers, self.concurrency)
+        self.run_stats = runner.run(list(self.iter_jobs()), self.record_result)
+
+    def execute_distributed(self):
+        from Bot.distributed import Coordinator
+
+        # Trabajadores en otras máquinas piden los trabajos por HTTP;
+        # este proceso sigue siendo el único escritor
+        coordinator = Coordinator.from_config(self, self.config)
+        self.run_stats = coordinator.run(list(self.iter_jobs()), self.record_result)
@@ -0,0 +1,229 @@
+"""
+Pool de navegadores Chromium para AutoOmegaBot
+==============================================
+
+Mantiene un único navegador lanzado durante toda la ejecución y entrega
+páginas desde contextos aislados. Cada contexto se recicla al alcanzar un
+número máximo de páginas servidas o un umbral de memoria, evitando el
+arranque en frío de Chromium por cada URL.
+
+Por defecto (pages_per_context=1) cada URL tiene su propio contexto sobre
+el navegador compartido: cookies y localStorage no pasan de un backtest a
+otro. Compartir un contexto entre varias URLs es opcional (config
+pages_per_context) y ahorra algo de tiempo a costa de ese aislamiento.
+"""
+
+from contextlib import contextmanager
+
+
+class BrowserPool:
+    """
+    Pool síncrono de navegador/contextos Playwright.
+
+    Args:
+        headless (bool): Lanzar Chromium sin ventana
+        pages_per_context (int): Páginas servidas antes de reciclar el contexto
+            (1 = un contexto aislado por URL)
+        max_memory_mb (float, optional): Heap JS (MB) a partir del cual se recicla
+        launch_options (dict, optional): Opciones extra para chromium.launch()
+        context_options (dict, optional): Opciones extra para browser.new_context()
+        on_context (callable, optional): Llamada con cada contexto nuevo antes de
+            entregar páginas (p.ej. para instalar rutas de red); si falla, el
+            contexto se cierra y no se usa
+
+    Uso:
+        with BrowserPool() as pool:
+            with pool.page() as page:
+                page.goto(url)
+    """
+
+    def __init__(self, headless=True, pages_per_context=1, max_memory_mb=None,
+                 launch_options=None, context_options=None, on_context=None):
+        self.headless = headless
+        self.pages_per_context = max(1, int(pages_per_context or 1))
+        self.max_memory_mb = max_memory_mb
+        self.launch_options = launch_options or {}
+        self.context_options = context_options or {}
+        self.on_context = on_context
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._context_pages = 0
+        self._recycle_pending = False
+
+        self.launches = 0
+        self.contexts_created = 0
+        self.context_recycles = 0
+        self.pages_served = 0
+
+    # -------------------------------------------------------------------------
+    # Ciclo de vida
+    # -------------------------------------------------------------------------
+
+    def start(self):
+        """Iniciar Playwright y lanzar el navegador (una sola vez por ejecución)"""
+        if self._playwright is None:
+            from playwright.sync_api import sync_playwright
+            self._playwright = sync_playwright().start()
+        if self._browser is None or not self._browser.is_connected():
+            self._launch_browser()
+        return self
+
+    def stop(self):
+        """Cerrar contexto, navegador y Playwright"""
+        self._close_context()
+        try:
+            if self._browser is not None:
+                self._browser.close()
+        except Exception as e:
+            print(f"Error cerrando navegador: {e}")
+        self._browser = None
+        try:
+            if self._playwright is not None:
+                self._playwright.stop()
+        except Exception as e:
+            print(f"Error deteniendo Playwright: {e}")
+        self._playwright = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    # -------------------------------------------------------------------------
+    # Páginas
+    # -------------------------------------------------------------------------
+
+    def acquire_page(self):
+        """
+        Obtener una página nueva desde el contexto activo
+
+        Returns:
+            Page: Página de Playwright lista para navegar
+        """
+        self.start()
+
+        if (self._context is None or self._recycle_pending
+                or self._context_pages >= self.pages_per_context):
+            self._new_context()
+
+        page = self._context.new_page()
+        self._context_pages += 1
+        self.pages_served += 1
+        return page
+
+    def release_page(self, page):
+        """Cerrar la página y marcar el contexto para reciclar si excede memoria"""
+        try:
+            if self.max_memory_mb and self._page_memory_mb(page) >= self.max_memory_mb:
+                self._recycle_pending = True
+        except Exception:
+            pass
+
+        try:
+            page.close()
+        except Exception:
+            # Si la página no se puede cerrar el contexto queda en mal estado
+            self._recycle_pending = True
+
+    @contextmanager
+    def page(self):
+        """Context manager que adquiere y libera una página del pool"""
+        page = self.acquire_page()
+        try:
+            yield page
+        finally:
+            self.release_page(page)
+
+    # -------------------------------------------------------------------------
+    # Estadísticas
+    # -------------------------------------------------------------------------
+
+    def get_stats(self):
+        """
+        Obtener métricas de uso del pool
+
+        Returns:
+            dict: Lanzamientos, contextos, páginas y tasas de reutilización
+        """
+        served = self.pages_served
+        return {
+            'launches': self.launches,
+            'contexts_created': self.contexts_created,
+            'context_recycles': self.context_recycles,
+            'pages_served': served,
+            'browser_reuse_rate': (1 - self.launches / served) if served else 0.0,
+            'context_reuse_rate': (1 - self.contexts_created / served) if served else 0.0,
+        }
+
+    def format_stats(self):
+        """Resumen legible de las métricas del pool para logs"""
+        return format_pool_stats(self.get_stats())
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+
+    def _launch_browser(self):
+        self._close_context()
+        self._browser = self._playwright.chromium.launch(
+            headless=self.headless, **self.launch_options
+        )
+        self.launches += 1
+
+    def _new_context(self):
+        if self._context is not None:
+            self.context_recycles += 1
+        self._close_context()
+        if not self._browser.is_connected():
+            self._launch_browser()
+        context = self._browser.new_context(**self.context_options)
+        if self.on_context is not None:
+            try:
+                self.on_context(context)
+            except Exception:
+                # Un contexto sin filtro o sin sesión no se entrega
+                context.close()
+                raise
+        self._context = context
+        self.contexts_created += 1
+
+    def _close_context(self):
+        if self._context is not None:
+            try:
+                self._context.close()
+            except Exception:
+                pass
+        self._context = None
+        self._context_pages = 0
+        self._recycle_pending = False
+
+    @staticmethod
+    def _page_memory_mb(page):
+        # performance.memory solo existe en Chromium
+        used = page.evaluate(
+            "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+        )
+        return (used or 0) / (1024 * 1024)
+
+
+def format_pool_stats(stats):
+    """
+    Formatear las métricas de un pool de navegador para logs
+
+    Args:
+        stats (dict): Resultado de get_stats() de BrowserPool/AsyncBrowserPool
+
+    Returns:
+        str: Resumen en una línea
+    """
+    return (
+        f"🌐 Navegador - Lanzamientos: {stats.get('launches', 0)} - "
+        f"Contextos: {stats.get('contexts_created', 0)} - "
+        f"Páginas: {stats.get('pages_served', 0)} - "
+        f"Reutilización navegador: {stats.get('browser_reuse_rate', 0.0) * 100:.1f}% - "
+        f"Reutilización contexto: {stats.get('context_reuse_rate', 0.0) * 100:.1f}%"
+    )
@@ -0,0 +1,124 @@
+"""
+Journal de progreso con reanudación
+===================================
+
+Registro append-only (una línea JSON por URL) guardado junto al archivo de
+salida. Cada línea lleva el hash de la configuración con la que se obtuvo
+el resultado, de modo que al reanudar solo se saltan las URLs ya
+completadas con la misma configuración.
+
+Cada línea se vuelca con fsync: si el proceso muere, como mucho se pierde
+la URL que estaba en curso.
+"""
+
+import json
+import os
+
+
+def journal_path_for(output_file):
+    """
+    Ruta del journal asociado a un archivo de salida
+
+    Args:
+        output_file (str): Archivo de resultados (.xlsx o .csv)
+
+    Returns:
+        str: Ruta <salida>.journal.jsonl
+    """
+    return os.path.splitext(output_file)[0] + '.journal.jsonl'
+
+
+class CheckpointJournal:
+    """
+    Journal append-only de resultados por URL
+
+    Args:
+        path (str): Ruta del archivo .jsonl
+        config_hash (str): Hash de la configuración de la ejecución actual
+    """
+
+    def __init__(self, path, config_hash):
+        self.path = path
+        self.config_hash = config_hash
+        self._file = None
+
+    def load_completed(self):
+        """
+        Leer las URLs ya completadas con la misma configuración
+
+        Las líneas corruptas (p.ej. la última si el proceso murió escribiendo)
+        se ignoran.
+
+        Returns:
+            dict: url -> resultado registrado
+        """
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('config_hash') != self.config_hash:
+                    continue
+                record = entry.get('record') or {}
+                if record.get('status') == 'completed':
+                    completed[entry.get('url')] = record
+                else:
+                    # Un fallo posterior invalida un éxito anterior de la misma URL
+                    completed.pop(entry.get('url'), None)
+        return completed
+
+    def open(self):
+        """Abrir el journal en modo append"""
+        if self._file is None:
+            folder = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(folder, exist_ok=True)
+            needs_newline = self._ends_mid_line()
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if needs_newline:
+                # Cerrar la línea truncada por un fallo previo
+                self._file.write('\n')
+        return self
+
+    def append(self, index, url, record):
+        """
+        Registrar el resultado de una URL
+
+        Args:
+            index (int): Posición de la URL en el archivo de entrada
+            url (str): URL procesada (en un barrido, URL#clave_de_barrido)
+            record (dict): Resultado de AutoOmegaBot.make_result()
+        """
+        self.open()
+        entry = {
+            'index': index,
+            'url': url,
+            'config_hash': self.config_hash,
+            'record': record,
+        }
+        self._file.write(json.dumps(entry, default=str) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _ends_mid_line(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b'\n'
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
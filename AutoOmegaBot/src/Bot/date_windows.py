@@ -0,0 +1,80 @@
+"""
+Ventanas de fechas por URL
+==========================
+
+Una misma página cargada puede ejecutar varios backtests seguidos cambiando
+solo las fechas y volviendo a pulsar "Run":
+
+- ytd: botón YTD
+- custom: start_date/end_date de la configuración (DD/MM/YYYY)
+- yAAAA: cada uno de los años anteriores pedidos con previous_year
+
+Los resultados de todas las ventanas se combinan en un único registro por
+URL: las métricas de la primera ventana en las columnas principales y las de
+las demás con el nombre de la ventana como prefijo (custom_profit_loss...).
+"""
+
+from datetime import date
+
+from Bot.network_extractor import METRIC_NAMES
+
+DEFAULT_DATE_WINDOWS = ('ytd', 'custom', 'previous_years')
+
+
+def previous_years(previous_year, today=None):
+    """
+    Años anteriores a ejecutar
+
+    Args:
+        previous_year (int|str): Número de años (p.ej. 3) o año inicial (p.ej. 2020)
+        today (date, optional): Fecha de referencia
+
+    Returns:
+        list: Años, del más reciente al más antiguo
+    """
+    try:
+        value = int(previous_year)
+    except (TypeError, ValueError):
+        return []
+    current = (today or date.today()).year
+    if value >= 1900:
+        return list(range(current - 1, value - 1, -1))
+    return [current - offset for offset in range(1, max(0, value) + 1)]
+
+
+def build_date_windows(config, previous_year, today=None):
+    """
+    Ventanas de fechas a ejecutar por cada URL
+
+    Args:
+        config (dict): Configuración (date_windows, start_date, end_date)
+        previous_year (int|str): Ver previous_years()
+
+    Returns:
+        list: Diccionarios {'name', 'start', 'end'}; start es None para YTD
+    """
+    enabled = config.get('date_windows') or DEFAULT_DATE_WINDOWS
+    windows = []
+    if 'ytd' in enabled:
+        windows.append({'name': 'ytd', 'start': None, 'end': None})
+    if 'custom' in enabled and config.get('start_date') and config.get('end_date'):
+        windows.append({'name': 'custom', 'start': config['start_date'], 'end': config['end_date']})
+    if 'previous_years' in enabled:
+        for year in previous_years(previous_year, today):
+            windows.append({'name': f"y{year}", 'start': f"01/01/{year}", 'end': f"31/12/{year}"})
+    # Siempre al menos una ventana: el flujo original (YTD)
+    return windows or [{'name': 'ytd', 'start': None, 'end': None}]
+
+
+def window_columns(windows):
+    """
+    Columnas extra del archivo de resultados para las ventanas secundarias
+
+    Returns:
+        list: <ventana>_<métrica> y <ventana>_result por cada ventana salvo la primera
+    """
+    columns = []
+    for window in windows[1:]:
+        columns.extend(f"{window['name']}_{metric}" for metric in METRIC_NAMES)
+        columns.append(f"{window['name']}_result")
+    return columns
@@ -0,0 +1,706 @@
+"""
+Modo coordinador / trabajadores en varias máquinas
+==================================================
+
+El proceso que ejecuta AutoOmegaBot hace de coordinador: lee el archivo de
+links, sirve los trabajos por HTTP y es el único escritor de resultados.
+Los trabajadores (procesos sin interfaz en esta u otras máquinas) piden
+trabajos, los ejecutan con el motor asíncrono y devuelven cada resultado.
+
+Cada trabajo entregado queda con un lease que el trabajador renueva con
+heartbeats. Si un trabajador deja de dar señales, sus leases caducan y los
+trabajos vuelven a la cola; tras max_job_attempts entregas perdidas el
+trabajo se registra como error. Un resultado que llega dos veces (trabajo
+reentregado y trabajador original que se recupera) se escribe una sola vez.
+
+Protocolo (HTTP + JSON):
+    GET  /options    argumentos para construir el bot del trabajador
+    POST /lease      {worker, max_jobs} -> {jobs: [[índice, url, parámetros]], finished}
+    POST /heartbeat  {worker} renueva los leases del trabajador
+    POST /result     {worker, index, record}
+    POST /done       {worker, stats}
+
+La contraseña de login no se envía a los trabajadores: cada uno la toma de
+OMEGABOT_PASSWORD. El límite de tasa es por máquina (archivo SQLite local).
+
+El coordinador escucha por defecto en 127.0.0.1:8770. Para aceptar otras
+máquinas (--host 0.0.0.0 o una IP de la red) es obligatorio un token
+(--token, OMEGABOT_COORDINATOR_TOKEN o coordinator_token): sin él cualquiera
+que alcance el puerto podría pedir trabajos y enviar resultados.
+
+Uso en una sola máquina (coordinador + 3 trabajadores locales):
+    python -m Bot.distributed coordinator --links links.csv --output out.csv --local-workers 3
+
+Coordinador para otras máquinas y un trabajador remoto:
+    python -m Bot.distributed coordinator --links links.csv --output out.csv --host 0.0.0.0 --token SECRETO
+    python -m Bot.distributed worker --coordinator http://192.168.1.10:8770 --token SECRETO
+"""
+
+import argparse
+import hmac
+import ipaddress
+import json
+import os
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from Bot.sharded_runner import sum_worker_stats
+
+TOKEN_HEADER = 'X-OmegaBot-Token'
+TOKEN_ENV = 'OMEGABOT_COORDINATOR_TOKEN'
+DEFAULT_COORDINATOR_PORT = 8770
+
+# Claves de config.json que no salen del coordinador
+_PRIVATE_CONFIG_KEYS = ('login_password',)
+
+
+def is_loopback(host):
+    """True si `host` solo acepta conexiones de esta máquina"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        # '' / '0.0.0.0' no llegan aquí como loopback; un nombre de host tampoco
+        return False
+
+
+class JobQueue:
+    """
+    Cola de trabajos con leases
+
+    Args:
+        jobs (iterable): Tuplas (índice, url, parámetros)
+        lease_seconds (float): Vigencia de un lease sin heartbeat
+        max_attempts (int): Entregas perdidas antes de dar el trabajo por fallido
+    """
+
+    def __init__(self, jobs, lease_seconds=120.0, max_attempts=3):
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = max(1, int(max_attempts))
+        self._jobs = {}
+        for index, url, params in jobs:
+            self._jobs[index] = (index, url, params)
+        self._pending = deque(self._jobs)
+        self._leases = {}
+        self._attempts = {}
+        self._completed = set()
+        self._workers = {}
+        self._finished_workers = set()
+        self._lock = threading.Lock()
+
+        self.requeued = 0
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self._jobs)
+
+    @property
+    def finished(self):
+        with self._lock:
+            return len(self._completed) == len(self._jobs)
+
+    def _touch(self, worker, now):
+        self._workers[worker] = now
+
+    def lease(self, worker, max_jobs, now=None):
+        """
+        Entregar hasta `max_jobs` trabajos pendientes a un trabajador
+
+        Returns:
+            list: Tuplas (índice, url, parámetros) entregadas
+        """
+        now = time.monotonic() if now is None else now
+        leased = []
+        with self._lock:
+            self._touch(worker, now)
+            while self._pending and len(leased) < max(1, int(max_jobs)):
+                index = self._pending.popleft()
+                if index in self._completed or index in self._leases:
+                    continue
+                self._leases[index] = (worker, now + self.lease_seconds)
+                self._attempts[index] = self._attempts.get(index, 0) + 1
+                leased.append(self._jobs[index])
+        return leased
+
+    def heartbeat(self, worker, now=None):
+        """Renovar todos los leases del trabajador"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._touch(worker, now)
+            expires = now + self.lease_seconds
+            for index, (owner, _) in list(self._leases.items()):
+                if owner == worker:
+                    self._leases[index] = (owner, expires)
+
+    def complete(self, worker, index, now=None):
+        """
+        Marcar un trabajo como terminado
+
+        Returns:
+            bool: True si es el primer resultado de ese trabajo
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._touch(worker, now)
+            if index not in self._jobs or index in self._completed:
+                self.duplicates += 1
+                return False
+            self._leases.pop(index, None)
+            self._completed.add(index)
+            return True
+
+    def worker_done(self, worker):
+        with self._lock:
+            self._finished_workers.add(worker)
+
+    def expire(self, now=None):
+        """
+        Devolver a la cola los trabajos con el lease caducado
+
+        Los reentregados van al principio de la cola: ya esperaron una vez.
+
+        Returns:
+            list: Trabajos (índice, url, parámetros) que agotaron sus entregas;
+                quedan marcados como terminados y el llamador registra el error
+        """
+        now = time.monotonic() if now is None else now
+        failed = []
+        requeue = []
+        with self._lock:
+            for index, (worker, expires) in sorted(self._leases.items()):
+                if expires > now:
+                    continue
+                del self._leases[index]
+                if self._attempts.get(index, 0) >= self.max_attempts:
+                    self._completed.add(index)
+                    failed.append(self._jobs[index])
+                else:
+                    requeue.append(index)
+            self._pending.extendleft(reversed(requeue))
+            self.requeued += len(requeue)
+        return failed
+
+    def active_workers(self, now=None):
+        """Trabajadores con señales recientes que aún no se despidieron"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return [worker for worker, seen in self._workers.items()
+                    if worker not in self._finished_workers
+                    and now - seen < self.lease_seconds]
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'jobs_requeued': self.requeued,
+                'duplicate_results': self.duplicates,
+                'workers_seen': len(self._workers),
+            }
+
+
+class Coordinator:
+    """
+    Servidor de trabajos del modo distribuido
+
+    Los hilos del servidor HTTP solo dejan los resultados en una cola; el
+    hilo que llama a run() los entrega a `on_result`, así el escritor y el
+    journal siguen teniendo un único hilo escritor.
+
+    Args:
+        bot (AutoOmegaBot): Bot del coordinador
+        host (str): Interfaz de escucha ("0.0.0.0" para aceptar otras máquinas)
+        port (int): Puerto fijo que usan los trabajadores (0 = uno libre, solo
+            útil con trabajadores locales)
+        lease_seconds (float): Vigencia de un lease sin heartbeat
+        heartbeat_seconds (float): Intervalo de heartbeat que usan los trabajadores
+        max_attempts (int): Entregas perdidas antes de dar un trabajo por fallido
+        token (str): Secreto compartido; vacío = sin autenticación, permitido
+            solo si host es de loopback
+    """
+
+    def __init__(self, bot, host='127.0.0.1', port=DEFAULT_COORDINATOR_PORT, lease_seconds=120.0,
+                 heartbeat_seconds=15.0, max_attempts=3, token=''):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.lease_seconds = float(lease_seconds)
+        self.heartbeat_seconds = float(heartbeat_seconds)
+        self.max_attempts = max(1, int(max_attempts))
+        self.token = token or ''
+
+        self.jobs = None
+        self.worker_stats = {}
+        self._results = queue.Queue()
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, bot, config):
+        return cls(
+            bot,
+            host=config.get('coordinator_host', '127.0.0.1'),
+            port=int(config.get('coordinator_port', DEFAULT_COORDINATOR_PORT)),
+            lease_seconds=float(config.get('lease_seconds', 120)),
+            heartbeat_seconds=float(config.get('heartbeat_seconds', 15)),
+            max_attempts=int(config.get('max_job_attempts', 3)),
+            token=config.get('coordinator_token') or os.environ.get(TOKEN_ENV, ''),
+        )
+
+    # -------------------------------------------------------------------------
+    # Ciclo de vida
+    # -------------------------------------------------------------------------
+
+    def start(self):
+        if not self.token and not is_loopback(self.host):
+            raise ValueError(f"El coordinador escucha en {self.host or 'todas las interfaces'}: "
+                             f"se requiere un token (--token, {TOKEN_ENV} o coordinator_token)")
+        coordinator = self
+
+        class Handler(_CoordinatorHandler):
+            server_coordinator = coordinator
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    @property
+    def base_url(self):
+        host = socket.gethostname() if self.host in ('0.0.0.0', '') else self.host
+        return f"http://{host}:{self.port}"
+
+    def run(self, jobs, on_result):
+        """
+        Servir los trabajos hasta tener un resultado de cada uno
+
+        Args:
+            jobs (iterable): Tuplas (índice_global, url, parámetros)
+            on_result (callable): Llamada con (índice_global, resultado)
+
+        Returns:
+            dict: Estadísticas agregadas de los trabajadores y de la cola
+        """
+        self.jobs = JobQueue(jobs, self.lease_seconds, self.max_attempts)
+        remaining = len(self.jobs)
+        if self._server is None:
+            self.start()
+        print(f"🛰️ Coordinador en {self.base_url}: {remaining} trabajos a repartir")
+
+        try:
+            next_expire = time.monotonic() + 1.0
+            while remaining and not self.bot.cancelled:
+                try:
+                    index, record = self._results.get(timeout=0.5)
+                except queue.Empty:
+                    pass
+                else:
+                    on_result(index, record)
+                    remaining -= 1
+
+                if time.monotonic() >= next_expire:
+                    next_expire = time.monotonic() + 1.0
+                    for index, url, params in self.jobs.expire():
+                        error = RuntimeError(
+                            f"Trabajo perdido en {self.max_attempts} trabajadores (sin heartbeat)")
+                        on_result(index, self.bot.make_result(url, error=error, params=params))
+                        remaining -= 1
+
+            if not self.bot.cancelled:
+                self._wait_workers()
+        finally:
+            self.stop()
+        return self.get_stats()
+
+    def _wait_workers(self):
+        # Dar tiempo a los trabajadores a enviar sus estadísticas finales
+        deadline = time.monotonic() + self.heartbeat_seconds * 2
+        while self.jobs.active_workers() and time.monotonic() < deadline:
+            time.sleep(0.2)
+
+    def get_stats(self):
+        with self._lock:
+            stats = sum_worker_stats(self.worker_stats.values())
+        if self.jobs is not None:
+            stats.update(self.jobs.get_stats())
+        return stats
+
+    # -------------------------------------------------------------------------
+    # Peticiones de los trabajadores
+    # -------------------------------------------------------------------------
+
+    def authorized(self, token):
+        return not self.token or hmac.compare_digest(token or '', self.token)
+
+    def get_options(self):
+        options = self.bot.get_worker_options()
+        options['config'] = {key: value for key, value in options['config'].items()
+                             if key not in _PRIVATE_CONFIG_KEYS}
+        return {
+            'bot': options,
+            'concurrency': self.bot.concurrency,
+            'heartbeat_seconds': self.heartbeat_seconds,
+        }
+
+    def handle_lease(self, payload):
+        jobs = self.jobs.lease(payload['worker'], payload.get('max_jobs', 1))
+        return {'jobs': [list(job) for job in jobs], 'finished': self.jobs.finished}
+
+    def handle_heartbeat(self, payload):
+        self.jobs.heartbeat(payload['worker'])
+        return {'finished': self.jobs.finished}
+
+    def handle_result(self, payload):
+        index = int(payload['index'])
+        accepted = self.jobs.complete(payload['worker'], index)
+        if accepted:
+            self._results.put((index, payload['record']))
+        return {'accepted': accepted}
+
+    def handle_done(self, payload):
+        self.jobs.worker_done(payload['worker'])
+        with self._lock:
+            self.worker_stats[payload['worker']] = payload.get('stats') or {}
+        return {'ok': True}
+
+
+class _CoordinatorHandler(BaseHTTPRequestHandler):
+    server_coordinator = None
+
+    _ROUTES = {
+        '/lease': 'handle_lease',
+        '/heartbeat': 'handle_heartbeat',
+        '/result': 'handle_result',
+        '/done': 'handle_done',
+    }
+
+    def log_message(self, format, *args):
+        # Sin una línea por petición: cada trabajo genera varias
+        pass
+
+    def do_GET(self):
+        coordinator = self.server_coordinator
+        if not coordinator.authorized(self.headers.get(TOKEN_HEADER)):
+            self._send(403, {'error': 'forbidden'})
+            return
+        if urlsplit(self.path).path != '/options':
+            self._send(404, {'error': 'not found'})
+            return
+        self._send(200, coordinator.get_options())
+
+    def do_POST(self):
+        coordinator = self.server_coordinator
+        if not coordinator.authorized(self.headers.get(TOKEN_HEADER)):
+            self._send(403, {'error': 'forbidden'})
+            return
+        handler = self._ROUTES.get(urlsplit(self.path).path)
+        if handler is None or coordinator.jobs is None:
+            self._send(404, {'error': 'not found'})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            response = getattr(coordinator, handler)(payload)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {'error': f"{type(e).__name__}: {e}"})
+            return
+        self._send(200, response)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class CoordinatorClient:
+    """
+    Cliente HTTP del coordinador para un trabajador
+
+    Args:
+        base_url (str): URL del coordinador (http://host:puerto)
+        worker_id (str, optional): Identificador; por defecto host-pid
+        token (str): Secreto compartido con el coordinador
+        timeout (float): Timeout de cada petición en segundos
+    """
+
+    def __init__(self, base_url, worker_id=None, token='', timeout=30.0):
+        self.base_url = base_url.rstrip('/')
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.token = token or ''
+        self.timeout = timeout
+
+    def _call(self, path, payload=None):
+        data = None
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers[TOKEN_HEADER] = self.token
+        if payload is not None:
+            payload = dict(payload, worker=self.worker_id)
+            data = json.dumps(payload, default=str).encode('utf-8')
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read() or b'{}')
+
+    def options(self):
+        return self._call('/options')
+
+    def lease(self, max_jobs):
+        return self._call('/lease', {'max_jobs': max_jobs})
+
+    def heartbeat(self):
+        return self._call('/heartbeat', {})
+
+    def send_result(self, index, record):
+        return self._call('/result', {'index': index, 'record': record})
+
+    def done(self, stats):
+        return self._call('/done', {'stats': stats})
+
+
+async def _heartbeat_loop(client, interval):
+    import asyncio
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(client.heartbeat)
+        except Exception as e:
+            print(f"Error enviando heartbeat: {e}")
+
+
+async def run_worker_async(bot, client, concurrency, heartbeat_seconds=15.0,
+                           poll_seconds=1.0, connect_timeout=60.0):
+    """
+    Pedir y ejecutar trabajos del coordinador hasta que no quede ninguno
+
+    Los trabajos se piden solo cuando hay páginas libres, tantos como huecos
+    haya, de modo que ningún trabajo espera en un trabajador ocupado
+    mientras otro está parado.
+
+    Args:
+        bot (AutoOmegaBot): Bot que define el flujo por página
+        client (CoordinatorClient): Conexión con el coordinador
+        concurrency (int): Páginas simultáneas
+        heartbeat_seconds (float): Intervalo de renovación de los leases
+        poll_seconds (float): Espera cuando la cola está vacía pero no terminada
+        connect_timeout (float): Tiempo sin respuesta del coordinador antes de salir
+
+    Returns:
+        dict: Estadísticas del pool y del bot
+    """
+    import asyncio
+
+    concurrency = max(1, int(concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    async with bot.create_async_pool() as pool:
+        heartbeat = asyncio.create_task(_heartbeat_loop(client, heartbeat_seconds))
+
+        async def worker(index, url, params):
+            try:
+                try:
+                    record = await bot.run_backtest_async(pool, url, params)
+                except Exception as e:
+                    record = bot.make_result(url, error=e, params=params)
+                try:
+                    await asyncio.to_thread(client.send_result, index, record)
+                except Exception as e:
+                    # El lease caducará y el coordinador lo reentregará
+                    print(f"Error enviando resultado de {url}: {e}")
+            finally:
+                semaphore.release()
+
+        unreachable_since = None
+        try:
+            while True:
+                # Al menos un hueco libre, más los que ya estén libres
+                await semaphore.acquire()
+                slots = 1
+                while slots < concurrency and not semaphore.locked():
+                    await semaphore.acquire()
+                    slots += 1
+
+                try:
+                    reply = await asyncio.to_thread(client.lease, slots)
+                    unreachable_since = None
+                except Exception as e:
+                    for _ in range(slots):
+                        semaphore.release()
+                    unreachable_since = unreachable_since or time.monotonic()
+                    if time.monotonic() - unreachable_since > connect_timeout:
+                        print(f"❌ Coordinador inaccesible: {e}")
+                        break
+                    await asyncio.sleep(poll_seconds)
+                    continue
+
+                jobs = reply.get('jobs') or []
+                for _ in range(slots - len(jobs)):
+                    semaphore.release()
+                for index, url, params in jobs:
+                    task = asyncio.create_task(worker(index, url, params))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                if not jobs:
+                    if reply.get('finished'):
+                        break
+                    # Trabajos entregados a otros aún en curso: pueden volver a la cola
+                    await asyncio.sleep(poll_seconds)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            heartbeat.cancel()
+            bot.close_io()
+        return dict(pool.get_stats(), **bot.get_engine_stats())
+
+
+def run_worker(coordinator_url, worker_id=None, token='', concurrency=None, connect_timeout=60.0):
+    """
+    Ejecutar un trabajador sin interfaz contra un coordinador
+
+    La configuración del bot (parámetros del backtest, caché, filtros...) se
+    toma del coordinador, así todos los trabajadores ejecutan lo mismo.
+
+    Returns:
+        dict: Estadísticas del trabajador
+    """
+    import asyncio
+    from Bot.bot import AutoOmegaBot
+
+    client = CoordinatorClient(coordinator_url, worker_id=worker_id, token=token)
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            options = client.options()
+            break
+        except Exception as e:
+            # El coordinador puede estar arrancando todavía
+            if time.monotonic() > deadline:
+                print(f"❌ No se pudo conectar con el coordinador {coordinator_url}: {e}")
+                return {}
+            time.sleep(1.0)
+
+    bot = AutoOmegaBot(**options['bot'])
+    print(f"🛠️ Trabajador {client.worker_id} conectado a {coordinator_url}")
+    stats = {}
+    try:
+        stats = asyncio.run(run_worker_async(
+            bot, client, concurrency or options['concurrency'],
+            heartbeat_seconds=options['heartbeat_seconds'], connect_timeout=connect_timeout))
+        client.done(dict(stats, step_samples=bot.step_timeouts.export()))
+    except Exception as e:
+        print(f"Error en el trabajador {client.worker_id}: {e}")
+    finally:
+        if bot.cache is not None:
+            bot.cache.close()
+        if bot.rate_limiter is not None:
+            bot.rate_limiter.close()
+        bot.latency_history.close()
+    print(f"✅ Trabajador {client.worker_id} terminado")
+    return stats
+
+
+def spawn_local_workers(coordinator_url, count, token=''):
+    """
+    Lanzar `count` trabajadores en esta máquina como procesos independientes
+
+    Returns:
+        list: Procesos (subprocess.Popen) lanzados
+    """
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, '-m', 'Bot.distributed', 'worker', '--coordinator', coordinator_url]
+    if token:
+        command += ['--token', token]
+    return [subprocess.Popen(command + ['--worker-id', f"local-{n}"], cwd=src_dir)
+            for n in range(max(0, int(count)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AutoOmegaBot distribuido: coordinador y trabajadores")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    worker = commands.add_parser('worker', help="Pedir y ejecutar trabajos de un coordinador")
+    worker.add_argument('--coordinator', required=True, help="URL del coordinador (http://host:puerto)")
+    worker.add_argument('--worker-id', default=None)
+    worker.add_argument('--token', default=os.environ.get(TOKEN_ENV, ''))
+    worker.add_argument('--concurrency', type=int, default=None,
+                        help="Páginas simultáneas (por defecto la del coordinador)")
+
+    coordinator = commands.add_parser('coordinator', help="Servir un archivo de links a trabajadores")
+    coordinator.add_argument('--links', required=True, help="Archivo de links (xlsx, xls o csv)")
+    coordinator.add_argument('--output', required=True, help="Archivo de resultados")
+    coordinator.add_argument('--previous-year', default=None)
+    coordinator.add_argument('--host', default=None,
+                             help="Interfaz de escucha (por defecto 127.0.0.1; 0.0.0.0 para otras máquinas)")
+    coordinator.add_argument('--port', type=int, default=None,
+                             help=f"Puerto (por defecto coordinator_port o {DEFAULT_COORDINATOR_PORT})")
+    coordinator.add_argument('--token', default=os.environ.get(TOKEN_ENV) or None,
+                             help="Secreto compartido con los trabajadores; obligatorio fuera de loopback")
+    coordinator.add_argument('--local-workers', type=int, default=0,
+                             help="Trabajadores a lanzar en esta máquina")
+    coordinator.add_argument('--resume', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        run_worker(args.coordinator, worker_id=args.worker_id, token=args.token,
+                   concurrency=args.concurrency)
+        return
+
+    from Bot.bot import AutoOmegaBot
+    from Utiles.utils import load_config
+
+    config = load_config()
+    config['distributed_enabled'] = True
+    if args.host is not None:
+        config['coordinator_host'] = args.host
+    if args.port is not None:
+        config['coordinator_port'] = args.port
+    if args.token is not None:
+        config['coordinator_token'] = args.token
+    host = config.get('coordinator_host', '127.0.0.1')
+    if not config.get('coordinator_token') and not is_loopback(host):
+        parser.error(f"--host {host} acepta otras máquinas: indica --token (o {TOKEN_ENV})")
+
+    bot = AutoOmegaBot(args.links, args.output, args.previous_year, config=config,
+                       resume=args.resume)
+    local_host = '127.0.0.1' if host in ('0.0.0.0', '') else host
+    url = f"http://{local_host}:{config.get('coordinator_port', DEFAULT_COORDINATOR_PORT)}"
+    # Los trabajadores reintentan la conexión mientras el coordinador arranca
+    workers = spawn_local_workers(url, args.local_workers, config.get('coordinator_token', ''))
+    try:
+        bot.execute()
+    finally:
+        for process in workers:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.terminate()
+
+
+if __name__ == '__main__':
+    main()
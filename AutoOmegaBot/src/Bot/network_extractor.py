@@ -0,0 +1,198 @@
+"""
+Extracción de resultados desde la respuesta de red
+==================================================
+
+En lugar de esperar a que la página pinte el resultado y leer su texto,
+se escucha la respuesta XHR/fetch de la API del backtest y se convierte su
+JSON directamente en métricas numéricas.
+
+Los nombres de campo de la API pueden variar (profitLoss, pnl, sharpe...),
+por eso cada métrica se busca por una lista de alias en todo el JSON. Una
+respuesta sin ninguna métrica no cuenta como resultado: se lee el DOM.
+
+El win rate se guarda siempre como fracción (0.65), llegue como "65%", 65
+o 0.65.
+"""
+
+import re
+
+# Alias de cada métrica, comparados sin mayúsculas ni separadores
+METRIC_ALIASES = {
+    'profit_loss': ('profit_loss', 'pnl', 'pl', 'net_profit', 'total_profit', 'profit'),
+    'win_rate': ('win_rate', 'win_pct', 'win_percentage', 'winning_rate'),
+    'max_drawdown': ('max_drawdown', 'mdd', 'drawdown', 'max_dd'),
+    'sharpe_ratio': ('sharpe_ratio', 'sharpe'),
+}
+
+METRIC_NAMES = tuple(METRIC_ALIASES)
+
+# Métricas que son una proporción: siempre en fracción
+RATE_METRICS = ('win_rate',)
+
+DEFAULT_RESULT_API_PATTERN = r'/api/.*backtest'
+
+
+def _normalize_key(key):
+    return re.sub(r'[^a-z0-9]', '', str(key).lower())
+
+
+_ALIAS_LOOKUP = {
+    _normalize_key(alias): metric
+    for metric, aliases in METRIC_ALIASES.items()
+    for alias in aliases
+}
+
+
+def to_number(value):
+    """
+    Convertir un valor de la API a float
+
+    Acepta números y textos como "1,250.50", "$-350", "65%" (este último
+    se devuelve como 0.65).
+
+    Returns:
+        float: Valor numérico o None si no se puede convertir
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    is_percent = text.endswith('%')
+    text = re.sub(r'[^0-9eE+\-.]', '', text)
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return number / 100 if is_percent else number
+
+
+def to_metric(name, value):
+    """
+    Convertir el valor de una métrica a float en su unidad común
+
+    to_number() ya convierte "65%" en 0.65; en una tasa, un número mayor
+    que 1 (65 o "65") es un porcentaje y también se pasa a fracción.
+
+    Returns:
+        float: Valor numérico o None si no se puede convertir
+    """
+    number = to_number(value)
+    if number is not None and name in RATE_METRICS and abs(number) > 1:
+        return number / 100
+    return number
+
+
+def parse_backtest_payload(payload):
+    """
+    Extraer las métricas del backtest de un JSON de la API
+
+    La búsqueda es en anchura, así que un campo de primer nivel tiene
+    prioridad sobre uno anidado con el mismo alias.
+
+    Args:
+        payload (dict|list): JSON decodificado de la respuesta
+
+    Returns:
+        dict: Métricas encontradas (profit_loss, win_rate, max_drawdown,
+            sharpe_ratio); las ausentes quedan en None
+    """
+    metrics = dict.fromkeys(METRIC_NAMES)
+    queue = [payload]
+    while queue and any(value is None for value in metrics.values()):
+        node = queue.pop(0)
+        if isinstance(node, dict):
+            for key, value in node.items():
+                metric = _ALIAS_LOOKUP.get(_normalize_key(key))
+                if metric and metrics[metric] is None:
+                    metrics[metric] = to_metric(metric, value)
+                if isinstance(value, (dict, list)):
+                    queue.append(value)
+        elif isinstance(node, list):
+            queue.extend(item for item in node if isinstance(item, (dict, list)))
+    return metrics
+
+
+class NetworkResultExtractor:
+    """
+    Reconoce la respuesta de la API del backtest y la convierte en métricas
+
+    La espera de la respuesta tiene su propio paso adaptativo, "api_response"
+    (ver Bot/step_timing.py), separado de la lectura del DOM. Si la API no
+    responde en varias esperas seguidas (patrón mal configurado, API que no
+    existe) la extracción por red se desactiva para el resto de la ejecución.
+
+    Args:
+        url_pattern (str): Expresión regular que identifica la URL de la API
+        max_consecutive_fallbacks (int): Esperas seguidas sin respuesta antes
+            de desactivarse; 0 para no desactivarse nunca
+    """
+
+    def __init__(self, url_pattern=DEFAULT_RESULT_API_PATTERN, max_consecutive_fallbacks=5):
+        self.url_pattern = re.compile(url_pattern)
+        self.max_consecutive_fallbacks = max(0, int(max_consecutive_fallbacks))
+        self.enabled = True
+
+        self.network_hits = 0
+        self.dom_fallbacks = 0
+        self.consecutive_fallbacks = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Crear el extractor desde config.json
+
+        Returns:
+            NetworkResultExtractor: Extractor, o None si extraction_mode es "dom"
+        """
+        if config.get('extraction_mode', 'network') != 'network':
+            return None
+        return cls(
+            url_pattern=config.get('result_api_pattern') or DEFAULT_RESULT_API_PATTERN,
+            max_consecutive_fallbacks=config.get('network_fallback_limit', 5),
+        )
+
+    def matches(self, response):
+        """Predicado para page.expect_response()"""
+        request = response.request
+        return (
+            request.resource_type in ('xhr', 'fetch')
+            and response.ok
+            and bool(self.url_pattern.search(response.url))
+        )
+
+    def build_result(self, payload):
+        """
+        Construir el resultado estructurado de una respuesta
+
+        Returns:
+            dict: Métricas más el JSON original en 'raw', o None si la
+                respuesta no trae ninguna métrica (otro JSON que coincide con
+                el patrón): entonces se lee el DOM
+        """
+        result = parse_backtest_payload(payload)
+        if all(value is None for value in result.values()):
+            return None
+        result['raw'] = payload
+        self.network_hits += 1
+        self.consecutive_fallbacks = 0
+        return result
+
+    def record_fallback(self):
+        """
+        Registrar una espera sin respuesta de la API
+
+        Returns:
+            bool: True si con esta espera se desactiva la extracción por red
+        """
+        self.dom_fallbacks += 1
+        self.consecutive_fallbacks += 1
+        if (self.enabled and self.max_consecutive_fallbacks
+                and self.consecutive_fallbacks >= self.max_consecutive_fallbacks):
+            self.enabled = False
+            return True
+        return False
+
+    def get_stats(self):
+        return {'network_extractions': self.network_hits, 'dom_fallbacks': self.dom_fallbacks,
+                'network_disabled': int(not self.enabled)}
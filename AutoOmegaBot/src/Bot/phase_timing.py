@@ -0,0 +1,212 @@
+"""
+Tiempos por fase de cada URL
+============================
+
+Cada backtest se descompone en fases:
+
+    acquire       obtener página del pool (incluye esperar hueco en vuelo)
+    navigation    page.goto de la URL
+    new_backtest  clic en "New Backtest"
+    fill          YTD y parámetros del formulario
+    run           clic en "Run"
+    result_wait   desde el clic hasta la respuesta o el elemento de resultado
+    extraction    leer el JSON de la API o el texto del resultado
+    write         journal + escritor de resultados (proceso principal)
+
+PhaseTimer mide las fases de una URL (sumando los reintentos) y viaja dentro
+del registro de resultado como 'timings', de modo que el proceso principal
+agrega también lo medido en otros procesos. PhaseTimingRecorder alimenta
+un histograma estilo HDR por fase y exporta los tiempos a la carpeta de logs.
+"""
+
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+
+PHASE_NAMES = ('acquire', 'navigation', 'new_backtest', 'fill', 'run',
+               'result_wait', 'extraction', 'write')
+
+
+class PhaseTimer:
+    """Acumula la duración de cada fase de una URL (en segundos)"""
+
+    def __init__(self):
+        self.durations = {}
+        self._started = {}
+
+    def start(self, phase):
+        self._started[phase] = time.perf_counter()
+
+    def stop(self, phase):
+        started = self._started.pop(phase, None)
+        if started is not None:
+            self.add(phase, time.perf_counter() - started)
+
+    def add(self, phase, seconds):
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        """Medir un bloque; también cuenta si el bloque falla"""
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def as_ms(self):
+        """Duraciones en ms, listas para el registro de resultado"""
+        return {phase: round(seconds * 1000, 3) for phase, seconds in self.durations.items()}
+
+
+class PhaseHistogram:
+    """
+    Histograma log-lineal estilo HDR
+
+    Los valores (µs) se agrupan en cubos cuyo ancho crece con la magnitud,
+    con un error relativo acotado (< 1% con 2 dígitos significativos) y una
+    memoria que depende del rango de valores, no del número de muestras.
+    Dos histogramas se combinan sumando sus cubos.
+
+    Args:
+        significant_digits (int): Dígitos significativos conservados
+    """
+
+    def __init__(self, significant_digits=2):
+        self.sub_bucket_bits = (2 * 10 ** significant_digits).bit_length()
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def _bucket(self, value_us):
+        shift = max(0, value_us.bit_length() - self.sub_bucket_bits)
+        return (value_us >> shift) << shift
+
+    def record(self, seconds):
+        value_us = max(0, int(seconds * 1_000_000))
+        bucket = self._bucket(value_us)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = max(self.max_us, value_us)
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+
+    def value_at_percentile(self, pct):
+        """
+        Valor (µs) por debajo del cual queda el `pct` % de las muestras
+
+        Returns:
+            int: Límite inferior del cubo, o None si no hay muestras
+        """
+        if not self.count:
+            return None
+        target = max(1, int(round(self.count * pct / 100.0)))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(bucket, self.max_us)
+        return self.max_us
+
+    def summary(self):
+        def ms(value_us):
+            return round(value_us / 1000, 1) if value_us is not None else None
+
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.total_us / self.count) if self.count else None,
+            'p50_ms': ms(self.value_at_percentile(50)),
+            'p90_ms': ms(self.value_at_percentile(90)),
+            'p99_ms': ms(self.value_at_percentile(99)),
+            'max_ms': ms(self.max_us) if self.count else None,
+        }
+
+
+class PhaseTimingRecorder:
+    """
+    Agrega los tiempos por fase de la ejecución y los exporta
+
+    Los tiempos crudos se escriben por filas a un CSV de la carpeta de logs a
+    medida que llegan; al cerrar se escribe un JSON con los percentiles y los
+    cubos de cada histograma.
+
+    Args:
+        logs_folder (str): Carpeta donde se exportan los archivos
+        run_id (str): Sufijo de los archivos (por defecto fecha y hora)
+    """
+
+    def __init__(self, logs_folder, run_id=None):
+        self.run_id = run_id or time.strftime('%Y%m%d_%H%M%S')
+        self.csv_path = os.path.join(logs_folder, f"phase_timings_{self.run_id}.csv")
+        self.json_path = os.path.join(logs_folder, f"phase_timings_{self.run_id}.json")
+        self.histograms = {phase: PhaseHistogram() for phase in PHASE_NAMES}
+        self._file = None
+        self._writer = None
+
+    def open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.csv_path)), exist_ok=True)
+            self._file = open(self.csv_path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(['url', 'sweep_key', 'status'] +
+                                  [f"{phase}_ms" for phase in PHASE_NAMES])
+        return self
+
+    def record(self, record, write_seconds):
+        """
+        Registrar los tiempos de un resultado
+
+        Args:
+            record (dict): Resultado con 'timings' (fase -> ms)
+            write_seconds (float): Duración de la fase write en este proceso
+        """
+        timings = dict(record.get('timings') or {})
+        timings['write'] = round(write_seconds * 1000, 3)
+        for phase, value_ms in timings.items():
+            histogram = self.histograms.get(phase)
+            if histogram is not None:
+                histogram.record(value_ms / 1000)
+
+        self.open()
+        self._writer.writerow([record.get('url'), record.get('sweep_key', ''), record.get('status')] +
+                              [timings.get(phase, '') for phase in PHASE_NAMES])
+
+    def get_stats(self):
+        """
+        Percentiles por fase
+
+        Returns:
+            dict: fase -> {count, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}
+        """
+        return {phase: histogram.summary()
+                for phase, histogram in self.histograms.items() if histogram.count}
+
+    def close(self):
+        """Cerrar el CSV y escribir el resumen JSON"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        export = {
+            'run_id': self.run_id,
+            'raw_csv': os.path.basename(self.csv_path),
+            'phases': self.get_stats(),
+            'histograms_us': {phase: {str(bucket): count for bucket, count in sorted(h.counts.items())}
+                              for phase, h in self.histograms.items() if h.count},
+        }
+        with open(self.json_path, 'w', encoding='utf-8') as f:
+            json.dump(export, f, indent=2)
+        print(f"💾 Tiempos por fase exportados en {self.csv_path}")
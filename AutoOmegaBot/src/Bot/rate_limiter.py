@@ -0,0 +1,278 @@
+"""
+Limitador de tasa compartido por dominio
+========================================
+
+Con ejecuciones en paralelo (motor asíncrono, varios procesos o varias
+instancias del bot) es fácil superar lo que la plataforma de backtest
+tolera. RateLimiter aplica por dominio:
+
+- Un token bucket (peticiones/segundo con ráfaga máxima) delante de cada
+  page.goto y de cada clic en "Run"
+- Un máximo de backtests en vuelo a la vez
+
+El estado vive en un archivo SQLite, así que el límite es global para todos
+los hilos y procesos de la máquina que usan el mismo archivo. Los huecos en
+vuelo son concesiones con caducidad: si un proceso muere sin liberarlas, se
+recuperan solas.
+
+Un dominio configurado en rate_limits comparte bucket y huecos con todos sus
+subdominios (app.x.com y api.x.com cuentan contra "x.com"); los demás hosts
+usan los límites "default", cada uno con su propio bucket.
+
+Las variantes asíncronas hacen las transacciones SQLite en un hilo aparte
+(asyncio.to_thread): esperar el bloqueo de otro proceso no detiene el
+bucle de eventos.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+
+DEFAULT_LIMITS = {'rps': 2.0, 'burst': 5, 'max_in_flight': 10}
+
+
+class RateLimiter:
+    """
+    Token bucket y límite de concurrencia por dominio, entre hilos y procesos
+
+    Args:
+        path (str): Archivo SQLite con el estado compartido
+        limits (dict): {"default": {...}, "dominio.com": {...}} con claves
+            rps, burst y max_in_flight (0 = sin límite)
+        lease_seconds (float): Caducidad de un hueco en vuelo no liberado
+    """
+
+    def __init__(self, path, limits=None, lease_seconds=600.0):
+        self.path = path
+        self.limits = {'default': dict(DEFAULT_LIMITS)}
+        for domain, values in (limits or {}).items():
+            merged = dict(DEFAULT_LIMITS)
+            merged.update(values or {})
+            self.limits[domain.lower()] = merged
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        # Conexiones de todos los hilos (incluidos los de asyncio.to_thread) para close()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config, path):
+        """
+        Crear el limitador desde config.json
+
+        Returns:
+            RateLimiter: Limitador, o None si rate_limit_enabled es False
+        """
+        if not config.get('rate_limit_enabled', True):
+            return None
+        return cls(path, limits=config.get('rate_limits') or {})
+
+    # -------------------------------------------------------------------------
+    # Estado compartido
+    # -------------------------------------------------------------------------
+
+    def _connect(self):
+        # Una conexión por hilo: sqlite3 no comparte conexiones entre hilos
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # check_same_thread=False solo para que close() pueda cerrarla desde otro hilo
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " domain TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " id TEXT PRIMARY KEY, domain TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def bucket_for(self, domain):
+        """
+        Clave de estado compartido y límites de un host
+
+        Returns:
+            tuple: (clave, límites); la clave es el dominio configurado que
+                coincide por sufijo o, si ninguno coincide, el propio host
+        """
+        domain = (domain or '').lower()
+        for key, values in self.limits.items():
+            if key != 'default' and (domain == key or domain.endswith('.' + key)):
+                return key, values
+        return domain, self.limits['default']
+
+    def limits_for(self, domain):
+        """Límites aplicables a un dominio (coincidencia por sufijo)"""
+        return self.bucket_for(domain)[1]
+
+    def try_acquire_token(self, domain):
+        """
+        Intentar consumir un token del bucket del dominio
+
+        Returns:
+            float: 0 si se concedió; si no, segundos hasta el próximo token
+        """
+        domain, limits = self.bucket_for(domain)
+        rps = float(limits.get('rps') or 0)
+        if rps <= 0:
+            return 0.0
+        burst = max(1.0, float(limits.get('burst') or 1))
+
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE domain = ?", (domain,)
+            ).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens = min(burst, tokens + max(0.0, now - updated) * rps)
+            if tokens >= 1.0:
+                tokens -= 1.0
+                wait = 0.0
+            else:
+                wait = (1.0 - tokens) / rps
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (domain, tokens, updated) VALUES (?, ?, ?)",
+                (domain, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def try_acquire_slot(self, domain):
+        """
+        Intentar ocupar un hueco en vuelo del dominio
+
+        Returns:
+            str: Id de la concesión, o None si el dominio está al máximo
+        """
+        domain, limits = self.bucket_for(domain)
+        max_in_flight = int(limits.get('max_in_flight') or 0)
+        lease_id = uuid.uuid4().hex
+        if max_in_flight <= 0:
+            return lease_id
+
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM leases WHERE expires < ?", (now,))
+            in_flight = conn.execute(
+                "SELECT COUNT(*) FROM leases WHERE domain = ?", (domain,)
+            ).fetchone()[0]
+            if in_flight >= max_in_flight:
+                lease_id = None
+            else:
+                conn.execute(
+                    "INSERT INTO leases (id, domain, expires) VALUES (?, ?, ?)",
+                    (lease_id, domain, now + self.lease_seconds),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return lease_id
+
+    def release_slot(self, lease_id):
+        """Liberar un hueco en vuelo"""
+        if lease_id is None:
+            return
+        self._connect().execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    # -------------------------------------------------------------------------
+    # Esperas (síncronas y asíncronas)
+    # -------------------------------------------------------------------------
+
+    def wait_token(self, domain):
+        """Bloquear hasta obtener un token del dominio"""
+        wait = self.try_acquire_token(domain)
+        while wait > 0:
+            self._count_wait(wait)
+            time.sleep(wait)
+            wait = self.try_acquire_token(domain)
+
+    async def wait_token_async(self, domain):
+        """Esperar (corrutina) hasta obtener un token del dominio"""
+        wait = await asyncio.to_thread(self.try_acquire_token, domain)
+        while wait > 0:
+            self._count_wait(wait)
+            await asyncio.sleep(wait)
+            wait = await asyncio.to_thread(self.try_acquire_token, domain)
+
+    @contextmanager
+    def slot(self, domain, poll_interval=0.25):
+        """Ocupar un hueco en vuelo durante el bloque"""
+        lease_id = self.try_acquire_slot(domain)
+        while lease_id is None:
+            self._count_wait(poll_interval)
+            time.sleep(poll_interval)
+            lease_id = self.try_acquire_slot(domain)
+        try:
+            yield
+        finally:
+            self.release_slot(lease_id)
+
+    @asynccontextmanager
+    async def slot_async(self, domain, poll_interval=0.25):
+        """Versión asíncrona de slot()"""
+        lease_id = await self._acquire_slot_async(domain)
+        while lease_id is None:
+            self._count_wait(poll_interval)
+            await asyncio.sleep(poll_interval)
+            lease_id = await self._acquire_slot_async(domain)
+        try:
+            yield
+        finally:
+            # Una cancelación durante la espera no impide liberar el hueco
+            await asyncio.shield(asyncio.to_thread(self.release_slot, lease_id))
+
+    async def _acquire_slot_async(self, domain):
+        # Cancelar la corrutina no detiene el hilo: si este llega a ocupar el
+        # hueco, se libera al terminar en lugar de perder la concesión
+        acquire = asyncio.ensure_future(asyncio.to_thread(self.try_acquire_slot, domain))
+        try:
+            return await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            acquire.add_done_callback(self._release_abandoned)
+            raise
+
+    def _release_abandoned(self, acquire):
+        if acquire.cancelled() or acquire.exception() is not None:
+            return
+        lease_id = acquire.result()
+        if lease_id is not None:
+            asyncio.get_running_loop().run_in_executor(None, self.release_slot, lease_id)
+
+    def _count_wait(self, seconds):
+        self.waits += 1
+        self.wait_seconds += seconds
+
+    def get_stats(self):
+        return {
+            'rate_limit_waits': self.waits,
+            'rate_limit_wait_ms': int(self.wait_seconds * 1000),
+        }
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Los hilos que vuelvan a usarlo abren una conexión nueva
+        self._local = threading.local()
@@ -0,0 +1,405 @@
+"""
+Informes a partir de una plantilla Excel
+========================================
+
+La plantilla (template_file) es un .xlsx con la hoja del informe:
+
+- Filas de encabezado: se copian tal cual (valores, formato, anchos)
+- Fila de datos: la primera con marcadores {{campo}}; se repite una vez
+  por resultado. Una celda que solo contiene {{profit_loss}} recibe el
+  valor numérico; un texto como "URL: {{url}}" se rellena como texto
+- Filas posteriores: pie, escrito tras la última fila de datos
+
+Abrir la plantilla con openpyxl es lo más lento de generar un informe, por
+eso se analiza una sola vez y su estructura (valores, estilos y anchos) se
+guarda en memoria y en la carpeta de caché como JSON. Solo se vuelve a
+analizar si cambian la fecha de modificación o el tamaño del archivo.
+
+El informe se escribe con xlsxwriter en modo constant_memory, fila a fila,
+sin copiar ni reabrir la plantilla. Las celdas combinadas de la plantilla
+no se conservan. Los datos nunca se convierten en hipervínculos (Excel
+admite 65.530 por hoja y el resto se perdería) ni en fórmulas; solo las
+fórmulas escritas en la propia plantilla (p. ej. un total en el pie) se
+conservan como fórmulas.
+
+Las referencias de esas fórmulas se ajustan como si Excel insertara las
+filas de datos: un rango que acaba en la fila de datos (=SUM(B5:B5)) se
+extiende hasta la última fila escrita y las referencias a filas del pie se
+desplazan. Las referencias a otras hojas no se tocan.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+_INTEGER = re.compile(r'[-+]?\d+')
+_NUMBER = re.compile(r'[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?')
+
+# Referencia a celda o rango de la propia hoja (B5, $B$5, B5:C9); los
+# textos entre comillas se capturan aparte para dejarlos intactos
+_CELL_REFERENCE = re.compile(
+    r'("[^"]*")'
+    r'|(?<![\w.!:$])(\$?[A-Za-z]{1,3}\$?)(\d+)(?![\w(!])'
+    r'(?::(\$?[A-Za-z]{1,3}\$?)(\d+)(?![\w(]))?'
+)
+
+# Versión del formato en caché: cambiarla invalida las plantillas guardadas
+_CACHE_VERSION = 2
+
+
+def _cell_style(cell):
+    """Estilo de una celda de openpyxl como diccionario de formato de xlsxwriter"""
+    style = {}
+    font = cell.font
+    if font is not None:
+        if font.bold:
+            style['bold'] = True
+        if font.italic:
+            style['italic'] = True
+        if font.size:
+            style['font_size'] = float(font.size)
+        color = getattr(font.color, 'rgb', None) if font.color is not None else None
+        if isinstance(color, str) and len(color) >= 6:
+            style['font_color'] = '#' + color[-6:]
+    fill = cell.fill
+    if fill is not None and fill.fill_type == 'solid':
+        color = getattr(fill.fgColor, 'rgb', None)
+        if isinstance(color, str) and len(color) >= 6:
+            style['bg_color'] = '#' + color[-6:]
+    if cell.number_format and cell.number_format != 'General':
+        style['num_format'] = cell.number_format
+    alignment = cell.alignment
+    if alignment is not None:
+        if alignment.horizontal:
+            style['align'] = alignment.horizontal
+        if alignment.wrap_text:
+            style['text_wrap'] = True
+    return style
+
+
+def _cell_spec(cell):
+    """
+    Descripción serializable de una celda
+
+    Returns:
+        list: [columna, tipo, contenido, estilo]; tipo es 'value' (literal),
+            'field' (solo un marcador) o 'text' (texto con marcadores)
+    """
+    value = cell.value
+    kind = 'value'
+    if isinstance(value, str):
+        match = PLACEHOLDER.fullmatch(value.strip())
+        if match:
+            kind, value = 'field', match.group(1)
+        elif PLACEHOLDER.search(value):
+            kind = 'text'
+    elif value is not None and not isinstance(value, (int, float, bool)):
+        # Fechas y otros tipos: se conservan como texto
+        value = str(value)
+    return [cell.column - 1, kind, value, _cell_style(cell)]
+
+
+def parse_template(path):
+    """
+    Analizar una plantilla .xlsx
+
+    Args:
+        path (str): Archivo de la plantilla
+
+    Returns:
+        dict: Estructura serializable con sheet_name, column_widths, header,
+            data_row, data_row_number (fila de datos en la plantilla, desde 1),
+            footer y fields
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils import column_index_from_string
+
+    workbook = load_workbook(path)
+    try:
+        sheet = workbook.worksheets[0]
+        header, data_row, footer = [], None, []
+        data_row_number = None
+        for row in sheet.iter_rows():
+            cells = [_cell_spec(cell) for cell in row
+                     if cell.value is not None or _cell_style(cell)]
+            if data_row is None and any(kind != 'value' for _, kind, _, _ in cells):
+                data_row = cells
+                data_row_number = row[0].row
+            elif data_row is None:
+                header.append(cells)
+            else:
+                footer.append(cells)
+
+        widths = {}
+        for letter, dimension in sheet.column_dimensions.items():
+            if dimension.width:
+                widths[column_index_from_string(letter) - 1] = float(dimension.width)
+
+        fields = sorted({name for _, kind, value, _ in data_row or []
+                         if kind != 'value'
+                         for name in ([value] if kind == 'field' else PLACEHOLDER.findall(value))})
+        return {
+            'version': _CACHE_VERSION,
+            'sheet_name': sheet.title,
+            'column_widths': widths,
+            'header': header,
+            'data_row': data_row or [],
+            'data_row_number': data_row_number,
+            'footer': footer,
+            'fields': fields,
+        }
+    finally:
+        workbook.close()
+
+
+class TemplateCache:
+    """
+    Plantillas analizadas, en memoria y en disco
+
+    La clave de validez es (mtime_ns, tamaño) del archivo de plantilla; si
+    no coincide, la plantilla se vuelve a analizar y se reemplaza.
+
+    Args:
+        cache_dir (str, optional): Carpeta para la copia en disco (JSON); sin
+            ella solo se guarda en memoria
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self._memory = {}
+        self._lock = threading.Lock()
+
+        self.parses = 0
+        self.hits = 0
+
+    def _disk_path(self, path):
+        digest = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"template_{digest}.json")
+
+    def get(self, path):
+        """
+        Estructura de una plantilla, analizándola solo si cambió
+
+        Returns:
+            dict: Resultado de parse_template()
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = [stat.st_mtime_ns, stat.st_size]
+
+        with self._lock:
+            cached = self._memory.get(path)
+            if cached is not None and cached[0] == signature:
+                self.hits += 1
+                return cached[1]
+
+            template = self._load_disk(path, signature)
+            if template is None:
+                template = parse_template(path)
+                self.parses += 1
+                self._save_disk(path, signature, template)
+            else:
+                self.hits += 1
+            self._memory[path] = (signature, template)
+            return template
+
+    def _load_disk(self, path, signature):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(path), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        template = entry.get('template') or {}
+        if entry.get('signature') != signature or template.get('version') != _CACHE_VERSION:
+            return None
+        # JSON convierte las claves numéricas en texto
+        template['column_widths'] = {int(column): width
+                                     for column, width in template['column_widths'].items()}
+        return template
+
+    def _save_disk(self, path, signature, template):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            target = self._disk_path(path)
+            temporary = target + '.tmp'
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump({'path': path, 'signature': signature, 'template': template}, f)
+            os.replace(temporary, target)
+        except OSError as e:
+            print(f"Error guardando la plantilla en caché: {e}")
+
+    def get_stats(self):
+        return {'template_parses': self.parses, 'template_cache_hits': self.hits}
+
+
+_shared_caches = {}
+
+
+def get_template_cache(cache_dir=None):
+    """Caché de plantillas compartida por todo el proceso (una por carpeta)"""
+    if cache_dir not in _shared_caches:
+        _shared_caches[cache_dir] = TemplateCache(cache_dir)
+    return _shared_caches[cache_dir]
+
+
+def _typed(value):
+    # Los resultados pueden venir del CSV parcial, donde todo es texto
+    if isinstance(value, str):
+        text = value.strip()
+        if _INTEGER.fullmatch(text):
+            return int(text)
+        if _NUMBER.fullmatch(text):
+            return float(text)
+    return value
+
+
+def _text(value):
+    return '' if value is None else str(value)
+
+
+class _Formats:
+    # Un formato de xlsxwriter por estilo distinto, creado una sola vez
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._formats = {}
+
+    def get(self, style):
+        if not style:
+            return None
+        key = json.dumps(style, sort_keys=True)
+        if key not in self._formats:
+            self._formats[key] = self.workbook.add_format(style)
+        return self._formats[key]
+
+
+def shift_formula(formula, data_row_number, count):
+    """
+    Ajustar las referencias de una fórmula de la plantilla a `count` filas de datos
+
+    Args:
+        formula (str): Fórmula de una fila de encabezado o del pie
+        data_row_number (int): Fila de datos en la plantilla (desde 1)
+        count (int): Filas de datos escritas en el informe (sin datos queda
+            la fila de la plantilla vacía, como con una)
+
+    Returns:
+        str: Fórmula con los rangos de datos extendidos y el pie desplazado
+    """
+    extra = count - 1
+    if not data_row_number or extra <= 0:
+        return formula
+
+    def shifted(row, is_end):
+        row = int(row)
+        if row > data_row_number or (is_end and row == data_row_number):
+            return row + extra
+        return row
+
+    def replace(match):
+        quoted, column, row, end_column, end_row = match.groups()
+        if quoted is not None:
+            return quoted
+        if end_column is None:
+            return f"{column}{shifted(row, False)}"
+        return f"{column}{shifted(row, False)}:{end_column}{shifted(end_row, True)}"
+
+    return _CELL_REFERENCE.sub(replace, formula)
+
+
+def _needs_count(template):
+    # Una fórmula del encabezado que mira la fila de datos o el pie necesita
+    # saber cuántas filas habrá antes de escribirse
+    data_row_number = template.get('data_row_number')
+    return bool(data_row_number) and any(
+        shift_formula(value, data_row_number, 2) != value
+        for cells in template['header'] for _, _, value, _ in cells
+        if isinstance(value, str) and value.startswith('='))
+
+
+def _write_static(sheet, formats, row_number, cells, data_row_number=None, count=1):
+    for column, _, value, style in cells:
+        if isinstance(value, str) and value.startswith('='):
+            # Fórmula de la plantilla (strings_to_formulas está desactivado)
+            sheet.write_formula(row_number, column, shift_formula(value, data_row_number, count),
+                                formats.get(style))
+        else:
+            sheet.write(row_number, column, value, formats.get(style))
+
+
+def render_report(template, output_file, rows, count=None):
+    """
+    Escribir un informe desde la estructura en caché
+
+    Args:
+        template (dict): Resultado de TemplateCache.get() / parse_template()
+        output_file (str): Archivo .xlsx del informe
+        rows (iterable): Resultados (diccionarios), consumidos en streaming
+        count (int, optional): Número de resultados de `rows`. Las fórmulas
+            del encabezado que suman los datos lo necesitan antes de la
+            primera fila; sin él, en ese caso, `rows` se carga en memoria
+
+    Returns:
+        int: Filas de datos escritas
+    """
+    import xlsxwriter
+
+    data_row_number = template.get('data_row_number')
+    if count is None and _needs_count(template):
+        rows = list(rows)
+        count = len(rows)
+
+    workbook = xlsxwriter.Workbook(output_file, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+    })
+    written = 0
+    try:
+        sheet = workbook.add_worksheet(template['sheet_name'][:31])
+        formats = _Formats(workbook)
+        for column, width in template['column_widths'].items():
+            sheet.set_column(column, column, width)
+
+        row_number = 0
+        for cells in template['header']:
+            _write_static(sheet, formats, row_number, cells, data_row_number,
+                          count if count is not None else 1)
+            row_number += 1
+
+        # Formatos de la fila de datos resueltos antes del bucle
+        data_row = [(column, kind, value, formats.get(style))
+                    for column, kind, value, style in template['data_row']]
+        for record in rows:
+            for column, kind, value, cell_format in data_row:
+                if kind == 'field':
+                    content = _typed(record.get(value))
+                    if content is None or content == '':
+                        sheet.write_blank(row_number, column, None, cell_format)
+                        continue
+                elif kind == 'text':
+                    content = PLACEHOLDER.sub(lambda m: _text(record.get(m.group(1))), value)
+                else:
+                    content = value
+                sheet.write(row_number, column, content, cell_format)
+            row_number += 1
+            written += 1
+
+        if not written and template['data_row']:
+            # Sin resultados la fila de datos queda vacía: las fórmulas no cambian
+            row_number += 1
+
+        # El pie se escribe ya con el número real de filas
+        for cells in template['footer']:
+            _write_static(sheet, formats, row_number, cells, data_row_number, written)
+            row_number += 1
+    finally:
+        workbook.close()
+    return written
@@ -0,0 +1,204 @@
+"""
+Filtro de recursos de red para Playwright
+=========================================
+
+Solo se lee un elemento de resultado por página, así que imágenes, fuentes,
+analítica y scripts de terceros son ancho de banda y latencia perdidos.
+ResourceFilter se instala como ruta "**/*" en cada contexto del navegador y
+aborta esas peticiones según:
+
+- Tipo de recurso (image, font, media...)
+- Lista de dominios bloqueados (analítica, publicidad...)
+- Scripts de terceros (host distinto al de la página), salvo dominios permitidos
+
+Las peticiones abortadas no llegan a descargarse, así que sus bytes se
+estiman con un tamaño típico por tipo de recurso.
+"""
+
+from urllib.parse import urlsplit
+
+DEFAULT_BLOCKED_TYPES = ('image', 'font', 'media')
+
+DEFAULT_BLOCKED_DOMAINS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'facebook.net',
+    'hotjar.com',
+    'segment.io',
+    'mixpanel.com',
+    'clarity.ms',
+)
+
+# Tamaño típico (bytes) por tipo de recurso para estimar el ahorro
+ESTIMATED_BYTES_BY_TYPE = {
+    'image': 40 * 1024,
+    'font': 45 * 1024,
+    'media': 500 * 1024,
+    'script': 60 * 1024,
+    'stylesheet': 20 * 1024,
+    'xhr': 5 * 1024,
+    'fetch': 5 * 1024,
+}
+ESTIMATED_BYTES_DEFAULT = 10 * 1024
+
+
+def _host_of(url):
+    try:
+        return (urlsplit(url).hostname or '').lower()
+    except ValueError:
+        return ''
+
+
+def _domain_matches(host, domains):
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+def _site_of(host):
+    # Aproximación al dominio registrable: últimas dos etiquetas
+    parts = host.split('.')
+    return '.'.join(parts[-2:]) if len(parts) >= 2 else host
+
+
+class ResourceFilter:
+    """
+    Filtro de peticiones por tipo de recurso y dominio
+
+    Args:
+        blocked_types (iterable): Tipos de recurso de Playwright a abortar
+        blocked_domains (iterable): Dominios (y subdominios) a abortar siempre
+        allowed_domains (iterable): Dominios que nunca se bloquean
+        block_third_party_scripts (bool): Abortar scripts de otro sitio
+    """
+
+    def __init__(self, blocked_types=DEFAULT_BLOCKED_TYPES,
+                 blocked_domains=DEFAULT_BLOCKED_DOMAINS, allowed_domains=(),
+                 block_third_party_scripts=True):
+        self.blocked_types = {t.lower() for t in blocked_types}
+        self.blocked_domains = tuple(d.lower().lstrip('.') for d in blocked_domains)
+        self.allowed_domains = tuple(d.lower().lstrip('.') for d in allowed_domains)
+        self.block_third_party_scripts = block_third_party_scripts
+
+        self.allowed_requests = 0
+        self.blocked_requests = 0
+        self.blocked_bytes = 0
+        self.blocked_by_reason = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Crear el filtro desde config.json
+
+        Returns:
+            ResourceFilter: Filtro configurado, o None si está desactivado
+        """
+        if not config.get('resource_filter_enabled', True):
+            return None
+        return cls(
+            blocked_types=config.get('block_resource_types', DEFAULT_BLOCKED_TYPES),
+            blocked_domains=config.get('block_domains', DEFAULT_BLOCKED_DOMAINS),
+            allowed_domains=config.get('allow_domains', ()),
+            block_third_party_scripts=config.get('block_third_party_scripts', True),
+        )
+
+    def get_block_reason(self, request):
+        """
+        Decidir si una petición se bloquea
+
+        Args:
+            request (Request): Petición de Playwright
+
+        Returns:
+            str: Motivo del bloqueo, o None si la petición debe continuar
+        """
+        resource_type = request.resource_type
+        if resource_type == 'document':
+            return None
+
+        host = _host_of(request.url)
+        if self.allowed_domains and _domain_matches(host, self.allowed_domains):
+            return None
+        if _domain_matches(host, self.blocked_domains):
+            return 'domain'
+        if resource_type in self.blocked_types:
+            return resource_type
+        if self.block_third_party_scripts and resource_type == 'script':
+            page_host = self._page_host(request)
+            if page_host and _site_of(host) != _site_of(page_host):
+                return 'third_party_script'
+        return None
+
+    def handle_sync(self, route):
+        """Manejador para context.route() con playwright.sync_api"""
+        reason = self.get_block_reason(route.request)
+        if reason is None:
+            self.allowed_requests += 1
+            route.continue_()
+        else:
+            self._count_blocked(route.request, reason)
+            route.abort('blockedbyclient')
+
+    async def handle_async(self, route):
+        """Manejador para context.route() con playwright.async_api"""
+        reason = self.get_block_reason(route.request)
+        if reason is None:
+            self.allowed_requests += 1
+            await route.continue_()
+        else:
+            self._count_blocked(route.request, reason)
+            await route.abort('blockedbyclient')
+
+    def install_sync(self, context):
+        context.route('**/*', self.handle_sync)
+
+    async def install_async(self, context):
+        await context.route('**/*', self.handle_async)
+
+    def get_stats(self):
+        """
+        Contadores de la ejecución
+
+        Returns:
+            dict: Peticiones permitidas/bloqueadas y bytes estimados ahorrados
+        """
+        stats = {
+            'allowed_requests': self.allowed_requests,
+            'blocked_requests': self.blocked_requests,
+            'blocked_bytes': self.blocked_bytes,
+        }
+        for reason, count in self.blocked_by_reason.items():
+            stats[f'blocked_{reason}'] = count
+        return stats
+
+    def _count_blocked(self, request, reason):
+        self.blocked_requests += 1
+        self.blocked_bytes += ESTIMATED_BYTES_BY_TYPE.get(request.resource_type,
+                                                          ESTIMATED_BYTES_DEFAULT)
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+
+    @staticmethod
+    def _page_host(request):
+        try:
+            return _host_of(request.frame.page.url)
+        except Exception:
+            return ''
+
+
+def format_filter_stats(stats):
+    """
+    Formatear los contadores del filtro de recursos para logs
+
+    Args:
+        stats (dict): Resultado de ResourceFilter.get_stats() (o agregado)
+
+    Returns:
+        str: Resumen en una línea
+    """
+    blocked = stats.get('blocked_requests', 0)
+    total = blocked + stats.get('allowed_requests', 0)
+    percent = (blocked / total * 100) if total else 0.0
+    megabytes = stats.get('blocked_bytes', 0) / (1024 * 1024)
+    return (
+        f"🚫 Recursos bloqueados: {blocked}/{total} peticiones ({percent:.1f}%) - "
+        f"Ahorro estimado: {megabytes:.1f} MB"
+    )
@@ -0,0 +1,212 @@
+"""
+Caché de resultados en disco
+============================
+
+Guarda el resultado de cada backtest bajo una clave derivada de la URL
+normalizada y de los parámetros del backtest (ver get_backtest_params en
+Utiles/utils.py). Repetir la misma lista con la misma configuración no
+vuelve a abrir el navegador para las URLs ya resueltas.
+
+Se almacena en SQLite, que admite varios procesos leyendo y escribiendo a
+la vez. Las entradas caducan tras un TTL y, si el tamaño total supera el
+máximo, se expulsan las de acceso más antiguo (LRU). El tamaño total se
+lleva como contador en memoria y solo se recalcula con SUM(size) al superar
+el máximo o cada RESYNC_PUTS escrituras (para ver las de otros procesos).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def normalize_url(url):
+    """
+    Normalizar una URL para que variantes equivalentes compartan clave
+
+    - Esquema y host en minúsculas
+    - Parámetros de consulta ordenados
+    - Sin fragmento (#...) ni barra final
+
+    Args:
+        url (str): URL original
+
+    Returns:
+        str: URL normalizada
+    """
+    parts = urlsplit(str(url).strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+
+def make_cache_key(url, params):
+    """
+    Calcular la clave de caché de una URL con unos parámetros
+
+    Args:
+        url (str): URL del backtest
+        params (dict): Parámetros que afectan al resultado
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    payload = json.dumps({'url': normalize_url(url), 'params': params},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Caché persistente con TTL y expulsión LRU por tamaño
+
+    Args:
+        path (str): Archivo SQLite de la caché
+        ttl_seconds (float): Vida máxima de una entrada (0 = sin caducidad)
+        max_bytes (int): Tamaño máximo total de los valores almacenados
+    """
+
+    # Escrituras entre dos recálculos del tamaño total
+    RESYNC_PUTS = 1000
+    # Fracción de max_bytes que queda ocupada tras una expulsión
+    EVICT_TO = 0.9
+
+    def __init__(self, path, ttl_seconds=24 * 3600, max_bytes=200 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._total = None
+        self._puts_since_sync = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # check_same_thread=False: el motor asíncrono la usa desde su hilo
+            # de E/S (bot.run_io), nunca a la vez que otro hilo
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key):
+        """
+        Buscar un resultado en caché
+
+        Args:
+            key (str): Clave de make_cache_key()
+
+        Returns:
+            dict: Resultado almacenado o None si no existe o caducó
+        """
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, created FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        value, created = row
+        if self.ttl_seconds and now - created > self.ttl_seconds:
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            conn.commit()
+            if self._total is not None:
+                self._total -= len(value)
+            self.misses += 1
+            return None
+
+        conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        conn.commit()
+        self.hits += 1
+        return json.loads(value)
+
+    def put(self, key, record):
+        """
+        Guardar un resultado y expulsar entradas si se supera el tamaño máximo
+
+        Args:
+            key (str): Clave de make_cache_key()
+            record (dict): Resultado a guardar
+        """
+        conn = self._connect()
+        value = json.dumps(record, default=str)
+        now = time.time()
+        previous = conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+        conn.execute(
+            "INSERT OR REPLACE INTO results (key, value, size, created, accessed)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now, now),
+        )
+        conn.commit()
+        if self._total is not None:
+            self._total += len(value) - (previous[0] if previous else 0)
+        self._puts_since_sync += 1
+        self._evict()
+
+    def _sum_sizes(self):
+        self._puts_since_sync = 0
+        return self._connect().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def _evict(self):
+        synced = self._total is None or self._puts_since_sync >= self.RESYNC_PUTS
+        if synced:
+            self._total = self._sum_sizes()
+        if self._total <= self.max_bytes:
+            return
+        if not synced:
+            # El contador no ve las escrituras y expulsiones de otros procesos
+            self._total = self._sum_sizes()
+            if self._total <= self.max_bytes:
+                return
+        total = self._total
+
+        conn = self._connect()
+
+        # Borrar por orden de último acceso hasta quedar un 10 % bajo el
+        # límite, para no volver a superarlo en la siguiente escritura
+        excess = total - int(self.max_bytes * self.EVICT_TO)
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed ASC"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM results WHERE key = ?", victims)
+        conn.commit()
+        self._total = total - freed
+
+    def get_stats(self):
+        """
+        Obtener aciertos y fallos de la caché en esta ejecución
+
+        Returns:
+            dict: cache_hits, cache_misses
+        """
+        return {'cache_hits': self.hits, 'cache_misses': self.misses}
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._total = None
@@ -0,0 +1,249 @@
+"""
+Registros de resultado tipados
+==============================
+
+Convierte lo extraído de cada backtest (JSON de la API o texto del DOM)
+en métricas numéricas y las guarda en objetos con __slots__ de tamaño
+fijo, en lugar de cadenas que habría que volver a analizar:
+
+    BacktestMetrics   profit_loss, win_rate, max_drawdown, sharpe_ratio
+    ResultRecord      url, combinación del barrido, estado y una
+                      BacktestMetrics por ventana de fechas (YTD, custom...)
+    ResultColumns     todos los resultados del lote en columnas: las
+                      métricas de la ventana principal en array('d')
+                      (NaN sin dato), para el análisis final con NumPy
+
+El parser de texto reconoce las etiquetas habituales de la plataforma
+("P/L: 1,250.50 | Win rate: 65% | Max DD: -350.25 | Sharpe: 1.42"), con o
+sin dos puntos y con el valor en la misma línea o en la siguiente. Los
+porcentajes se devuelven como fracción, igual que desde la API.
+"""
+
+import json
+import re
+from array import array
+
+from Bot.network_extractor import METRIC_NAMES, parse_backtest_payload, to_metric, to_number
+
+# Etiquetas de cada métrica en el texto del resultado (sin mayúsculas)
+TEXT_LABELS = {
+    'profit_loss': ('p/l', 'p&l', 'pnl', 'profit/loss', 'profit & loss', 'profit and loss',
+                    'net profit', 'total profit', 'net p/l'),
+    'win_rate': ('win rate', 'win %', 'win pct', 'win percentage', 'winning rate', 'winrate'),
+    'max_drawdown': ('max drawdown', 'maximum drawdown', 'max dd', 'mdd', 'drawdown'),
+    'sharpe_ratio': ('sharpe ratio', 'sharpe'),
+}
+
+# Número con signo, moneda, miles, paréntesis contables y porcentaje opcionales
+_VALUE = r'(\(?[-+]?\s*[$€£]?\s*[-+]?\d[\d,]*(?:\.\d+)?\s*%?\)?)'
+
+_TEXT_PATTERNS = {
+    metric: re.compile(
+        r'(?<![a-z])(?:' + '|'.join(re.escape(label) for label in sorted(labels, key=len, reverse=True))
+        + r')(?![a-z])\s*[:=]?\s*' + _VALUE,
+        re.IGNORECASE,
+    )
+    for metric, labels in TEXT_LABELS.items()
+}
+
+
+def _text_number(value):
+    value = value.strip()
+    if value.startswith('(') and value.endswith(')'):
+        # Notación contable: (350.25) es negativo
+        number = to_number(value[1:-1])
+        return -abs(number) if number is not None else None
+    return to_number(value.strip('()'))
+
+
+def parse_result_text(text):
+    """
+    Extraer las métricas del texto de resultado mostrado en la página
+
+    Args:
+        text (str): inner_text() del elemento de resultado
+
+    Returns:
+        dict: Métricas encontradas; las ausentes quedan en None
+    """
+    metrics = dict.fromkeys(METRIC_NAMES)
+    if not text:
+        return metrics
+    for metric, pattern in _TEXT_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            number = _text_number(match.group(1))
+            metrics[metric] = to_metric(metric, number)
+    return metrics
+
+
+def parse_result(result):
+    """
+    Métricas de un resultado en cualquiera de sus formas
+
+    Args:
+        result (dict|str|None): Resultado de la API (ya con métricas), JSON
+            en texto o texto del DOM
+
+    Returns:
+        dict: Métricas (profit_loss, win_rate, max_drawdown, sharpe_ratio)
+    """
+    if isinstance(result, dict):
+        if any(name in result for name in METRIC_NAMES):
+            return {name: to_metric(name, result.get(name)) for name in METRIC_NAMES}
+        return parse_backtest_payload(result)
+    if not isinstance(result, str):
+        return dict.fromkeys(METRIC_NAMES)
+    text = result.strip()
+    if text[:1] in ('{', '['):
+        try:
+            return parse_backtest_payload(json.loads(text))
+        except ValueError:
+            pass
+    return parse_result_text(text)
+
+
+class BacktestMetrics:
+    """Métricas de una ventana de fechas; None donde no hubo dato"""
+
+    __slots__ = METRIC_NAMES
+
+    def __init__(self, profit_loss=None, win_rate=None, max_drawdown=None, sharpe_ratio=None):
+        self.profit_loss = profit_loss
+        self.win_rate = win_rate
+        self.max_drawdown = max_drawdown
+        self.sharpe_ratio = sharpe_ratio
+
+    @classmethod
+    def from_result(cls, result):
+        return cls(**parse_result(result))
+
+    @classmethod
+    def from_mapping(cls, mapping, prefix=''):
+        """Leer las métricas de un registro plano (columnas <prefijo><métrica>)"""
+        return cls(*(to_number(mapping.get(prefix + name)) for name in METRIC_NAMES))
+
+    def as_tuple(self):
+        return (self.profit_loss, self.win_rate, self.max_drawdown, self.sharpe_ratio)
+
+    def as_dict(self):
+        return dict(zip(METRIC_NAMES, self.as_tuple()))
+
+    def is_empty(self):
+        return all(value is None for value in self.as_tuple())
+
+    def __eq__(self, other):
+        return isinstance(other, BacktestMetrics) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={value!r}" for name, value in self.as_dict().items())
+        return f"BacktestMetrics({values})"
+
+
+class ResultRecord:
+    """
+    Resultado compacto de una URL (y combinación de barrido)
+
+    Args:
+        url (str): URL del backtest
+        sweep_key (str): Combinación del barrido ('' fuera de un barrido)
+        status (str): 'completed' o 'error'
+        windows (tuple): Una BacktestMetrics por ventana de fechas, en el
+            orden de AutoOmegaBot.date_windows
+    """
+
+    __slots__ = ('url', 'sweep_key', 'status', 'windows')
+
+    def __init__(self, url, sweep_key='', status='completed', windows=()):
+        self.url = url
+        self.sweep_key = sweep_key
+        self.status = status
+        self.windows = tuple(windows)
+
+    @classmethod
+    def from_record(cls, record, window_names):
+        """
+        Construir desde un registro de AutoOmegaBot.make_result()
+
+        Args:
+            record (dict): Registro plano (columnas del archivo de resultados)
+            window_names (list): Nombres de las ventanas; la primera ocupa las
+                columnas principales y las demás las <ventana>_<métrica>
+        """
+        windows = [BacktestMetrics.from_mapping(record, f"{name}_" if position else '')
+                   for position, name in enumerate(window_names or [''])]
+        return cls(record.get('url'), record.get('sweep_key') or '',
+                   record.get('status') or '', windows)
+
+    @property
+    def metrics(self):
+        """Métricas de la ventana principal"""
+        return self.windows[0] if self.windows else BacktestMetrics()
+
+    def as_dict(self, window_names):
+        """Estructura documentada: métricas anidadas por ventana"""
+        output = {'url': self.url, 'status': self.status}
+        if self.sweep_key:
+            output['sweep_key'] = self.sweep_key
+        for name, metrics in zip(window_names, self.windows):
+            output[f"{name}_results"] = metrics.as_dict()
+        return output
+
+    def __repr__(self):
+        return f"ResultRecord(url={self.url!r}, status={self.status!r}, windows={self.windows!r})"
+
+
+_NAN = float('nan')
+
+
+def _metric_value(value):
+    # Los registros de make_result() ya traen float o None: solo se analiza el resto
+    if value is None:
+        return _NAN
+    if isinstance(value, float):
+        return value
+    number = to_number(value)
+    return _NAN if number is None else number
+
+
+class ResultColumns:
+    """
+    Resultados del lote en columnas, en el orden en que se escriben
+
+    Las métricas de la ventana principal se convierten una sola vez, al
+    añadir cada resultado, y se guardan en array('d') (8 bytes por valor);
+    de cada fila solo se conservan además la URL, la combinación del barrido
+    y el estado, que necesitan el ranking y los grupos.
+    """
+
+    __slots__ = ('urls', 'sweep_keys', 'statuses', '_metrics')
+
+    def __init__(self):
+        self.urls = []
+        self.sweep_keys = []
+        self.statuses = []
+        self._metrics = tuple(array('d') for _ in METRIC_NAMES)
+
+    def add(self, record):
+        """Añadir un registro de AutoOmegaBot.make_result()"""
+        self.urls.append(record.get('url'))
+        self.sweep_keys.append(record.get('sweep_key') or '')
+        self.statuses.append(record.get('status') or '')
+        for column, name in zip(self._metrics, METRIC_NAMES):
+            column.append(_metric_value(record.get(name)))
+
+    def __len__(self):
+        return len(self.urls)
+
+    def values(self):
+        """
+        Métricas como matriz (n_resultados × n_métricas)
+
+        Returns:
+            np.ndarray: float64 con NaN donde no hay dato; columnas en el orden de METRIC_NAMES
+        """
+        import numpy as np
+
+        # np.array copia el búfer de cada array('d') sin pasar por objetos float
+        return np.column_stack([np.array(column, dtype=np.float64) for column in self._metrics]) \
+            .reshape(len(self), len(METRIC_NAMES))
@@ -0,0 +1,248 @@
+"""
+Escritura incremental de resultados
+===================================
+
+Cada resultado se agrega como fila a un CSV parcial y se vuelca a disco en
+cuanto se completa, de modo que:
+
+- La memoria no crece con el tamaño del lote
+- Un fallo a mitad de la ejecución no pierde los resultados ya obtenidos
+- El CSV parcial se puede abrir en cualquier momento para ver el avance
+
+Al finalizar, si la salida es .xlsx, el CSV se convierte fila a fila con
+xlsxwriter en modo constant_memory; si es .csv, el parcial pasa a ser el
+archivo final. En el Excel las columnas de métricas (y attempts) se
+guardan como números, el resto de celdas como texto tal cual ("007" sigue
+siendo "007"), y ningún texto se convierte en hipervínculo (Excel admite 65.530 por hoja y
+xlsxwriter descarta el resto) ni en fórmula.
+"""
+
+import csv
+import os
+
+from Bot.network_extractor import METRIC_NAMES, to_number
+
+RESULT_COLUMNS = [
+    'url', 'timestamp', 'status', 'source',
+    'profit_loss', 'win_rate', 'max_drawdown', 'sharpe_ratio',
+    'result', 'attempts', 'error_class', 'error',
+]
+
+# Opciones de xlsxwriter para volcar datos: sin hipervínculos ni fórmulas
+# automáticas. Los números se convierten solo en las columnas numéricas
+EXCEL_OPTIONS = {
+    'constant_memory': True,
+    'strings_to_urls': False,
+    'strings_to_formulas': False,
+}
+
+NUMERIC_COLUMNS = ('attempts',)
+
+
+def is_numeric_column(name):
+    """Columna que se escribe como número: una métrica (también con el
+    prefijo de su ventana, p. ej. custom_profit_loss) o attempts"""
+    return name in NUMERIC_COLUMNS or any(
+        name == metric or name.endswith('_' + metric) for metric in METRIC_NAMES)
+
+
+def sheet_rows(columns):
+    """
+    Filas de una tabla dada por columnas
+
+    Args:
+        columns (list): Una secuencia por columna (lista o array de NumPy);
+            en las columnas float los NaN pasan a celda vacía
+
+    Returns:
+        iterator: Tuplas con los valores de cada fila
+    """
+    lists = []
+    for column in columns:
+        if getattr(column, 'dtype', None) is not None and column.dtype.kind == 'f':
+            cells = column.astype(object)
+            cells[column != column] = None
+            column = cells.tolist()
+        elif hasattr(column, 'tolist'):
+            column = column.tolist()
+        lists.append(column)
+    return zip(*lists)
+
+
+class ResultWriter:
+    """
+    Escritor de resultados en streaming con orden de entrada preservado
+
+    Los resultados pueden llegar desordenados (motor asíncrono o varios
+    procesos). Se escriben en orden de índice, reteniendo solo los que
+    llegan antes de tiempo.
+
+    Args:
+        output_file (str): Archivo final (.xlsx o .csv)
+        columns (list, optional): Columnas a escribir; por defecto RESULT_COLUMNS
+        sheet_name (str): Hoja del Excel final
+        ordered (bool): Si es False cada fila se escribe al llegar (útil cuando
+            el planificador cambia el orden y retener filas no tiene sentido)
+        max_pending (int): Filas retenidas como máximo detrás de una URL lenta;
+            al superarlo se escriben las más antiguas y la lenta se escribe
+            al final cuando llegue
+        on_write (callable, optional): Llamada con cada registro en el orden
+            en que se escribe su fila (p. ej. ResultColumns.add)
+    """
+
+    def __init__(self, output_file, columns=None, sheet_name='Resultados', ordered=True,
+                 max_pending=1000, on_write=None):
+        self.output_file = output_file
+        self.columns = list(columns or RESULT_COLUMNS)
+        self.sheet_name = sheet_name
+        self.ordered = ordered
+        self.max_pending = max(1, int(max_pending))
+        self.on_write = on_write
+
+        base, extension = os.path.splitext(output_file)
+        self.to_excel = extension.lower() != '.csv'
+        self.partial_file = base + '.partial.csv'
+
+        self._file = None
+        self._writer = None
+        self._next_index = 0
+        self._pending = {}
+        self.rows_written = 0
+        self.closed = False
+
+    def open(self):
+        """Crear el CSV parcial con su encabezado"""
+        if self._file is None:
+            folder = os.path.dirname(os.path.abspath(self.partial_file))
+            os.makedirs(folder, exist_ok=True)
+            self._file = open(self.partial_file, 'w', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=self.columns,
+                                          extrasaction='ignore')
+            self._writer.writeheader()
+            self._file.flush()
+        return self
+
+    def write(self, index, record):
+        """
+        Registrar el resultado de la URL número `index`
+
+        Args:
+            index (int): Posición de la URL en el archivo de entrada
+            record (dict): Resultado de AutoOmegaBot.make_result()
+        """
+        self.open()
+        if not self.ordered or index < self._next_index:
+            # Sin orden, o una URL que llega después de un volcado forzado
+            self._write_row(record)
+            return
+        self._pending[index] = record
+        self._write_ready()
+        if len(self._pending) > self.max_pending:
+            # Una URL lenta no retiene filas sin límite: se escriben las más
+            # antiguas hasta dejar la mitad del margen libre
+            for pending_index in sorted(self._pending)[:len(self._pending) - self.max_pending // 2]:
+                self._write_row(self._pending.pop(pending_index))
+                self._next_index = pending_index + 1
+            self._write_ready()
+
+    def _write_ready(self):
+        while self._next_index in self._pending:
+            self._write_row(self._pending.pop(self._next_index))
+            self._next_index += 1
+
+    def close(self, extra_sheets=None, on_rows=None):
+        """
+        Escribir lo pendiente y generar el archivo final
+
+        Args:
+            extra_sheets (list|callable, optional): Tuplas (nombre, columnas,
+                valores por columna) con tablas adicionales: hojas del Excel
+                o, con salida .csv, un <archivo>_<nombre>.csv por tabla. Si es
+                una función, se llama sin argumentos cuando ya están escritas
+                todas las filas y devuelve esas tuplas
+            on_rows (callable, optional): Llamada con las filas escritas
+                (iterador de diccionarios, leído del CSV parcial en streaming)
+                antes de generar el archivo final
+
+        Returns:
+            str: Ruta del archivo final
+        """
+        if self.closed:
+            return self.output_file
+        self.open()
+
+        # Índices que nunca llegaron (p.ej. ejecución interrumpida)
+        for index in sorted(self._pending):
+            self._write_row(self._pending.pop(index))
+
+        self._file.close()
+        self._file = None
+        self.closed = True
+
+        if on_rows is not None:
+            with open(self.partial_file, newline='', encoding='utf-8') as f:
+                on_rows(csv.DictReader(f))
+        if callable(extra_sheets):
+            extra_sheets = extra_sheets()
+
+        if self.to_excel:
+            self._convert_to_excel(extra_sheets or [])
+            os.remove(self.partial_file)
+        else:
+            os.replace(self.partial_file, self.output_file)
+            self._write_extra_csv(extra_sheets or [])
+        return self.output_file
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _write_row(self, record):
+        self._writer.writerow(record)
+        # Volcado inmediato: el parcial es legible a mitad de ejecución
+        self._file.flush()
+        self.rows_written += 1
+        if self.on_write is not None:
+            self.on_write(record)
+
+    def _convert_to_excel(self, extra_sheets):
+        import xlsxwriter
+
+        workbook = xlsxwriter.Workbook(self.output_file, EXCEL_OPTIONS)
+        try:
+            sheet = workbook.add_worksheet(self.sheet_name)
+            with open(self.partial_file, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if header is not None:
+                    sheet.write_row(0, 0, header)
+                    numeric = [position for position, name in enumerate(header)
+                               if is_numeric_column(name)]
+                    # constant_memory exige escribir fila a fila en orden
+                    for row_number, row in enumerate(reader, start=1):
+                        for position in numeric:
+                            if position < len(row) and row[position] != '':
+                                number = to_number(row[position])
+                                if number is not None:
+                                    row[position] = number
+                        sheet.write_row(row_number, 0, row)
+            for name, columns, values in extra_sheets:
+                # Excel limita el nombre de hoja a 31 caracteres
+                sheet = workbook.add_worksheet(name[:31])
+                sheet.write_row(0, 0, columns)
+                for row_number, row in enumerate(sheet_rows(values), start=1):
+                    sheet.write_row(row_number, 0, row)
+        finally:
+            workbook.close()
+
+    def _write_extra_csv(self, extra_sheets):
+        base = os.path.splitext(self.output_file)[0]
+        for name, columns, values in extra_sheets:
+            slug = '_'.join(name.lower().split())
+            with open(f"{base}_{slug}.csv", 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(sheet_rows(values))
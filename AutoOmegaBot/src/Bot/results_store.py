@@ -0,0 +1,247 @@
+"""
+Histórico de resultados consultable
+===================================
+
+Cada ejecución guarda sus resultados en una base SQLite (modo WAL) con
+columnas tipadas, además del Excel/CSV de salida. Así se puede filtrar o
+ordenar todo el histórico sin abrir libros de Excel:
+
+    store = ResultsStore(path)
+    store.top('sharpe_ratio', 50)                  # mejores 50 de todas las ejecuciones
+    store.query(url=..., since='2025-01-01')       # historial de una URL
+    store.runs()                                   # ejecuciones registradas
+
+Con varias ventanas de fechas, cada ventana es una fila propia (columna
+window), de modo que las métricas de todas se ordenan y filtran igual.
+Las inserciones se agrupan en transacciones para no frenar al escritor.
+"""
+
+import os
+import sqlite3
+import time
+
+from Bot.network_extractor import METRIC_NAMES, to_number
+
+# Columnas de la tabla results devueltas por las consultas
+RESULT_FIELDS = (
+    'run_id', 'url', 'sweep_key', 'window', 'config_hash', 'status',
+    'profit_loss', 'win_rate', 'max_drawdown', 'sharpe_ratio',
+    'attempts', 'error_class', 'timestamp',
+)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS runs ("
+    " run_id TEXT PRIMARY KEY,"
+    " config_hash TEXT NOT NULL,"
+    " urls_file TEXT,"
+    " output_file TEXT,"
+    " started_at TEXT NOT NULL,"
+    " finished_at TEXT,"
+    " result_count INTEGER NOT NULL DEFAULT 0)",
+    "CREATE TABLE IF NOT EXISTS results ("
+    " id INTEGER PRIMARY KEY,"
+    " run_id TEXT NOT NULL,"
+    " url TEXT NOT NULL,"
+    " sweep_key TEXT NOT NULL DEFAULT '',"
+    " window TEXT NOT NULL DEFAULT '',"
+    " config_hash TEXT NOT NULL,"
+    " status TEXT NOT NULL,"
+    " profit_loss REAL,"
+    " win_rate REAL,"
+    " max_drawdown REAL,"
+    " sharpe_ratio REAL,"
+    " attempts INTEGER,"
+    " error_class TEXT,"
+    " timestamp TEXT NOT NULL)",
+    # Filtros habituales y un índice por métrica para los rankings
+    "CREATE INDEX IF NOT EXISTS idx_results_run ON results (run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_results_url ON results (url)",
+    "CREATE INDEX IF NOT EXISTS idx_results_config ON results (config_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_results_timestamp ON results (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_results_profit_loss ON results (profit_loss)",
+    "CREATE INDEX IF NOT EXISTS idx_results_win_rate ON results (win_rate)",
+    "CREATE INDEX IF NOT EXISTS idx_results_max_drawdown ON results (max_drawdown)",
+    "CREATE INDEX IF NOT EXISTS idx_results_sharpe_ratio ON results (sharpe_ratio)",
+)
+
+
+def _now():
+    return time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ResultsStore:
+    """
+    Base SQLite con los resultados de todas las ejecuciones
+
+    Args:
+        path (str): Archivo SQLite
+        batch_size (int): Filas acumuladas antes de confirmar la transacción
+    """
+
+    def __init__(self, path, batch_size=500):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self._conn = None
+        self._pending = []
+        self._run_counts = {}
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # check_same_thread=False: el motor asíncrono la usa desde su hilo
+            # de E/S (bot.run_io), nunca a la vez que otro hilo
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+        return self._conn
+
+    # -------------------------------------------------------------------------
+    # Escritura
+    # -------------------------------------------------------------------------
+
+    def start_run(self, run_id, config_hash, urls_file=None, output_file=None):
+        """Registrar el inicio de una ejecución"""
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR IGNORE INTO runs (run_id, config_hash, urls_file, output_file, started_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (run_id, config_hash, urls_file, output_file, _now()),
+        )
+        conn.commit()
+        self._run_counts[run_id] = {'config_hash': config_hash, 'count': 0}
+
+    def add(self, run_id, record, windows=None):
+        """
+        Añadir el resultado de una URL
+
+        Args:
+            run_id (str): Ejecución de start_run()
+            record (dict): Resultado de AutoOmegaBot.make_result()
+            windows (list, optional): Nombres de las ventanas de fechas; la
+                primera ocupa las columnas principales del registro y las
+                demás las columnas <ventana>_<métrica>
+        """
+        run = self._run_counts[run_id]
+        windows = list(windows or [''])
+        for position, window in enumerate(windows):
+            prefix = f"{window}_" if position else ''
+            metrics = [to_number(record.get(prefix + name)) for name in METRIC_NAMES]
+            if position and all(value is None for value in metrics):
+                continue
+            self._pending.append((
+                run_id, record.get('url'), record.get('sweep_key') or '', window,
+                run['config_hash'], record.get('status') or '', *metrics,
+                record.get('attempts'), record.get('error_class') or '',
+                record.get('timestamp') or _now(),
+            ))
+        run['count'] += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        conn = self._connect()
+        conn.executemany(
+            f"INSERT INTO results ({', '.join(RESULT_FIELDS)})"
+            f" VALUES ({', '.join('?' * len(RESULT_FIELDS))})",
+            self._pending,
+        )
+        conn.commit()
+        self._pending = []
+
+    def finish_run(self, run_id):
+        """Confirmar lo pendiente y cerrar el registro de la ejecución"""
+        self.flush()
+        run = self._run_counts.pop(run_id, None)
+        conn = self._connect()
+        conn.execute(
+            "UPDATE runs SET finished_at = ?, result_count = result_count + ? WHERE run_id = ?",
+            (_now(), run['count'] if run else 0, run_id),
+        )
+        conn.commit()
+
+    # -------------------------------------------------------------------------
+    # Consultas
+    # -------------------------------------------------------------------------
+
+    def query(self, run_id=None, url=None, config_hash=None, window=None, status=None,
+              since=None, until=None, order_by=None, descending=True, limit=None):
+        """
+        Buscar resultados por los filtros habituales
+
+        Args:
+            run_id, url, config_hash, window, status (str, optional): Igualdad exacta
+            since, until (str, optional): Rango de timestamp ('YYYY-MM-DD[ HH:MM:SS]')
+            order_by (str, optional): Métrica o 'timestamp' por la que ordenar
+            descending (bool): Orden descendente
+            limit (int, optional): Máximo de filas
+
+        Returns:
+            list: Diccionarios con las columnas de RESULT_FIELDS
+        """
+        conditions = []
+        values = []
+        for column, value in (('run_id', run_id), ('url', url), ('config_hash', config_hash),
+                              ('window', window), ('status', status)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                values.append(value)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            values.append(since)
+        if until is not None:
+            conditions.append("timestamp <= ?")
+            values.append(until)
+
+        sql = f"SELECT {', '.join(RESULT_FIELDS)} FROM results"
+        if order_by is not None:
+            if order_by not in METRIC_NAMES + ('timestamp',):
+                raise ValueError(f"Columna de orden no válida: {order_by}")
+            conditions.append(f"{order_by} IS NOT NULL")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if order_by is not None:
+            sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(int(limit))
+
+        self.flush()
+        cursor = self._connect().execute(sql, values)
+        return [dict(zip(RESULT_FIELDS, row)) for row in cursor]
+
+    def top(self, metric='sharpe_ratio', n=50, descending=True, **filters):
+        """
+        Mejores `n` resultados completados por una métrica
+
+        Para max_drawdown conviene descending=False (menor caída primero).
+        """
+        filters.setdefault('status', 'completed')
+        return self.query(order_by=metric, descending=descending, limit=n, **filters)
+
+    def runs(self, limit=None):
+        """
+        Ejecuciones registradas, de la más reciente a la más antigua
+
+        Returns:
+            list: Diccionarios con run_id, config_hash, archivos, fechas y result_count
+        """
+        self.flush()
+        fields = ('run_id', 'config_hash', 'urls_file', 'output_file',
+                  'started_at', 'finished_at', 'result_count')
+        sql = f"SELECT {', '.join(fields)} FROM runs ORDER BY started_at DESC"
+        values = []
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(int(limit))
+        return [dict(zip(fields, row)) for row in self._connect().execute(sql, values)]
+
+    def close(self):
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
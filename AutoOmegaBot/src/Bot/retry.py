@@ -0,0 +1,380 @@
+"""
+Reintentos y circuit breaker para los backtests
+===============================================
+
+- classify_error: clasifica un fallo (timeout, navegación, selector, HTTP 5xx)
+- RetryPolicy: presupuesto de reintentos por clase con backoff exponencial
+  y jitter completo
+- CircuitBreaker: si la tasa de error contra un host se dispara, pausa a
+  todos los trabajadores durante un enfriamiento y luego deja pasar una
+  única petición de prueba antes de reabrir el tráfico
+
+El recuento de errores es de cada proceso, pero la apertura se publica en
+un archivo SQLite (el del limitador de tasa): los demás procesos de la
+misma máquina (varios workers, trabajadores distribuidos locales) también
+se pausan hasta el fin del enfriamiento. Trabajadores en otras máquinas
+tienen su propio circuito. Tras el enfriamiento cada proceso envía su
+propia petición de prueba. Las variantes asíncronas (wait_async,
+record_failure_async) leen y escriben ese archivo en otro hilo
+(asyncio.to_thread): un bloqueo de SQLite no detiene el bucle de eventos.
+
+Así un fallo puntual no aborta el lote y un servidor caído no consume miles
+de URLs en fallos seguidos.
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+ERROR_TIMEOUT = 'timeout'
+ERROR_NAVIGATION = 'navigation'
+ERROR_SELECTOR = 'selector'
+ERROR_HTTP_5XX = 'http_5xx'
+ERROR_OTHER = 'other'
+
+DEFAULT_RETRY_BUDGETS = {
+    ERROR_TIMEOUT: 2,
+    ERROR_NAVIGATION: 3,
+    ERROR_SELECTOR: 1,
+    ERROR_HTTP_5XX: 4,
+    ERROR_OTHER: 0,
+}
+
+
+class BacktestHTTPError(Exception):
+    """Respuesta HTTP de error del servidor de backtest"""
+
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} en {url}")
+        self.status = status
+        self.url = url
+
+
+def classify_error(error):
+    """
+    Clasificar un error del flujo de backtest
+
+    Args:
+        error (Exception): Excepción capturada
+
+    Returns:
+        str: Una de las constantes ERROR_*
+    """
+    if isinstance(error, BacktestHTTPError):
+        return ERROR_HTTP_5XX if error.status >= 500 else ERROR_OTHER
+
+    message = str(error)
+    name = type(error).__name__
+
+    if 'net::ERR_' in message or 'Navigation failed' in message or 'NS_ERROR' in message:
+        return ERROR_NAVIGATION
+    if name == 'TimeoutError' or 'Timeout' in message:
+        if 'waiting for selector' in message or 'waiting for locator' in message:
+            return ERROR_SELECTOR
+        return ERROR_TIMEOUT
+    if "'NoneType' object has no attribute" in message:
+        # query_selector devolvió None: el elemento no existe
+        return ERROR_SELECTOR
+    return ERROR_OTHER
+
+
+def host_of(url):
+    try:
+        return (urlsplit(str(url)).hostname or '').lower()
+    except ValueError:
+        return ''
+
+
+class RetryPolicy:
+    """
+    Presupuesto de reintentos por clase de error con backoff y jitter
+
+    Args:
+        budgets (dict): Reintentos máximos por clase de error
+        base_delay (float): Espera base en segundos
+        max_delay (float): Espera máxima en segundos
+    """
+
+    def __init__(self, budgets=None, base_delay=1.0, max_delay=30.0):
+        self.budgets = dict(DEFAULT_RETRY_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.retries = 0
+        self.retries_by_class = {}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            budgets=config.get('retry_budgets') or {},
+            base_delay=float(config.get('retry_base_delay', 1.0)),
+            max_delay=float(config.get('retry_max_delay', 30.0)),
+        )
+
+    def should_retry(self, error_class, used):
+        """
+        Decidir si queda presupuesto para otro intento
+
+        Args:
+            error_class (str): Clase de error (classify_error)
+            used (dict): Reintentos ya usados por clase para esta URL
+
+        Returns:
+            bool: True si se debe reintentar
+        """
+        return used.get(error_class, 0) < self.budgets.get(error_class, 0)
+
+    def delay_for(self, attempt):
+        """Backoff exponencial con jitter completo para el intento `attempt` (0, 1, ...)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def count_retry(self, error_class):
+        self.retries += 1
+        self.retries_by_class[error_class] = self.retries_by_class.get(error_class, 0) + 1
+
+    def get_stats(self):
+        stats = {'retries': self.retries}
+        for error_class, count in self.retries_by_class.items():
+            stats[f'retries_{error_class}'] = count
+        return stats
+
+
+class _HostCircuit:
+    def __init__(self, window):
+        self.outcomes = deque(maxlen=window)
+        self.state = 'closed'
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.next_shared_check = 0.0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por host
+
+    Estados:
+        closed: tráfico normal, se registran los resultados
+        open: nadie pasa hasta que termine el enfriamiento
+        half_open: pasa una sola petición de prueba; si va bien se cierra
+
+    Args:
+        failure_threshold (float): Proporción de fallos que abre el circuito
+        window (int): Resultados recientes considerados
+        min_requests (int): Resultados mínimos antes de poder abrir
+        cooldown (float): Segundos en estado abierto
+        state_path (str, optional): Archivo SQLite donde se publican las
+            aperturas para los demás procesos; sin él el circuito es local
+        shared_check_interval (float): Segundos entre consultas del estado
+            compartido de un mismo host
+    """
+
+    def __init__(self, failure_threshold=0.5, window=20, min_requests=10, cooldown=60.0,
+                 state_path=None, shared_check_interval=1.0):
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self.state_path = state_path
+        self.shared_check_interval = shared_check_interval
+        self._circuits = {}
+        self._conn = None
+        self._conn_lock = threading.Lock()
+
+        self.trips = 0
+        self.shared_pauses = 0
+
+    @classmethod
+    def from_config(cls, config, state_path=None):
+        return cls(
+            failure_threshold=float(config.get('breaker_failure_threshold', 0.5)),
+            window=int(config.get('breaker_window', 20)),
+            min_requests=int(config.get('breaker_min_requests', 10)),
+            cooldown=float(config.get('breaker_cooldown', 60.0)),
+            state_path=state_path,
+        )
+
+    # -------------------------------------------------------------------------
+    # Estado compartido entre procesos
+    # -------------------------------------------------------------------------
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+            conn = sqlite3.connect(self.state_path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS breakers ("
+                " host TEXT PRIMARY KEY, open_until REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _shared_open_until(self, host):
+        # Lectura en modo WAL: no espera a los procesos que escriben
+        try:
+            with self._conn_lock:
+                row = self._connect().execute(
+                    "SELECT open_until FROM breakers WHERE host = ?", (host,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error leyendo el estado compartido del circuito: {e}")
+            return 0.0
+        return row[0] if row else 0.0
+
+    def _publish_open(self, host, open_until):
+        try:
+            with self._conn_lock:
+                self._connect().execute(
+                    "INSERT INTO breakers (host, open_until) VALUES (?, ?)"
+                    " ON CONFLICT(host) DO UPDATE SET open_until = MAX(open_until, excluded.open_until)",
+                    (host, open_until),
+                )
+        except sqlite3.Error as e:
+            print(f"Error publicando la apertura del circuito: {e}")
+
+    def _shared_check_due(self, circuit):
+        # Como mucho una consulta del estado compartido por host e intervalo
+        now = time.monotonic()
+        if self.state_path is None or circuit.state != 'closed' or now < circuit.next_shared_check:
+            return False
+        circuit.next_shared_check = now + self.shared_check_interval
+        return True
+
+    def _adopt_shared(self, circuit, open_until):
+        # Adoptar una apertura publicada por otro proceso
+        remaining = open_until - time.time()
+        if remaining > 0 and circuit.state == 'closed':
+            circuit.state = 'open'
+            circuit.opened_at = time.monotonic() + remaining - self.cooldown
+            circuit.probe_in_flight = False
+            circuit.outcomes.clear()
+            self.shared_pauses += 1
+
+    def _circuit(self, host):
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits[host] = _HostCircuit(self.window)
+        return circuit
+
+    def try_acquire(self, host):
+        """
+        Pedir paso para una petición contra `host`
+
+        Returns:
+            float: 0 si puede continuar; si no, segundos sugeridos de espera
+        """
+        circuit = self._circuit(host)
+        if self._shared_check_due(circuit):
+            self._adopt_shared(circuit, self._shared_open_until(host))
+        return self._acquire(circuit)
+
+    async def try_acquire_async(self, host):
+        """Versión asíncrona de try_acquire(): SQLite se consulta en otro hilo"""
+        import asyncio
+
+        circuit = self._circuit(host)
+        if self._shared_check_due(circuit):
+            open_until = await asyncio.to_thread(self._shared_open_until, host)
+            self._adopt_shared(circuit, open_until)
+        return self._acquire(circuit)
+
+    def _acquire(self, circuit):
+        if circuit.state == 'closed':
+            return 0.0
+
+        if circuit.state == 'open':
+            remaining = circuit.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                return remaining
+            circuit.state = 'half_open'
+
+        # half_open: una única petición de prueba
+        if circuit.probe_in_flight:
+            return 1.0
+        circuit.probe_in_flight = True
+        return 0.0
+
+    def wait(self, host):
+        """Bloquear (código síncrono) hasta que el circuito permita pasar"""
+        delay = self.try_acquire(host)
+        while delay > 0:
+            time.sleep(min(delay, 5.0))
+            delay = self.try_acquire(host)
+
+    async def wait_async(self, host):
+        """Esperar (corrutina) hasta que el circuito permita pasar"""
+        import asyncio
+
+        delay = await self.try_acquire_async(host)
+        while delay > 0:
+            await asyncio.sleep(min(delay, 5.0))
+            delay = await self.try_acquire_async(host)
+
+    def record_success(self, host):
+        circuit = self._circuit(host)
+        if circuit.state != 'closed':
+            # La prueba fue bien: se reabre el tráfico con historial limpio
+            circuit.state = 'closed'
+            circuit.probe_in_flight = False
+            circuit.outcomes.clear()
+        circuit.outcomes.append(True)
+
+    def release(self, host):
+        """
+        La petición autorizada terminó sin resultado (cancelada o interrumpida)
+
+        Si era la petición de prueba, se permite otra en lugar de dejar el
+        circuito bloqueado en half_open.
+        """
+        circuit = self._circuit(host)
+        if circuit.state == 'half_open':
+            circuit.probe_in_flight = False
+
+    def record_failure(self, host):
+        open_until = self._record_failure(host)
+        if open_until is not None:
+            self._publish_open(host, open_until)
+
+    async def record_failure_async(self, host):
+        """Versión asíncrona de record_failure(): la apertura se publica en otro hilo"""
+        import asyncio
+
+        open_until = self._record_failure(host)
+        if open_until is not None:
+            await asyncio.to_thread(self._publish_open, host, open_until)
+
+    def _record_failure(self, host):
+        # Devuelve el fin de la apertura a publicar si el circuito se abre
+        circuit = self._circuit(host)
+        if circuit.state != 'half_open':
+            circuit.outcomes.append(False)
+            failures = circuit.outcomes.count(False)
+            if (len(circuit.outcomes) < self.min_requests
+                    or failures / len(circuit.outcomes) < self.failure_threshold):
+                return None
+        return self._open(circuit, host)
+
+    def _open(self, circuit, host):
+        circuit.state = 'open'
+        circuit.opened_at = time.monotonic()
+        circuit.probe_in_flight = False
+        circuit.outcomes.clear()
+        self.trips += 1
+        print(f"⛔ Circuito abierto para {host or 'host desconocido'}: "
+              f"pausa de {self.cooldown:.0f}s por tasa de errores elevada")
+        return time.time() + self.cooldown if self.state_path is not None else None
+
+    def get_stats(self):
+        return {'breaker_trips': self.trips, 'breaker_shared_pauses': self.shared_pauses}
+
+    def close(self):
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,192 @@
+"""
+Planificador de la lista de URLs
+================================
+
+Por defecto las URLs se procesan en el orden del archivo de links. El
+planificador permite otro orden:
+
+- Prioridad: si el archivo tiene columna "priority"/"prioridad", los valores
+  más bajos se ejecutan antes (1 antes que 2); las filas sin prioridad (o con
+  un valor no numérico, nan o inf) al final
+- Dentro de cada nivel de prioridad, una política:
+    fifo: orden del archivo
+    shortest_first: primero las URLs con menor latencia histórica
+    round_robin: alterna entre grupos de ticker/estrategia
+
+La latencia histórica por URL se guarda en LatencyHistory (SQLite en la
+carpeta Cache) como media móvil exponencial de cada backtest ejecutado.
+"""
+
+import math
+import os
+import sqlite3
+import time
+from collections import OrderedDict, deque
+from urllib.parse import urlsplit
+
+from Bot.result_cache import normalize_url
+from Bot.step_timing import percentile
+
+SCHEDULE_POLICIES = ('fifo', 'shortest_first', 'round_robin')
+
+
+class LatencyHistory:
+    """
+    Latencia histórica por URL (media móvil exponencial)
+
+    Args:
+        path (str): Archivo SQLite
+        alpha (float): Peso de la muestra nueva en la media
+    """
+
+    def __init__(self, path, alpha=0.3):
+        self.path = path
+        self.alpha = alpha
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # check_same_thread=False: el motor asíncrono la usa desde su hilo
+            # de E/S (bot.run_io), nunca a la vez que otro hilo
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS latency ("
+                " url TEXT PRIMARY KEY, seconds REAL NOT NULL,"
+                " samples INTEGER NOT NULL, updated REAL NOT NULL)"
+            )
+        return self._conn
+
+    def record(self, url, seconds):
+        """Añadir la duración (s) de un backtest de `url`"""
+        conn = self._connect()
+        key = normalize_url(url)
+        with conn:
+            row = conn.execute("SELECT seconds, samples FROM latency WHERE url = ?",
+                               (key,)).fetchone()
+            if row is None:
+                average, samples = seconds, 1
+            else:
+                average = row[0] + self.alpha * (seconds - row[0])
+                samples = row[1] + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO latency (url, seconds, samples, updated)"
+                " VALUES (?, ?, ?, ?)",
+                (key, average, samples, time.time()),
+            )
+
+    def lookup(self, urls):
+        """
+        Latencias conocidas de un conjunto de URLs
+
+        Returns:
+            dict: url original -> segundos estimados (solo las conocidas)
+        """
+        conn = self._connect()
+        keys = {normalize_url(url): url for url in urls}
+        known = {}
+        items = list(keys)
+        # Consultas por bloques: SQLite limita el número de parámetros
+        for start in range(0, len(items), 500):
+            chunk = items[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for key, seconds in conn.execute(
+                    f"SELECT url, seconds FROM latency WHERE url IN ({placeholders})", chunk):
+                known[keys[key]] = seconds
+        return known
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class Scheduler:
+    """
+    Ordena los trabajos según prioridad y política
+
+    Args:
+        policy (str): Una de SCHEDULE_POLICIES
+        history (LatencyHistory, optional): Necesario para shortest_first
+    """
+
+    def __init__(self, policy='fifo', history=None):
+        if policy not in SCHEDULE_POLICIES:
+            print(f"Política de planificación desconocida '{policy}', se usa fifo")
+            policy = 'fifo'
+        self.policy = policy
+        self.history = history
+
+    @classmethod
+    def from_config(cls, config, history=None):
+        return cls(policy=config.get('schedule_policy', 'fifo') or 'fifo', history=history)
+
+    def order(self, jobs):
+        """
+        Ordenar los trabajos
+
+        Args:
+            jobs (list): Tuplas (índice, fila) con fila de iter_link_rows()
+
+        Returns:
+            list: Tuplas (índice, url) en el orden de ejecución
+        """
+        levels = OrderedDict()
+        for job in sorted(jobs, key=lambda job: self._priority_key(job[1])):
+            levels.setdefault(self._priority_key(job[1]), []).append(job)
+
+        ordered = []
+        for level_jobs in levels.values():
+            if self.policy == 'shortest_first':
+                level_jobs = self._shortest_first(level_jobs)
+            elif self.policy == 'round_robin':
+                level_jobs = self._round_robin(level_jobs)
+            ordered.extend((index, row['url']) for index, row in level_jobs)
+        return ordered
+
+    @staticmethod
+    def _priority_key(row):
+        try:
+            priority = float(row.get('priority'))
+        except (TypeError, ValueError):
+            priority = None
+        # nan no se puede comparar: rompería el orden de sorted()
+        if priority is None or not math.isfinite(priority):
+            # Sin prioridad (no numérica o no finita): después de todas las demás
+            return (1, 0.0)
+        return (0, priority)
+
+    def _shortest_first(self, jobs):
+        if self.history is None:
+            return jobs
+        known = self.history.lookup(row['url'] for _, row in jobs)
+        # Las URLs sin historial se estiman con la mediana de las conocidas
+        default = percentile(known.values(), 50) or 0.0
+        # sorted es estable: a igual latencia se mantiene el orden del archivo
+        return sorted(jobs, key=lambda job: known.get(job[1]['url'], default))
+
+    @staticmethod
+    def _round_robin(jobs):
+        groups = OrderedDict()
+        for job in jobs:
+            groups.setdefault(_group_of(job[1]), deque()).append(job)
+
+        ordered = []
+        queues = deque(groups.values())
+        while queues:
+            queue = queues.popleft()
+            ordered.append(queue.popleft())
+            if queue:
+                queues.append(queue)
+        return ordered
+
+
+def _group_of(row):
+    # Grupo de round-robin: ticker/estrategia, o la ruta de la URL si no hay columnas
+    if row.get('ticker') or row.get('strategy'):
+        return (row.get('ticker'), row.get('strategy'))
+    try:
+        return urlsplit(row['url']).path
+    except ValueError:
+        return row['url']
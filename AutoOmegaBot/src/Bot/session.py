@@ -0,0 +1,295 @@
+"""
+Reutilización de la sesión autenticada
+======================================
+
+Cada contexto nuevo del navegador empieza sin cookies, así que el login (o
+el aviso de cookies) se repetiría por cada contexto. SessionManager:
+
+- Inicia sesión una sola vez y guarda el storage state de Playwright
+  (cookies + localStorage) en la carpeta Config
+- Aplica ese estado a cada contexto nuevo del pool
+- Detecta la sesión caducada (redirección a la página de login) y la renueva;
+  si otro contexto ya la renovó, solo recarga el estado desde disco
+
+Solo se guarda el estado tras un login correcto. Sin login_url no hay
+sesión que compartir: cada URL conserva su contexto aislado y nunca se
+copian a las demás las cookies o el localStorage de una página cualquiera.
+"""
+
+import json
+import os
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_LOGIN_SELECTORS = {
+    'username': 'input[name="username"]',
+    'password': 'input[type="password"]',
+    'submit': 'button[type="submit"]',
+}
+
+# Restaura el localStorage guardado antes de que corra el código de la página
+_LOCAL_STORAGE_SCRIPT = """
+(() => {
+    const origins = %s;
+    const items = origins[window.location.origin];
+    if (!items) return;
+    for (const item of items) {
+        window.localStorage.setItem(item.name, item.value);
+    }
+})();
+"""
+
+
+class SessionManager:
+    """
+    Login único y storage state compartido por todos los contextos
+
+    Args:
+        state_path (str): Archivo JSON donde se guarda el storage state
+        login_url (str): Página de login; vacío si la plataforma no lo requiere
+        username (str): Usuario del login
+        password (str): Contraseña del login
+        selectors (dict): Selectores username, password y submit del formulario
+        max_age_seconds (float): Antigüedad máxima del estado guardado
+        timeout_ms (int): Timeout de cada paso del login
+    """
+
+    def __init__(self, state_path, login_url='', username='', password='',
+                 selectors=None, max_age_seconds=12 * 3600, timeout_ms=30000):
+        self.state_path = state_path
+        self.login_url = login_url or ''
+        self.username = username or ''
+        self.password = password or ''
+        self.selectors = dict(DEFAULT_LOGIN_SELECTORS)
+        self.selectors.update(selectors or {})
+        self.max_age_seconds = max_age_seconds
+        self.timeout_ms = timeout_ms
+
+        self._state = None
+        self._state_mtime = 0.0
+        # id(context) -> mtime del estado aplicado a ese contexto
+        self._applied = {}
+        self._lock = None
+
+        self.logins = 0
+        self.reuses = 0
+        self.refreshes = 0
+
+    @classmethod
+    def from_config(cls, config, state_path):
+        """
+        Crear el gestor de sesión desde config.json
+
+        Las credenciales pueden venir de OMEGABOT_USERNAME/OMEGABOT_PASSWORD
+        para no guardarlas en el JSON.
+
+        Returns:
+            SessionManager: Gestor, o None si session_enabled es False o no
+                hay login_url
+        """
+        if not config.get('session_enabled', True) or not config.get('login_url'):
+            return None
+        return cls(
+            state_path,
+            login_url=config.get('login_url', ''),
+            username=os.environ.get('OMEGABOT_USERNAME') or config.get('login_username', ''),
+            password=os.environ.get('OMEGABOT_PASSWORD') or config.get('login_password', ''),
+            selectors=config.get('login_selectors') or {},
+            max_age_seconds=float(config.get('session_max_age_hours', 12) or 0) * 3600,
+            timeout_ms=int(config.get('step_timeout_ms', 30000)),
+        )
+
+    # -------------------------------------------------------------------------
+    # Estado en disco
+    # -------------------------------------------------------------------------
+
+    def _file_mtime(self):
+        try:
+            return os.path.getmtime(self.state_path)
+        except OSError:
+            return 0.0
+
+    def load_state(self):
+        """
+        Leer el storage state guardado si existe y no ha caducado
+
+        Returns:
+            dict: Storage state de Playwright, o None
+        """
+        mtime = self._file_mtime()
+        if not mtime:
+            return None
+        if self.max_age_seconds and time.time() - mtime > self.max_age_seconds:
+            return None
+        if self._state is None or mtime != self._state_mtime:
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    self._state = json.load(f)
+                self._state_mtime = mtime
+            except (OSError, ValueError) as e:
+                print(f"Error leyendo la sesión guardada: {e}")
+                return None
+        return self._state
+
+    def save_state(self, state):
+        """Guardar el storage state de forma atómica (otros procesos lo leen)"""
+        folder = os.path.dirname(os.path.abspath(self.state_path))
+        os.makedirs(folder, exist_ok=True)
+        # Temporal único por escritura: varios procesos pueden renovar la sesión a la vez
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=folder, delete=False,
+                                         prefix=os.path.basename(self.state_path) + '.',
+                                         suffix='.tmp') as f:
+            json.dump(state, f)
+        try:
+            os.replace(f.name, self.state_path)
+        except OSError:
+            os.remove(f.name)
+            raise
+        self._state = state
+        self._state_mtime = self._file_mtime()
+
+    def _local_storage_script(self, state):
+        origins = {
+            entry['origin']: entry.get('localStorage') or []
+            for entry in state.get('origins') or []
+            if entry.get('localStorage')
+        }
+        if not origins:
+            return None
+        return _LOCAL_STORAGE_SCRIPT % json.dumps(origins)
+
+    def is_login_url(self, url):
+        if not self.login_url:
+            return False
+        login = urlsplit(self.login_url)
+        current = urlsplit(url or '')
+        return (current.hostname == login.hostname
+                and current.path.rstrip('/') == login.path.rstrip('/'))
+
+    # -------------------------------------------------------------------------
+    # playwright.sync_api
+    # -------------------------------------------------------------------------
+
+    def ensure(self, context):
+        """Dejar un contexto nuevo con sesión: estado guardado o login"""
+        if not self.login_url:
+            return
+        state = self.load_state()
+        if state is not None:
+            self.apply(context, state)
+            self.reuses += 1
+        else:
+            self.login(context)
+
+    def apply(self, context, state):
+        context.add_cookies(state.get('cookies') or [])
+        script = self._local_storage_script(state)
+        if script:
+            context.add_init_script(script)
+        self._applied[id(context)] = self._state_mtime
+
+    def login(self, context):
+        """Iniciar sesión en `context` y guardar su storage state"""
+        page = context.new_page()
+        try:
+            page.goto(self.login_url, wait_until='domcontentloaded', timeout=self.timeout_ms)
+            page.fill(self.selectors['username'], self.username, timeout=self.timeout_ms)
+            page.fill(self.selectors['password'], self.password, timeout=self.timeout_ms)
+            page.click(self.selectors['submit'], timeout=self.timeout_ms)
+            # El login terminó cuando el formulario desaparece
+            page.wait_for_selector(self.selectors['password'], state='detached',
+                                   timeout=self.timeout_ms)
+            self.save_state(context.storage_state())
+        finally:
+            page.close()
+        self._applied[id(context)] = self._state_mtime
+        self.logins += 1
+        print("🔐 Sesión iniciada y guardada para reutilizarla")
+
+    def is_login_page(self, page):
+        """True si la página fue redirigida al login (sesión caducada)"""
+        if not self.login_url:
+            return False
+        if self.is_login_url(page.url):
+            return True
+        return page.query_selector(self.selectors['password']) is not None
+
+    def refresh(self, context):
+        """Renovar la sesión de un contexto cuya sesión caducó"""
+        self.refreshes += 1
+        state = self.load_state()
+        if state is not None and self._state_mtime > self._applied.get(id(context), 0.0):
+            # Otro contexto ya renovó la sesión: basta con cargarla
+            self.apply(context, state)
+        else:
+            self.login(context)
+
+    # -------------------------------------------------------------------------
+    # playwright.async_api
+    # -------------------------------------------------------------------------
+
+    def _get_lock(self):
+        # Un solo login a la vez entre las corrutinas del proceso
+        import asyncio
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def ensure_async(self, context):
+        if not self.login_url:
+            return
+        async with self._get_lock():
+            state = self.load_state()
+            if state is not None:
+                await self.apply_async(context, state)
+                self.reuses += 1
+            else:
+                await self.login_async(context)
+
+    async def apply_async(self, context, state):
+        await context.add_cookies(state.get('cookies') or [])
+        script = self._local_storage_script(state)
+        if script:
+            await context.add_init_script(script)
+        self._applied[id(context)] = self._state_mtime
+
+    async def login_async(self, context):
+        page = await context.new_page()
+        try:
+            await page.goto(self.login_url, wait_until='domcontentloaded', timeout=self.timeout_ms)
+            await page.fill(self.selectors['username'], self.username, timeout=self.timeout_ms)
+            await page.fill(self.selectors['password'], self.password, timeout=self.timeout_ms)
+            await page.click(self.selectors['submit'], timeout=self.timeout_ms)
+            await page.wait_for_selector(self.selectors['password'], state='detached',
+                                         timeout=self.timeout_ms)
+            self.save_state(await context.storage_state())
+        finally:
+            await page.close()
+        self._applied[id(context)] = self._state_mtime
+        self.logins += 1
+        print("🔐 Sesión iniciada y guardada para reutilizarla")
+
+    async def is_login_page_async(self, page):
+        if not self.login_url:
+            return False
+        if self.is_login_url(page.url):
+            return True
+        return await page.query_selector(self.selectors['password']) is not None
+
+    async def refresh_async(self, context):
+        async with self._get_lock():
+            self.refreshes += 1
+            state = self.load_state()
+            if state is not None and self._state_mtime > self._applied.get(id(context), 0.0):
+                await self.apply_async(context, state)
+            else:
+                await self.login_async(context)
+
+    def get_stats(self):
+        return {
+            'session_logins': self.logins,
+            'session_reuses': self.reuses,
+            'session_refreshes': self.refreshes,
+        }
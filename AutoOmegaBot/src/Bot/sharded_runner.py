@@ -0,0 +1,289 @@
+"""
+Ejecución multiproceso de AutoOmegaBot
+======================================
+
+Reparte las URLs entre varios procesos trabajadores. Las URLs se agrupan en
+fragmentos pequeños dentro de una cola compartida y cada proceso toma el
+siguiente fragmento cuando tiene huecos libres, así que un grupo de URLs
+lentas o fallidas no deja a los demás procesos parados. Cada proceso lanza
+su propio navegador, ejecuta sus fragmentos con el motor asíncrono y envía
+cada resultado por otra cola al proceso principal, que es el único escritor.
+
+Así un lote grande deja de estar limitado por el event loop de un único
+proceso y escala con el número de núcleos.
+
+El principal sabe qué fragmentos tiene en curso cada proceso. Si uno muere
+(o falla) antes de terminarlos, sus URLs sin resultado pasan a un proceso
+de reemplazo; si este también cae, quedan registradas como error.
+"""
+
+import multiprocessing
+import queue
+import time
+
+from Bot.step_timing import merge_step_stats
+
+# Veces que se reintentan en otro proceso los trabajos de un fragmento
+# cuyo proceso murió
+MAX_CHUNK_REQUEUES = 1
+
+# Mensajes de la cola de resultados
+_MSG_TAKEN = 'taken'
+_MSG_RESULT = 'result'
+_MSG_DONE = 'done'
+_MSG_ERROR = 'error'
+
+
+def chunk_jobs(jobs, size):
+    """
+    Agrupar los trabajos en fragmentos consecutivos de como mucho `size`
+
+    Args:
+        jobs (iterable): Tuplas (índice_global, url, parámetros)
+        size (int): Trabajos por fragmento
+
+    Returns:
+        list: Lista de fragmentos no vacíos, cada uno con tuplas de `jobs`
+    """
+    size = max(1, int(size))
+    jobs = list(jobs)
+    return [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+
+def _iter_chunks(worker_id, job_queue, result_queue):
+    """Trabajos de los fragmentos que el proceso va tomando de la cola compartida"""
+    while True:
+        item = job_queue.get()
+        if item is None:
+            return
+        chunk_id, chunk = item
+        # El principal sabe qué fragmentos tenía el proceso si este muere
+        result_queue.put((_MSG_TAKEN, worker_id, chunk_id, None))
+        yield from chunk
+
+
+def sum_worker_stats(worker_stats):
+    """
+    Sumar los contadores enteros de las estadísticas de varios trabajadores
+
+    Las latencias por paso se combinan a partir de las muestras que cada
+    trabajador envía en 'step_samples' (AdaptiveTimeouts.export()).
+
+    Args:
+        worker_stats (iterable): Diccionarios de estadísticas, uno por trabajador
+
+    Returns:
+        dict: Totales con las tasas de reutilización recalculadas
+    """
+    worker_stats = list(worker_stats)
+    totals = {'launches': 0, 'contexts_created': 0, 'context_recycles': 0, 'pages_served': 0}
+    for stats in worker_stats:
+        for key, value in stats.items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                totals[key] = totals.get(key, 0) + value
+    served = totals['pages_served']
+    totals['browser_reuse_rate'] = (1 - totals['launches'] / served) if served else 0.0
+    totals['context_reuse_rate'] = (1 - totals['contexts_created'] / served) if served else 0.0
+    totals['workers'] = len(worker_stats)
+    step_samples = [stats['step_samples'] for stats in worker_stats if stats.get('step_samples')]
+    if step_samples:
+        totals['step_latency'] = merge_step_stats(step_samples)
+    return totals
+
+
+def _worker_main(worker_id, job_queue, bot_options, concurrency, result_queue):
+    """Punto de entrada de cada proceso trabajador"""
+    import asyncio
+    from Bot.bot import AutoOmegaBot
+    from Bot.async_engine import run_backtests_async
+
+    try:
+        bot = AutoOmegaBot(**bot_options)
+
+        def on_result(index, result):
+            result_queue.put((_MSG_RESULT, worker_id, index, result))
+
+        jobs = _iter_chunks(worker_id, job_queue, result_queue)
+        _, stats = asyncio.run(run_backtests_async(bot, jobs, concurrency, on_result))
+        stats['step_samples'] = bot.step_timeouts.export()
+        result_queue.put((_MSG_DONE, worker_id, None, stats))
+    except Exception as e:
+        result_queue.put((_MSG_ERROR, worker_id, None, f"{type(e).__name__}: {e}"))
+
+
+class ShardedRunner:
+    """
+    Coordinador de procesos trabajadores
+
+    Args:
+        bot (AutoOmegaBot): Bot del proceso principal; cada trabajador construye
+            el suyo a partir de bot.get_worker_options()
+        workers (int): Número de procesos
+        concurrency (int): Páginas simultáneas por proceso
+        chunk_size (int, optional): Trabajos por fragmento de la cola compartida;
+            por defecto `concurrency`, lo que llena los huecos de un proceso
+    """
+
+    # Punto de entrada de los procesos (función de módulo: spawn la importa)
+    worker_main = staticmethod(_worker_main)
+
+    def __init__(self, bot, workers, concurrency, chunk_size=None):
+        self.bot = bot
+        self.workers = max(1, int(workers))
+        self.concurrency = max(1, int(concurrency))
+        self.chunk_size = max(1, int(chunk_size or self.concurrency))
+        self.worker_stats = {}
+        self.worker_errors = {}
+
+    def run(self, jobs, on_result):
+        """
+        Ejecutar todos los trabajos repartidos entre procesos
+
+        Args:
+            jobs (iterable): Tuplas (índice_global, url, parámetros) a procesar
+            on_result (callable): Llamada en el proceso principal con
+                (índice_global, resultado) por cada URL terminada
+
+        Returns:
+            dict: Estadísticas de pool agregadas de todos los trabajadores
+        """
+        chunks = chunk_jobs(jobs, self.chunk_size)
+        workers = min(self.workers, len(chunks))
+        # spawn: Playwright no tolera fork con hilos ya iniciados
+        ctx = multiprocessing.get_context('spawn')
+        job_queue = ctx.Queue()
+        result_queue = ctx.Queue()
+        for chunk_id, chunk in enumerate(chunks):
+            job_queue.put((chunk_id, chunk))
+        # Una marca de fin por proceso: cada uno termina al sacar la suya
+        for _ in range(workers):
+            job_queue.put(None)
+
+        processes = {}
+        queues = [job_queue]
+
+        def start_worker(jobs_from):
+            worker_id = len(processes)
+            process = ctx.Process(
+                target=self.worker_main,
+                args=(worker_id, jobs_from, self.bot.get_worker_options(),
+                      self.concurrency, result_queue),
+                daemon=True,
+            )
+            process.start()
+            processes[worker_id] = process
+            return worker_id
+
+        for _ in range(workers):
+            start_worker(job_queue)
+
+        pending = set(processes)
+        received = set()
+        taken_by = {}
+        # Fragmentos tomados por cada proceso y aún sin todos sus resultados
+        in_flight = {worker_id: set() for worker_id in processes}
+        remaining = {chunk_id: len(chunk) for chunk_id, chunk in enumerate(chunks)}
+        chunk_of = {index: chunk_id for chunk_id, chunk in enumerate(chunks)
+                    for index, _, _ in chunk}
+        requeues = {}
+
+        def worker_ended(worker_id, error=None):
+            pending.discard(worker_id)
+            if error is not None:
+                self.worker_errors[worker_id] = error
+            orphans = in_flight.pop(worker_id, set())
+            if error is None or self.bot.cancelled:
+                return
+            retry = [chunk_id for chunk_id in sorted(orphans)
+                     if requeues.get(chunk_id, 0) < MAX_CHUNK_REQUEUES]
+            if not retry:
+                return
+            # Cola propia del reemplazo: la compartida ya tiene las marcas de fin
+            private_queue = ctx.Queue()
+            queues.append(private_queue)
+            for chunk_id in retry:
+                requeues[chunk_id] = requeues.get(chunk_id, 0) + 1
+                jobs_left = [job for job in chunks[chunk_id] if job[0] not in received]
+                private_queue.put((chunk_id, jobs_left))
+            private_queue.put(None)
+            replacement = start_worker(private_queue)
+            pending.add(replacement)
+            in_flight[replacement] = set()
+            print(f"⚠️ Proceso {worker_id} caído ({error}); "
+                  f"{len(retry)} fragmento(s) pasan al proceso {replacement}")
+
+        def reap_dead_workers(queue_idle):
+            for worker_id in list(pending):
+                process = processes[worker_id]
+                if process.is_alive():
+                    continue
+                # Con código 0 su último aviso puede seguir en la cola:
+                # solo se da por perdido cuando la cola está vacía
+                if process.exitcode != 0 or queue_idle:
+                    worker_ended(worker_id, f"Proceso terminó con código {process.exitcode}")
+
+        try:
+            last_check = time.monotonic()
+            while pending and not self.bot.cancelled:
+                try:
+                    kind, worker_id, index, payload = result_queue.get(timeout=1.0)
+                except queue.Empty:
+                    kind = None
+
+                if kind == _MSG_TAKEN:
+                    taken_by[index] = worker_id
+                    if worker_id in in_flight and remaining[index]:
+                        in_flight[worker_id].add(index)
+                elif kind == _MSG_RESULT:
+                    # Un reemplazo puede repetir una URL cuyo resultado ya llegó
+                    if index not in received:
+                        received.add(index)
+                        chunk_id = chunk_of.get(index)
+                        if chunk_id is not None:
+                            remaining[chunk_id] -= 1
+                            if not remaining[chunk_id]:
+                                for chunks_taken in in_flight.values():
+                                    chunks_taken.discard(chunk_id)
+                        on_result(index, payload)
+                elif kind == _MSG_DONE:
+                    self.worker_stats[worker_id] = payload
+                    if worker_id in pending:
+                        worker_ended(worker_id)
+                elif kind == _MSG_ERROR:
+                    if worker_id in pending:
+                        worker_ended(worker_id, payload)
+
+                # Detectar procesos que murieron sin avisar
+                if kind is None or time.monotonic() - last_check >= 1.0:
+                    last_check = time.monotonic()
+                    reap_dead_workers(queue_idle=kind is None)
+        finally:
+            for process in processes.values():
+                # Al cancelar no se espera a que terminen sus fragmentos
+                process.join(timeout=0 if self.bot.cancelled else 5)
+                if process.is_alive():
+                    process.terminate()
+            for jobs_queue in queues:
+                jobs_queue.cancel_join_thread()
+
+        # Las URLs sin resultado (de un fragmento cuyo proceso y reemplazo
+        # cayeron, o que nadie llegó a tomar porque cayeron todos) quedan
+        # registradas como error; tras una cancelación quedan pendientes
+        # para --resume. Un proceso que muere puede perder su último aviso
+        # de fragmento tomado: sin dueño conocido se citan los errores de
+        # los caídos.
+        if not self.bot.cancelled:
+            any_error = '; '.join(sorted(set(self.worker_errors.values())))
+            for chunk_id, chunk in enumerate(chunks):
+                message = (self.worker_errors.get(taken_by.get(chunk_id)) or any_error
+                           or "Ningún proceso trabajador tomó el fragmento")
+                for index, url, params in chunk:
+                    if index not in received:
+                        error = RuntimeError(message)
+                        on_result(index, self.bot.make_result(url, error=error, params=params))
+
+        return self.get_stats()
+
+    def get_stats(self):
+        """Sumar las estadísticas (contadores enteros) de todos los trabajadores"""
+        return sum_worker_stats(self.worker_stats.values())
@@ -0,0 +1,218 @@
+"""
+Timeouts adaptativos por paso del flujo de backtest
+===================================================
+
+Cada paso del flujo (goto, New Backtest, YTD, fill, Run, respuesta de la
+API, resultado en el DOM) espera una condición explícita con su propio
+timeout. La latencia de cada paso
+exitoso se registra y, una vez hay muestras suficientes, el timeout pasa a
+ser un múltiplo del p95 observado (acotado entre un mínimo y un máximo).
+
+Así una ejecución sana no se ve afectada y una página atascada falla en
+segundos en lugar de agotar los 30 s por defecto de Playwright.
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+
+STEP_NAMES = ('goto', 'new_backtest', 'ytd', 'fill', 'run', 'api_response', 'result')
+
+
+def percentile(values, pct):
+    """
+    Percentil por interpolación lineal de una secuencia de valores
+
+    Args:
+        values (iterable): Valores numéricos
+        pct (float): Percentil entre 0 y 100
+
+    Returns:
+        float: Percentil, o None si no hay valores
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * pct / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    fraction = position - lower
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * fraction
+
+
+class AdaptiveTimeouts:
+    """
+    Registro de latencias por paso y cálculo de timeouts
+
+    Args:
+        initial_timeout_ms (int): Timeout mientras no hay muestras suficientes
+        min_timeout_ms (int): Timeout mínimo una vez adaptado
+        max_timeout_ms (int): Timeout máximo una vez adaptado
+        factor (float): Multiplicador aplicado al p95 observado
+        min_samples (int): Muestras necesarias antes de adaptar
+        window (int): Muestras recientes consideradas por paso
+        adaptive (bool): Si es False se usa siempre initial_timeout_ms
+        step_initial_ms (dict, optional): Timeout inicial propio de algunos
+            pasos (p. ej. api_response) en lugar de initial_timeout_ms
+    """
+
+    def __init__(self, initial_timeout_ms=30000, min_timeout_ms=3000,
+                 max_timeout_ms=60000, factor=3.0, min_samples=20, window=200,
+                 adaptive=True, step_initial_ms=None):
+        self.initial_timeout_ms = initial_timeout_ms
+        self.step_initial_ms = dict(step_initial_ms or {})
+        self.min_timeout_ms = min_timeout_ms
+        self.max_timeout_ms = max_timeout_ms
+        self.factor = factor
+        self.min_samples = min_samples
+        self.window = window
+        self.adaptive = adaptive
+
+        self._samples = {}
+        self._failures = {}
+
+    @classmethod
+    def from_config(cls, config):
+        initial = int(config.get('step_timeout_ms', 30000))
+        return cls(
+            initial_timeout_ms=initial,
+            min_timeout_ms=int(config.get('step_timeout_min_ms', 3000)),
+            max_timeout_ms=max(initial, int(config.get('step_timeout_max_ms', 60000))),
+            factor=float(config.get('step_timeout_factor', 3.0)),
+            adaptive=bool(config.get('adaptive_timeouts', True)),
+            step_initial_ms={'api_response': int(config.get('network_timeout_ms', 15000))},
+        )
+
+    def timeout_for(self, step):
+        """
+        Timeout actual (ms) de un paso
+
+        Args:
+            step (str): Nombre del paso
+
+        Returns:
+            int: Timeout en milisegundos
+        """
+        samples = self._samples.get(step)
+        if not self.adaptive or not samples or len(samples) < self.min_samples:
+            return self.step_initial_ms.get(step, self.initial_timeout_ms)
+        p95_ms = percentile(samples, 95) * 1000
+        return int(min(self.max_timeout_ms, max(self.min_timeout_ms, p95_ms * self.factor)))
+
+    def record(self, step, seconds):
+        """Registrar la latencia de un paso completado"""
+        samples = self._samples.get(step)
+        if samples is None:
+            samples = self._samples[step] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def record_failure(self, step):
+        self._failures[step] = self._failures.get(step, 0) + 1
+
+    @contextmanager
+    def step(self, name):
+        """
+        Medir un paso; entrega su timeout en ms
+
+        Funciona igual dentro de código síncrono y de corrutinas, ya que solo
+        mide tiempo alrededor del bloque.
+
+        Uso:
+            with timeouts.step('goto') as timeout_ms:
+                page.goto(url, timeout=timeout_ms)
+        """
+        start = time.perf_counter()
+        try:
+            yield self.timeout_for(name)
+        except Exception:
+            self.record_failure(name)
+            raise
+        self.record(name, time.perf_counter() - start)
+
+    def get_stats(self):
+        """
+        Resumen de latencias y timeouts por paso
+
+        Returns:
+            dict: paso -> {count, failures, p50_ms, p95_ms, timeout_ms}
+        """
+        return _summarize(self._samples, self._failures, self.timeout_for)
+
+    def export(self):
+        """
+        Muestras, fallos y timeouts actuales por paso, para que el proceso
+        principal los combine con los de otros trabajadores
+
+        Returns:
+            dict: {'samples', 'failures', 'timeout_ms'}, cada uno paso -> valor
+        """
+        steps = set(self._samples) | set(self._failures)
+        return {
+            'samples': {step: list(samples) for step, samples in self._samples.items()},
+            'failures': dict(self._failures),
+            'timeout_ms': {step: self.timeout_for(step) for step in steps},
+        }
+
+
+def _summarize(samples_by_step, failures_by_step, timeout_for):
+    summary = {}
+    for step in list(STEP_NAMES) + [s for s in samples_by_step if s not in STEP_NAMES]:
+        samples = samples_by_step.get(step) or ()
+        failures = failures_by_step.get(step, 0)
+        if not samples and not failures:
+            continue
+        p50 = percentile(samples, 50)
+        p95 = percentile(samples, 95)
+        summary[step] = {
+            'count': len(samples),
+            'failures': failures,
+            'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            'timeout_ms': timeout_for(step),
+        }
+    return summary
+
+
+def merge_step_stats(exports):
+    """
+    Combinar las latencias por paso de varios trabajadores
+
+    Los percentiles se calculan sobre la unión de las muestras y el timeout
+    de cada paso es el mayor de los trabajadores.
+
+    Args:
+        exports (iterable): Resultados de AdaptiveTimeouts.export()
+
+    Returns:
+        dict: Mismo formato que AdaptiveTimeouts.get_stats()
+    """
+    samples, failures, timeouts = {}, {}, {}
+    for export in exports:
+        for step, values in export.get('samples', {}).items():
+            samples.setdefault(step, []).extend(values)
+        for step, count in export.get('failures', {}).items():
+            failures[step] = failures.get(step, 0) + count
+        for step, timeout_ms in export.get('timeout_ms', {}).items():
+            timeouts[step] = max(timeouts.get(step, 0), timeout_ms)
+    for step in failures:
+        samples.setdefault(step, [])
+    return _summarize(samples, failures, lambda step: timeouts.get(step))
+
+
+def format_step_stats(step_stats):
+    """
+    Formatear el resumen de latencias por paso para logs
+
+    Args:
+        step_stats (dict): Resultado de AdaptiveTimeouts.get_stats()
+
+    Returns:
+        str: Una línea por paso
+    """
+    lines = ["⏱️ Latencia por paso (p50 / p95 / timeout actual):"]
+    for step, stats in step_stats.items():
+        lines.append(
+            f"  • {step}: {stats['p50_ms']} ms / {stats['p95_ms']} ms / "
+            f"{stats['timeout_ms']} ms - fallos: {stats['failures']}"
+        )
+    return "\n".join(lines)
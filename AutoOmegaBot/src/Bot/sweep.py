@@ -0,0 +1,155 @@
+"""
+Barrido de parámetros
+=====================
+
+Permite ejecutar cada URL con una rejilla de combinaciones de parámetros de
+estrategia (dte, percent, pct_type, buy_sell, call_put, qty) y de fondos en
+un solo lote, en lugar de relanzar el bot a mano por cada variante.
+
+El barrido se define en config.json, clave "sweep", con un valor por campo:
+
+    "sweep": {
+        "dte": [30, 45, 60],
+        "percent": {"start": 5, "stop": 20, "step": 5},
+        "buy_sell": ["Buy", "Sell"]
+    }
+
+- Lista: valores explícitos
+- {"start", "stop", "step"}: rango inclusivo
+- Valor suelto: un único valor
+
+Los campos no barridos conservan su valor de la configuración. Cada
+combinación se identifica con su clave de barrido ("dte=30|percent=5"), que
+se usa en el journal, la caché y las columnas del resultado.
+"""
+
+import itertools
+
+STRATEGY_SWEEP_FIELDS = ('dte', 'percent', 'pct_type', 'buy_sell', 'call_put', 'qty')
+
+FUNDS_SWEEP_FIELDS = (
+    'starting_funds', 'margin_allocation_percent', 'max_contracts_per_trade',
+    'max_open_trades', 'max_allocation_amount', 'prune_oldest_trades',
+    'ignore_margin_requirements',
+)
+
+SWEEP_FIELDS = STRATEGY_SWEEP_FIELDS + FUNDS_SWEEP_FIELDS
+
+
+def normalize_value(value):
+    """
+    Forma canónica de un valor para comparar combinaciones
+
+    5.0 y 5 son el mismo valor; los textos se recortan.
+    """
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else round(value, 10)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def expand_values(spec):
+    """
+    Expandir la especificación de un campo a su lista de valores
+
+    Args:
+        spec: Lista, rango {"start", "stop", "step"} o valor suelto
+
+    Returns:
+        list: Valores normalizados y sin duplicados, en orden
+    """
+    if isinstance(spec, dict):
+        start = spec.get('start')
+        stop = spec.get('stop', start)
+        step = spec.get('step') or 1
+        if start is None or step <= 0:
+            raise ValueError(f"Rango de barrido inválido: {spec}")
+        count = int((stop - start) / step + 1e-9) + 1
+        values = [start + i * step for i in range(max(0, count))]
+    elif isinstance(spec, (list, tuple)):
+        values = list(spec)
+    else:
+        values = [spec]
+
+    unique = []
+    for value in values:
+        value = normalize_value(value)
+        if value not in unique:
+            unique.append(value)
+    return unique
+
+
+def expand_grid(sweep_spec):
+    """
+    Expandir el barrido a la lista de combinaciones
+
+    Args:
+        sweep_spec (dict): Campo -> especificación (ver expand_values)
+
+    Returns:
+        list: Diccionarios {campo: valor}, uno por combinación, sin duplicados.
+            Lista vacía si no hay barrido.
+    """
+    fields = []
+    for field in sweep_spec or {}:
+        if field not in SWEEP_FIELDS:
+            print(f"Campo de barrido desconocido ignorado: {field}")
+            continue
+        fields.append(field)
+    if not fields:
+        return []
+
+    # Orden fijo de campos: la misma rejilla produce siempre las mismas claves
+    fields.sort(key=SWEEP_FIELDS.index)
+    values = [expand_values(sweep_spec[field]) for field in fields]
+
+    grid = []
+    seen = set()
+    for combination in itertools.product(*values):
+        params = dict(zip(fields, combination))
+        key = sweep_key(params)
+        if key not in seen:
+            seen.add(key)
+            grid.append(params)
+    return grid
+
+
+def sweep_key(params):
+    """
+    Clave legible de una combinación, p.ej. "dte=30|percent=5"
+
+    Returns:
+        str: Clave, o cadena vacía si no hay parámetros
+    """
+    if not params:
+        return ''
+    return '|'.join(f"{field}={normalize_value(params[field])}"
+                    for field in sorted(params, key=_field_order))
+
+
+def job_key(url, key=''):
+    """Clave de progreso de un trabajo: la URL, más su combinación si hay barrido"""
+    return f"{url}#{key}" if key else url
+
+
+def format_sweep_progress(progress):
+    """
+    Formatear el avance del barrido por combinación para logs
+
+    Args:
+        progress (dict): clave de barrido -> {'completed', 'errors'}
+
+    Returns:
+        str: Una línea por combinación
+    """
+    lines = ["🧮 Resultados por combinación (completados / errores):"]
+    for key, counts in progress.items():
+        lines.append(f"  • {key}: {counts['completed']} / {counts['errors']}")
+    return "\n".join(lines)
+
+
+def _field_order(field):
+    return SWEEP_FIELDS.index(field) if field in SWEEP_FIELDS else len(SWEEP_FIELDS)
@@ -0,0 +1,200 @@
+"""
+Lectura en streaming del archivo de links
+=========================================
+
+Genera las URLs de la primera columna del archivo de links sin cargar el
+archivo completo en memoria:
+
+- .xlsx: openpyxl en modo read_only, fila a fila
+- .csv: pandas.read_csv por bloques (chunksize)
+- .xls: openpyxl no soporta el formato antiguo, se lee con pandas
+
+Igual que el cargador original, la primera fila se trata como encabezado.
+iter_link_rows además usa ese encabezado para leer columnas opcionales
+(prioridad, ticker, estrategia) que alimentan al planificador.
+"""
+
+import os
+
+
+def iter_urls(file_path, chunk_size=1000):
+    """
+    Iterar las URLs del archivo de links de forma perezosa
+
+    Args:
+        file_path (str): Ruta al archivo .xlsx, .csv o .xls
+        chunk_size (int): Filas por bloque al leer CSV
+
+    Yields:
+        str: URL no vacía de la primera columna
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension == '.xlsx':
+        rows = _iter_xlsx_first_column(file_path)
+    elif extension == '.csv':
+        rows = _iter_csv_first_column(file_path, chunk_size)
+    elif extension == '.xls':
+        rows = _iter_xls_first_column(file_path)
+    else:
+        raise ValueError(f"Formato de archivo no soportado: {extension}")
+
+    for value in rows:
+        url = _clean_url(value)
+        if url:
+            yield url
+
+
+# Columnas opcionales del archivo de links y los encabezados que las identifican
+LINK_COLUMNS = {
+    'priority': ('priority', 'prioridad'),
+    'ticker': ('ticker',),
+    'strategy': ('strategy', 'estrategia'),
+}
+
+
+def iter_link_rows(file_path, chunk_size=1000):
+    """
+    Iterar las filas del archivo de links con sus columnas opcionales
+
+    La URL sigue siendo la primera columna; prioridad, ticker y estrategia
+    se buscan por nombre de encabezado (sin distinguir mayúsculas).
+
+    Args:
+        file_path (str): Ruta al archivo .xlsx, .csv o .xls
+        chunk_size (int): Filas por bloque al leer CSV
+
+    Yields:
+        dict: {'url', 'priority', 'ticker', 'strategy'}; las columnas
+            ausentes quedan en None
+    """
+    positions = None
+    for row in _iter_rows(file_path, chunk_size):
+        if positions is None:
+            positions = _link_column_positions(row)
+            continue
+        url = _clean_url(row[0] if row else None)
+        if not url:
+            continue
+        item = {'url': url}
+        for name, position in positions.items():
+            value = row[position] if position is not None and position < len(row) else None
+            item[name] = _clean_value(value)
+        yield item
+
+
+def link_columns(file_path):
+    """
+    Columnas opcionales presentes en el archivo de links
+
+    Returns:
+        set: Nombres de LINK_COLUMNS encontrados en el encabezado
+    """
+    for header in _iter_rows(file_path, 1):
+        return {name for name, position in _link_column_positions(header).items()
+                if position is not None}
+    return set()
+
+
+def _iter_rows(file_path, chunk_size):
+    # Filas completas (encabezado incluido) según el formato del archivo
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension == '.xlsx':
+        return _iter_xlsx_rows(file_path)
+    if extension == '.csv':
+        return _iter_csv_rows(file_path, chunk_size)
+    if extension == '.xls':
+        return _iter_xls_rows(file_path)
+    raise ValueError(f"Formato de archivo no soportado: {extension}")
+
+
+def _link_column_positions(header):
+    names = [str(value).strip().lower() if value is not None else '' for value in header]
+    positions = {}
+    for name, aliases in LINK_COLUMNS.items():
+        positions[name] = next((i for i, header_name in enumerate(names)
+                                if i > 0 and header_name in aliases), None)
+    return positions
+
+
+def _clean_value(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _clean_url(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    url = str(value).strip()
+    return url or None
+
+
+def _iter_xlsx_first_column(file_path):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(min_row=2, max_col=1, values_only=True)
+        for row in rows:
+            yield row[0] if row else None
+    finally:
+        # En modo read_only el archivo queda abierto hasta cerrar el libro
+        workbook.close()
+
+
+def _iter_csv_first_column(file_path, chunk_size):
+    import pandas as pd
+
+    chunks = pd.read_csv(file_path, usecols=[0], dtype=str,
+                         chunksize=chunk_size, skip_blank_lines=True)
+    for chunk in chunks:
+        for value in chunk.iloc[:, 0]:
+            yield value
+
+
+def _iter_xls_first_column(file_path):
+    import pandas as pd
+
+    df = pd.read_excel(file_path, usecols=[0])
+    for value in df.iloc[:, 0]:
+        yield value
+
+
+def _iter_xlsx_rows(file_path):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def _iter_csv_rows(file_path, chunk_size):
+    import pandas as pd
+
+    chunks = pd.read_csv(file_path, dtype=str, chunksize=chunk_size,
+                         skip_blank_lines=True)
+    header_sent = False
+    for chunk in chunks:
+        if not header_sent:
+            yield tuple(chunk.columns)
+            header_sent = True
+        for row in chunk.itertuples(index=False, name=None):
+            yield row
+
+
+def _iter_xls_rows(file_path):
+    import pandas as pd
+
+    df = pd.read_excel(file_path)
+    yield tuple(df.columns)
+    for row in df.itertuples(index=False, name=None):
+        yield row
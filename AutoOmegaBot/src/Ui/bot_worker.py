@@ -0,0 +1,109 @@
+"""
+Ejecución del bot en segundo plano para la interfaz gráfica
+===========================================================
+
+BotWorker ejecuta AutoOmegaBot.execute() en un QThread propio, de modo que
+el bucle de eventos de la ventana nunca se bloquea. Todo lo que la
+interfaz necesita llega por señales (conexión en cola entre hilos):
+
+    progress(int)        resultados procesados hasta el momento
+    result(dict)         resumen de cada URL terminada
+    error(str)           fallo de la ejecución
+    finished(str)        fin de la ejecución: 'completed', 'cancelled' o 'failed'
+
+La cancelación es cooperativa: cancel() pide al bot que no inicie trabajos
+nuevos; los que están en curso terminan y los resultados se guardan como
+en cualquier otra ejecución (lo no iniciado se retoma con resume).
+
+Uso:
+    thread = QtCore.QThread()
+    worker = BotWorker(links_file, output_file, config)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.finished.connect(thread.quit)
+    thread.start()
+"""
+
+import os
+import threading
+import time
+
+from PyQt5 import QtCore
+
+# Estado final emitido con finished
+STATUS_COMPLETED = 'completed'
+STATUS_CANCELLED = 'cancelled'
+STATUS_FAILED = 'failed'
+
+# Campos de cada resultado que se envían a la interfaz (no el registro completo)
+RESULT_FIELDS = ('url', 'sweep_key', 'status', 'error', 'error_class',
+                 'profit_loss', 'win_rate', 'max_drawdown', 'sharpe_ratio')
+
+
+def default_output_file(links_file, config):
+    """Archivo de resultados en la carpeta de salida configurada"""
+    from Utiles.utils import validate_and_create_output_path
+
+    folder = validate_and_create_output_path(config.get('output_path'))
+    name = os.path.splitext(os.path.basename(links_file))[0]
+    return os.path.join(folder, f"{name}_resultados_{time.strftime('%Y%m%d_%H%M%S')}.xlsx")
+
+
+class BotWorker(QtCore.QObject):
+    """
+    Ejecución de AutoOmegaBot para mover a un QThread
+
+    Args:
+        links_file (str): Archivo de links seleccionado
+        output_file (str): Archivo de resultados (.xlsx o .csv)
+        config (dict): Configuración de la ejecución (se copia)
+    """
+
+    progress = QtCore.pyqtSignal(int)
+    result = QtCore.pyqtSignal(dict)
+    error = QtCore.pyqtSignal(str)
+    finished = QtCore.pyqtSignal(str)
+
+    def __init__(self, links_file, output_file, config):
+        super().__init__()
+        self.links_file = links_file
+        self.output_file = output_file
+        self.config = dict(config)
+        self.bot = None
+        # Una cancelación pedida antes de crear el bot se aplica al crearlo
+        self._cancel_requested = threading.Event()
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        """Ejecutar el lote completo (en el hilo del worker)"""
+        status = STATUS_FAILED
+        try:
+            from Bot.bot import AutoOmegaBot
+
+            self.bot = AutoOmegaBot(self.links_file, self.output_file,
+                                    self.config.get('previous_year'), config=self.config)
+            self.bot.on_progress = self._on_progress
+            if self._cancel_requested.is_set():
+                self.bot.cancel()
+            self.bot.execute()
+            status = STATUS_CANCELLED if self.is_cancelled() else STATUS_COMPLETED
+        except Exception as e:
+            self.error.emit(f"{type(e).__name__}: {e}")
+        finally:
+            # Un fallo nunca se presenta como ejecución completada
+            self.finished.emit(status)
+
+    def cancel(self):
+        """Pedir la cancelación; seguro desde el hilo de la interfaz"""
+        self._cancel_requested.set()
+        if self.bot is not None:
+            self.bot.cancel()
+
+    def is_cancelled(self):
+        return self._cancel_requested.is_set()
+
+    def _on_progress(self, processed, record):
+        # Llamado por el bot en este hilo (o en su hilo de E/S); las señales
+        # llegan en cola a la ventana
+        self.progress.emit(processed)
+        self.result.emit({field: record.get(field) for field in RESULT_FIELDS})
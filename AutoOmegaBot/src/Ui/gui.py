@@ -19,6 +19,12 @@ Date: 2025
 
 from PyQt5 import QtWidgets, QtCore, QtGui
 from Ui.Settings_Ui.setting_gui import ConfigWindow
+from Ui.bot_worker import (
+    BotWorker,
+    STATUS_CANCELLED,
+    STATUS_FAILED,
+    default_output_file,
+)
 from Utiles.utils import (
     load_config,              
     get_connection_status,     
@@ -493,6 +499,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.last_system_status = None
         self.start_time = None
         self.analysis_count = 0
+        self.error_count = 0
+        # Ejecución en segundo plano (QThread + BotWorker) mientras corre el bot
+        self.bot_thread = None
+        self.bot_worker = None
+        # Cierre de la ventana aplazado hasta que el worker termine
+        self.close_requested = False
         
         self.setup_ui()
         self.setup_menu()
@@ -1077,9 +1089,10 @@ class MainWindow(QtWidgets.QMainWindow):
         Valida todos los requisitos, inicializa contadores y timers,
         actualiza la UI y comienza el proceso de análisis de datos.
         
-        TODO: Implementar checkpoint/resume para análisis largos
+        El análisis corre en un QThread (ver Ui/bot_worker.py); la ventana
+        solo recibe sus señales de progreso, resultado, error y fin.
+        
         TODO: Agregar estimación de tiempo de finalización
-        TODO: Implementar procesamiento en background thread
         TODO: Agregar opción de análisis incremental
         """
         try:
@@ -1091,7 +1104,9 @@ class MainWindow(QtWidgets.QMainWindow):
             
             self.start_time = get_current_timestamp()
             self.analysis_count = 0
+            self.error_count = 0
             self.bot_running = True
+            self.analyzed_widget.update_value("0")
             
             self.status_widget.update_value("Ejecutándose")
             self.status_widget.update_color("#27ae60")
@@ -1112,24 +1127,135 @@ class MainWindow(QtWidgets.QMainWindow):
             self.log_widget.add_log(f"💰 Fondos: {funds_summary}", "INFO")
             self.log_widget.add_log(f"📅 Período: {start_date} a {end_date}", "INFO")
             
+            output_file = default_output_file(self.selected_file, self.config)
+            self.log_widget.add_log(f"📄 Resultados: {output_file}", "INFO")
+            
             self.status_bar.showMessage("Bot ejecutándose - Analizando enlaces...")
-            QtCore.QTimer.singleShot(2000, self.simulate_analysis)
+            self.launch_bot_worker(output_file)
             
         except Exception as e:
             self.log_widget.add_log(f"Error iniciando bot: {str(e)}", "ERROR")
             self.bot_running = False
+            self.uptime_timer.stop()
+            self.start_btn.setEnabled(True)
+            self.stop_btn.setEnabled(False)
+
+    def launch_bot_worker(self, output_file):
+        """
+        Crea el QThread y el BotWorker y conecta sus señales.
+        
+        Args:
+            output_file (str): Archivo de resultados de la ejecución
             
+        Las señales se emiten desde el hilo del worker y Qt las entrega en
+        cola en el hilo de la ventana, por lo que los slots pueden tocar los
+        widgets sin bloquear el bucle de eventos.
+        """
+        self.bot_thread = QtCore.QThread(self)
+        self.bot_worker = BotWorker(self.selected_file, output_file, self.config)
+        self.bot_worker.moveToThread(self.bot_thread)
+        
+        self.bot_thread.started.connect(self.bot_worker.run)
+        self.bot_worker.progress.connect(self.on_bot_progress)
+        self.bot_worker.result.connect(self.on_bot_result)
+        self.bot_worker.error.connect(self.on_bot_error)
+        self.bot_worker.finished.connect(self.on_bot_finished)
+        # Directa: el hilo termina aunque la ventana esté esperando en closeEvent
+        self.bot_worker.finished.connect(self.bot_thread.quit, QtCore.Qt.DirectConnection)
+        self.bot_worker.finished.connect(self.bot_worker.deleteLater)
+        self.bot_thread.finished.connect(self.on_bot_thread_finished)
+        self.bot_thread.finished.connect(self.bot_thread.deleteLater)
+        
+        self.bot_thread.start()
+
+    def on_bot_progress(self, processed):
+        """
+        Actualiza el contador de análisis con el progreso del worker.
+        
+        Args:
+            processed (int): Resultados procesados hasta el momento
+        """
+        self.analysis_count = processed
+        self.analyzed_widget.update_value(str(processed))
+        self.update_uptime_display()
+        
+        if processed % 5 == 0:
+            self.log_widget.add_log(f"📈 Procesados {processed} enlaces", "SUCCESS")
+
+    def on_bot_result(self, record):
+        """
+        Registra en el log los resultados con error.
+        
+        Args:
+            record (dict): Resumen del resultado enviado por el worker
+        """
+        if record.get('status') != 'completed':
+            self.error_count += 1
+            error_class = record.get('error_class') or 'error'
+            self.log_widget.add_log(
+                f"❌ {record.get('url')}: {error_class} - {record.get('error')}", "ERROR")
+
+    def on_bot_error(self, message):
+        """
+        Muestra en el log un fallo de la ejecución del worker.
+        
+        Args:
+            message (str): Descripción del error
+        """
+        self.log_widget.add_log(f"Error en la ejecución del bot: {message}", "ERROR")
+
+    def on_bot_finished(self, status):
+        """
+        Cierra la ejecución cuando el worker termina.
+        
+        Args:
+            status (str): 'completed', 'cancelled' (stop_bot) o 'failed'
+        """
+        self.bot_worker = None
+        if status == STATUS_FAILED:
+            self.bot_failed()
+        elif status == STATUS_CANCELLED:
+            self.bot_stopped()
+        else:
+            self.bot_completed()
+
+    def on_bot_thread_finished(self):
+        """
+        Libera el QThread ya detenido y completa un cierre aplazado.
+        """
+        self.bot_thread = None
+        if self.close_requested:
+            self.close()
+
     def stop_bot(self):
         """
         Detiene el proceso de análisis del bot.
         
-        Finaliza el análisis actual, calcula métricas finales,
-        actualiza la UI y genera resumen de la ejecución.
+        La cancelación es cooperativa: el worker no inicia enlaces nuevos,
+        termina los que están en curso y guarda los resultados parciales.
+        La UI pasa a "Detenido" cuando el worker emite finished.
         
-        TODO: Implementar guardado de progreso parcial al detener
         TODO: Agregar opción de generar reporte parcial
         TODO: Permitir cancelación suave vs. cancelación forzada
         """
+        try:
+            if self.bot_worker is not None:
+                self.bot_worker.cancel()
+                self.stop_btn.setEnabled(False)
+                self.status_widget.update_value("Deteniendo")
+                self.status_widget.update_color("#f39c12")
+                self.log_widget.add_log("⏳ Deteniendo: terminando los enlaces en curso...", "WARNING")
+                self.status_bar.showMessage("Deteniendo bot - Guardando resultados parciales...")
+            elif self.bot_running:
+                self.bot_stopped()
+                
+        except Exception as e:
+            self.log_widget.add_log(f"Error deteniendo bot: {str(e)}", "ERROR")
+
+    def bot_stopped(self):
+        """
+        Actualiza la UI tras detener el bot y muestra el resumen parcial.
+        """
         try:
             if self.bot_running:
                 end_time = get_current_timestamp()
@@ -1154,29 +1280,29 @@ class MainWindow(QtWidgets.QMainWindow):
         except Exception as e:
             self.log_widget.add_log(f"Error deteniendo bot: {str(e)}", "ERROR")
 
-    def simulate_analysis(self):
+    def bot_failed(self):
         """
-        Simula el proceso de análisis para demostración.
-        
-        NOTA: Esta es una función temporal para demostración.
-        En producción debe ser reemplazada por la lógica real de análisis.
+        Actualiza la UI cuando la ejecución termina con un error.
         
-        TODO: REEMPLAZAR con lógica real de análisis de opciones
-        TODO: Implementar procesamiento de datos reales del archivo
-        TODO: Agregar cálculo de métricas financieras reales
-        TODO: Integrar con APIs de datos financieros
+        El error ya se mostró en el log (on_bot_error); lo procesado hasta
+        el fallo queda guardado en el archivo de resultados.
         """
-        if self.bot_running:
-            self.analysis_count += 1
-            self.analyzed_widget.update_value(str(self.analysis_count))
-            
-            if self.analysis_count % 5 == 0:
-                self.log_widget.add_log(f"📈 Procesados {self.analysis_count} enlaces", "SUCCESS")
-            
-            if self.analysis_count < 20:  
-                QtCore.QTimer.singleShot(1500, self.simulate_analysis)
-            else:
-                self.bot_completed()
+        try:
+            if self.bot_running:
+                self.bot_running = False
+                self.uptime_timer.stop()
+                
+                self.status_widget.update_value("Error")
+                self.status_widget.update_color("#e74c3c")
+                self.start_btn.setEnabled(True)
+                self.stop_btn.setEnabled(False)
+                
+                self.log_widget.add_log(
+                    f"❌ EJECUCIÓN FALLIDA tras {self.analysis_count} enlaces procesados", "ERROR")
+                self.status_bar.showMessage("Ejecución fallida - Revise el log")
+                
+        except Exception as e:
+            self.log_widget.add_log(f"Error finalizando bot: {str(e)}", "ERROR")
 
     def bot_completed(self):
         """
@@ -1185,7 +1311,6 @@ class MainWindow(QtWidgets.QMainWindow):
         Se ejecuta cuando el bot completa todos los análisis programados,
         genera reportes finales y actualiza la UI con el estado final.
         
-        TODO: Generar archivo Excel con resultados reales
         TODO: Implementar envío de notificaciones de finalización
         TODO: Agregar validación de integridad de resultados
         TODO: Implementar backup automático de resultados
@@ -1208,6 +1333,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 
                 self.log_widget.add_log("✅ ANÁLISIS COMPLETADO EXITOSAMENTE", "SUCCESS")
                 self.log_widget.add_log(f"🎯 Total procesado: {self.analysis_count} enlaces", "SUCCESS")
+                if self.error_count:
+                    self.log_widget.add_log(f"⚠️ {self.error_count} enlaces terminaron con error", "WARNING")
                 self.status_bar.showMessage("Análisis completado - Revise los resultados")
                 
         except Exception as e:
@@ -1294,6 +1421,16 @@ class MainWindow(QtWidgets.QMainWindow):
         TODO: Agregar backup automático de configuración al cerrar
         """
         try:
+            if self.bot_thread is not None:
+                # No cerrar con el QThread vivo: se cancela y la ventana se
+                # cierra cuando el worker termina de guardar (on_bot_thread_finished)
+                if self.bot_worker is not None and not self.bot_worker.is_cancelled():
+                    self.stop_bot()
+                if not self.close_requested:
+                    self.close_requested = True
+                    self.log_widget.add_log("⏳ La ventana se cerrará al terminar de guardar", "WARNING")
+                event.ignore()
+                return
             if self.bot_running:
                 self.stop_bot()
             
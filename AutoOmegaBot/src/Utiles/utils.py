@@ -25,6 +25,10 @@ import platform
 # FUNCIONES DE RUTAS Y DIRECTORIOS
 # =============================================================================
 
+# Variable de entorno que sustituye a Documents como raíz de Config, Cache,
+# Logs, Results y Output (benchmark, pruebas)
+DATA_DIR_ENV = 'AUTOOMEGABOT_DATA_DIR'
+
 def get_system_documents_folder():
     """
     NUEVO: Detectar automáticamente la carpeta Documents del sistema sin importar el idioma
@@ -32,6 +36,11 @@ def get_system_documents_folder():
     import platform
     import os
     
+    override = os.environ.get(DATA_DIR_ENV)
+    if override:
+        os.makedirs(override, exist_ok=True)
+        return override
+    
     try:
         system = platform.system()
         home = os.path.expanduser("~")
@@ -225,6 +234,34 @@ def get_logs_folder():
         os.makedirs(fallback_path, exist_ok=True)
         return fallback_path
       
+def get_cache_folder():
+    """
+    NUEVO: Caché de resultados SIEMPRE en Documents, junto a Config y Logs
+    """
+    try:
+        documents_path = get_system_documents_folder()
+        cache_folder = os.path.join(documents_path, "AutoOmega Bot", "Cache")
+        os.makedirs(cache_folder, exist_ok=True)
+        return cache_folder
+    except Exception:
+        fallback_path = os.path.join(os.path.expanduser("~"), "Documents", "AutoOmega Bot", "Cache")
+        os.makedirs(fallback_path, exist_ok=True)
+        return fallback_path
+
+def get_results_folder():
+    """
+    NUEVO: Histórico de resultados (results.sqlite) SIEMPRE en Documents, junto a Cache
+    """
+    try:
+        documents_path = get_system_documents_folder()
+        results_folder = os.path.join(documents_path, "AutoOmega Bot", "Results")
+        os.makedirs(results_folder, exist_ok=True)
+        return results_folder
+    except Exception:
+        fallback_path = os.path.join(os.path.expanduser("~"), "Documents", "AutoOmega Bot", "Results")
+        os.makedirs(fallback_path, exist_ok=True)
+        return fallback_path
+
 # FUNCIÓN DE PRUEBA para verificar que funciona
 def test_documents_detection():
     """
@@ -255,18 +292,21 @@ def test_documents_detection():
 # FUNCIONES DE CONFIGURACIÓN
 # =============================================================================
 
-def load_config():
+def load_config(config_path=None):
     """
     Cargar configuración desde archivo JSON en Documents/AutoOmegaBot/Config
     
-    Utilizada por: gui.py, setting_gui.py, general.py
+    Utilizada por: gui.py, setting_gui.py, general.py, cli.py
     Propósito: Obtener configuración persistente del sistema
     
+    Args:
+        config_path (str, optional): Otro config.json (p.ej. en un servidor)
+    
     Returns:
         dict: Configuración completa con valores por defecto
     """
-    config_folder = get_config_folder()
-    config_path = os.path.join(config_folder, 'config.json')
+    if config_path is None:
+        config_path = os.path.join(get_config_folder(), 'config.json')
     default_config = {
         "ticker": "SPY",
         "strategy": "Select strategy", 
@@ -289,6 +329,62 @@ def load_config():
         "max_allocation_amount":	"",
         "prune_oldest_trades": False,
         "ignore_margin_requirements":	True,
+        "concurrency": 1,
+        "workers": 1,
+        "pages_per_context": 1,
+        "cache_enabled": True,
+        "cache_ttl_hours": 24,
+        "cache_max_mb": 200,
+        "resource_filter_enabled": True,
+        "block_resource_types": ["image", "font", "media"],
+        "block_domains": [
+            "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+            "facebook.net", "hotjar.com", "segment.io", "mixpanel.com", "clarity.ms"
+        ],
+        "allow_domains": [],
+        "block_third_party_scripts": True,
+        "extraction_mode": "network",
+        "result_api_pattern": "/api/.*backtest",
+        "network_timeout_ms": 15000,
+        "network_fallback_limit": 5,
+        "adaptive_timeouts": True,
+        "step_timeout_ms": 30000,
+        "step_timeout_min_ms": 3000,
+        "step_timeout_max_ms": 60000,
+        "step_timeout_factor": 3.0,
+        "retry_budgets": {"timeout": 2, "navigation": 3, "selector": 1, "http_5xx": 4, "other": 0},
+        "retry_base_delay": 1.0,
+        "retry_max_delay": 30.0,
+        "breaker_failure_threshold": 0.5,
+        "breaker_window": 20,
+        "breaker_min_requests": 10,
+        "breaker_cooldown": 60,
+        "rate_limit_enabled": True,
+        "rate_limits": {
+            "default": {"rps": 2.0, "burst": 5, "max_in_flight": 10},
+        },
+        "session_enabled": True,
+        "session_max_age_hours": 12,
+        "login_url": "",
+        "login_username": "",
+        "login_password": "",
+        "login_selectors": {},
+        "schedule_policy": "fifo",
+        "sweep": {},
+        "phase_timing_enabled": True,
+        "date_windows": ["ytd", "custom", "previous_years"],
+        "distributed_enabled": False,
+        "coordinator_host": "127.0.0.1",
+        "coordinator_port": 8770,
+        "coordinator_token": "",
+        "lease_seconds": 120,
+        "heartbeat_seconds": 15,
+        "max_job_attempts": 3,
+        "results_store_enabled": True,
+        "analytics_enabled": True,
+        "analytics_weights": {
+            "sharpe_ratio": 0.4, "profit_loss": 0.3, "win_rate": 0.2, "max_drawdown": 0.1,
+        },
     }
     try:
         if os.path.exists(config_path):
@@ -304,6 +400,51 @@ def load_config():
     
     return default_config
 
+# Claves de config.json que determinan el resultado de un backtest
+BACKTEST_PARAM_KEYS = (
+    "ticker", "strategy", "pct_type", "buy_sell", "call_put", "qty",
+    "percent", "dte", "use_extract_dte", "round_strike", "multiplier",
+    "start_date", "end_date",
+    "starting_funds", "margin_allocation_percent", "max_contracts_per_trade",
+    "max_open_trades", "max_allocation_amount", "prune_oldest_trades",
+    "ignore_margin_requirements",
+)
+
+def get_backtest_params(config):
+    """
+    Extraer de la configuración solo los parámetros que afectan al backtest
+    
+    Utilizada por: bot.py (checkpoint y caché de resultados)
+    Propósito: Ignorar claves de ejecución (carpetas, concurrencia...) al
+    comparar configuraciones
+    
+    Args:
+        config (dict): Configuración completa
+        
+    Returns:
+        dict: Parámetros del backtest
+    """
+    return {key: config.get(key) for key in BACKTEST_PARAM_KEYS}
+
+def compute_config_hash(config, extra=None):
+    """
+    Calcular un hash estable de los parámetros del backtest
+    
+    Args:
+        config (dict): Configuración completa
+        extra (dict, optional): Valores adicionales a incluir (p.ej. previous_year)
+        
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    import hashlib
+    
+    params = get_backtest_params(config)
+    if extra:
+        params.update(extra)
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
 def ensure_autobot_structure(base_path):
     """
     NUEVO: Asegurar que exista la estructura AutoOmega Bot/Output en cualquier ruta
@@ -1229,9 +1370,14 @@ def get_current_timestamp():
     """
     return datetime.now()
 
-def format_execution_summary(start_time, end_time, analysis_count):
+def format_execution_summary(start_time, end_time, analysis_count, cache_stats=None,
+                             phase_stats=None):
     """
     NUEVO: Formatear resumen de ejecución con tiempo y estadísticas
+    
+    Args:
+        cache_stats (dict, optional): cache_hits/cache_misses de la caché de resultados
+        phase_stats (dict, optional): Percentiles por fase (PhaseTimingRecorder.get_stats())
     """
     try:
         # Calcular duración
@@ -1252,13 +1398,30 @@ def format_execution_summary(start_time, end_time, analysis_count):
         else:
             rate_str = ""
         
+        # Tasa de aciertos de la caché si se consultó
+        cache_str = ""
+        if cache_stats:
+            lookups = cache_stats.get('cache_hits', 0) + cache_stats.get('cache_misses', 0)
+            if lookups > 0:
+                hit_rate = cache_stats.get('cache_hits', 0) / lookups * 100
+                cache_str = f" - Caché: {hit_rate:.1f}% aciertos ({cache_stats.get('cache_hits', 0)}/{lookups})"
+        
         # Generar mensaje completo
         summary = (
             f"📊 RESUMEN DE EJECUCIÓN - "
             f"Duración: {duration_str} - "
-            f"Enlaces procesados: {analysis_count}{rate_str}"
+            f"Enlaces procesados: {analysis_count}{rate_str}{cache_str}"
         )
         
+        # Percentiles por fase de cada URL, una línea por fase
+        if phase_stats:
+            summary += "\n⏱️ Tiempo por fase (p50 / p90 / p99 / máx, ms):"
+            for phase, stats in phase_stats.items():
+                summary += (
+                    f"\n  • {phase}: {stats['p50_ms']} / {stats['p90_ms']} / "
+                    f"{stats['p99_ms']} / {stats['max_ms']} ({stats['count']} URLs)"
+                )
+        
         return summary
         
     except Exception as e:
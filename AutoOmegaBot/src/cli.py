@@ -0,0 +1,176 @@
+"""
+AutoOmegaBot sin interfaz gráfica
+=================================
+
+Ejecuta un lote desde la línea de comandos, sin importar PyQt5 ni
+necesitar pantalla, para servidores y tareas programadas. El progreso se
+escribe en stdout, una línea por URL terminada.
+
+Códigos de salida:
+    0  todas las URLs completadas
+    1  lote terminado con URLs en error
+    2  argumentos, configuración o archivo de links no válidos
+    3  la ejecución falló
+    130 interrumpido con Ctrl+C (lo ya procesado queda guardado; repetir con
+        --resume y el mismo -o)
+
+--resume necesita -o: el nombre por defecto lleva la fecha y la hora, así
+que cada ejecución tendría un journal distinto y no habría nada que retomar.
+
+Uso:
+    python cli.py links.xlsx -o resultados.xlsx --concurrency 8
+    python cli.py links.csv -o resultados.csv --config /etc/omegabot/config.json --workers 4 --resume
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+EXIT_OK = 0
+EXIT_URL_ERRORS = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+EXIT_INTERRUPTED = 130
+
+
+class ProgressPrinter:
+    """
+    Progreso del lote en stdout
+
+    Args:
+        total (int, optional): Trabajos esperados; None si no se conoce
+        every (int): Escribir una línea cada `every` resultados (los errores siempre)
+    """
+
+    def __init__(self, total=None, every=1):
+        self.total = total
+        self.every = max(1, int(every))
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def __call__(self, processed, record):
+        failed = record.get('status') != 'completed'
+        self.errors += int(failed)
+        if not failed and processed % self.every and processed != self.total:
+            return
+
+        elapsed = time.perf_counter() - self.started
+        rate = processed / elapsed * 60 if elapsed else 0.0
+        position = f"{processed}/{self.total}" if self.total else str(processed)
+        line = f"[{position}] {'❌' if failed else '✅'} {record.get('url')}"
+        if record.get('sweep_key'):
+            line += f" ({record['sweep_key']})"
+        if failed:
+            line += f" - {record.get('error_class') or 'error'}: {record.get('error')}"
+        print(f"{line} | {rate:.1f} URLs/min", flush=True)
+
+
+def count_jobs(bot):
+    """Trabajos del lote (URLs × combinaciones del barrido), leyendo el archivo en streaming"""
+    return sum(1 for _ in bot.iter_urls()) * max(1, len(bot.sweep_grid))
+
+
+def default_output_file(links_file):
+    from Utiles.utils import get_default_output
+
+    name = os.path.splitext(os.path.basename(links_file))[0]
+    return os.path.join(get_default_output(), f"{name}_resultados_{time.strftime('%Y%m%d_%H%M%S')}.xlsx")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='cli.py', description="Ejecutar AutoOmegaBot sin interfaz gráfica")
+    parser.add_argument('links', help="Archivo de links (xlsx, xls o csv)")
+    parser.add_argument('-o', '--output', help="Archivo de resultados (.xlsx o .csv); "
+                                               "por defecto en la carpeta Output")
+    parser.add_argument('--config', help="config.json a usar en lugar del de Documents/AutoOmegaBot")
+    parser.add_argument('--concurrency', type=int, help="Páginas simultáneas por proceso")
+    parser.add_argument('--workers', type=int, help="Procesos trabajadores")
+    parser.add_argument('--previous-year', default=None,
+                        help="Años anteriores a ejecutar (número o año inicial)")
+    parser.add_argument('--template', default=None, help="Plantilla del informe")
+    parser.add_argument('--resume', action='store_true',
+                        help="Saltar las URLs ya completadas en el mismo -o (obligatorio)")
+    parser.add_argument('--progress-every', type=int, default=1,
+                        help="Escribir el progreso cada N URLs (los errores siempre)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from Utiles.utils import load_config, validate_file_path
+
+    is_valid, message = validate_file_path(args.links)
+    if not is_valid:
+        print(f"❌ {message}: {args.links}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.config and not os.path.isfile(args.config):
+        print(f"❌ No existe el archivo de configuración: {args.config}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.config:
+        # load_config recurre a los valores por defecto si el JSON no es
+        # válido; aquí un archivo erróneo detiene la ejecución
+        try:
+            with open(args.config, 'r', encoding='utf-8') as f:
+                parsed = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Configuración no válida en {args.config}: {e}", file=sys.stderr)
+            return EXIT_USAGE
+        if not isinstance(parsed, dict):
+            print(f"❌ Configuración no válida en {args.config}: se esperaba un objeto JSON",
+                  file=sys.stderr)
+            return EXIT_USAGE
+    if args.resume and not args.output:
+        print("❌ --resume necesita -o con el archivo de resultados de la ejecución a retomar",
+              file=sys.stderr)
+        return EXIT_USAGE
+    for name in ('concurrency', 'workers'):
+        value = getattr(args, name)
+        if value is not None and value < 1:
+            print(f"❌ --{name} debe ser al menos 1", file=sys.stderr)
+            return EXIT_USAGE
+
+    config = load_config(args.config)
+    if args.concurrency is not None:
+        config['concurrency'] = args.concurrency
+    if args.workers is not None:
+        config['workers'] = args.workers
+
+    from Bot.bot import AutoOmegaBot
+
+    output_file = args.output or default_output_file(args.links)
+    bot = AutoOmegaBot(args.links, output_file, args.previous_year,
+                       template_file=args.template, config=config, resume=args.resume)
+
+    try:
+        total = count_jobs(bot)
+    except Exception as e:
+        print(f"❌ No se pudo leer el archivo de links: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    progress = ProgressPrinter(total, args.progress_every)
+    bot.on_progress = progress
+
+    print(f"🚀 {total} trabajos | concurrencia {bot.concurrency} | procesos {bot.workers}", flush=True)
+    print(f"📄 Resultados: {output_file}", flush=True)
+    try:
+        bot.execute()
+    except KeyboardInterrupt:
+        print(f"⏹️ Interrumpido: {bot.processed_count} resultados guardados; "
+              f"para continuar: --resume -o {output_file}", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        print(f"❌ Error en la ejecución: {type(e).__name__}: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    if progress.errors:
+        print(f"⚠️ {progress.errors} de {bot.processed_count} URLs terminaron con error", flush=True)
+        return EXIT_URL_ERRORS
+    print(f"✅ {bot.processed_count} URLs completadas", flush=True)
+    return EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""Configuración de pytest: los módulos del bot se importan desde src/"""
+
+import os
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
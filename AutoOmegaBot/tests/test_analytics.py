@@ -0,0 +1,119 @@
+"""Pruebas de Bot/analytics.py"""
+
+import numpy as np
+import pytest
+
+from Bot.analytics import build_sheets, compute_scores, group_summary, load_metrics, rank_columns
+from Bot.network_extractor import METRIC_NAMES
+from Bot.result_records import BacktestMetrics, ResultColumns, ResultRecord
+from Bot.result_writer import sheet_rows
+
+
+def make_record(url, sharpe=None, profit=None, win_rate=None, drawdown=None, sweep_key=''):
+    metrics = BacktestMetrics(profit_loss=profit, win_rate=win_rate,
+                              max_drawdown=drawdown, sharpe_ratio=sharpe)
+    return ResultRecord(url, sweep_key, 'completed', [metrics])
+
+
+def test_rank_columns_ties_share_best_rank():
+    ranks = rank_columns(np.array([[1.0], [1.0], [2.0], [np.nan]]))
+    assert ranks[:, 0].tolist() == [2, 2, 1, 4]
+
+
+def test_rank_columns_independent_of_input_order():
+    scores = np.array([3.0, 1.0, 3.0, 2.0, np.nan, 1.0])
+    order = np.array([4, 2, 0, 5, 1, 3])
+    ranks = rank_columns(scores[:, None])[:, 0]
+    shuffled = rank_columns(scores[order][:, None])[:, 0]
+    assert shuffled.tolist() == ranks[order].tolist()
+    assert ranks.tolist() == [1, 4, 1, 3, 6, 4]
+
+
+def test_percentiles_of_ties_are_equal_and_order_free():
+    values = load_metrics([make_record(f"u{i}", sharpe=s) for i, s in enumerate([1.0, 1.0, 2.0, 0.5])])
+    column = METRIC_NAMES.index('sharpe_ratio')
+    percentile = compute_scores(values)['percentile'][:, column]
+    assert percentile.tolist() == pytest.approx([200 / 3, 200 / 3, 100.0, 0.0])
+
+    reversed_percentile = compute_scores(values[::-1])['percentile'][:, column]
+    assert reversed_percentile.tolist() == percentile[::-1].tolist()
+
+
+def test_drawdown_ranked_by_magnitude():
+    values = load_metrics([make_record('a', drawdown=-500.0), make_record('b', drawdown=-100.0),
+                           make_record('c', drawdown=200.0)])
+    column = METRIC_NAMES.index('max_drawdown')
+    assert compute_scores(values)['rank'][:, column].tolist() == [3, 1, 2]
+
+
+def test_missing_metrics_are_nan_and_ranked_last():
+    records = [make_record('a', sharpe=1.0), ResultRecord('b', status='error'), make_record('c', sharpe=2.0)]
+    values = load_metrics(records)
+    assert values.shape == (3, len(METRIC_NAMES))
+    assert np.isnan(values[1]).all()
+
+    scores = compute_scores(values)
+    assert np.isnan(scores['composite'][1])
+    assert scores['composite_rank'].tolist() == [2, 3, 1]
+    assert np.isnan(scores['z'][1]).all()
+
+
+def test_composite_uses_only_available_weights():
+    values = load_metrics([make_record('a', sharpe=1.0), make_record('b', sharpe=3.0)])
+    scores = compute_scores(values, weights={'sharpe_ratio': 1.0, 'profit_loss': 1.0})
+    # Sin profit_loss, la compuesta es el z-score de sharpe
+    assert scores['composite'].tolist() == [-1.0, 1.0]
+
+
+def test_group_summary_means_and_best():
+    values = load_metrics([make_record('a', sharpe=1.0), make_record('b', sharpe=3.0),
+                           make_record('c', sharpe=np.nan), make_record('d', sharpe=5.0)])
+    composite = np.array([0.0, 1.0, np.nan, 2.0])
+    rows = group_summary(['x', 'x', 'y', 'y'], values, composite)
+
+    assert [row['group'] for row in rows] == ['y', 'x']
+    by_group = {row['group']: row for row in rows}
+    assert by_group['x']['count'] == 2
+    assert by_group['x']['mean_sharpe_ratio'] == 2.0
+    assert by_group['x']['best_sharpe_ratio'] == 3.0
+    assert by_group['y']['with_data'] == 1
+    assert by_group['y']['mean_composite'] == 2.0
+    assert by_group['y']['mean_profit_loss'] is None
+
+
+def make_columns(records):
+    columns = ResultColumns()
+    for record in records:
+        columns.add(record)
+    return columns
+
+
+def test_build_sheets_ranking_order_and_cells():
+    columns = make_columns([
+        {'url': 'b', 'status': 'completed', 'sharpe_ratio': 1.0},
+        {'url': 'a', 'status': 'completed', 'sharpe_ratio': 1.0},
+        {'url': 'c', 'status': 'completed', 'sharpe_ratio': 2.0},
+        {'url': 'd', 'status': 'error'},
+    ])
+    name, names, values = build_sheets(columns, ['ytd'])[0]
+    rows = list(sheet_rows(values))
+
+    assert name == 'Ranking ytd'
+    assert names[:3] == ['rank', 'composite_score', 'url']
+    # Empatados por puesto y luego en el orden de escritura; sin dato al final
+    assert [(row[0], row[2]) for row in rows] == [(1, 'c'), (2, 'b'), (2, 'a'), (4, 'd')]
+    assert rows[-1][1] is None
+    assert rows[-1][4] == 'error'
+    assert rows[0][names.index('sharpe_ratio')] == 2.0
+
+
+def test_build_sheets_group_sheets():
+    columns = make_columns([{'url': 'a', 'sharpe_ratio': 1.0}, {'url': 'b', 'sharpe_ratio': 3.0}])
+    sheets = build_sheets(columns, ['ytd'], groups={'Por ticker': ['SPY', 'QQQ']})
+    title, names, values = sheets[1]
+    rows = [dict(zip(names, row)) for row in sheet_rows(values)]
+
+    assert title == 'Por ticker'
+    assert [row['group'] for row in rows] == ['QQQ', 'SPY']
+    assert rows[0]['best_sharpe_ratio'] == 3.0
+    assert rows[0]['mean_profit_loss'] is None
@@ -0,0 +1,79 @@
+"""Pruebas de Bot/async_engine.py"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from Bot.async_engine import run_backtests_async
+from Bot.bot import AutoOmegaBot
+
+
+class FakePool:
+    def get_stats(self):
+        return {'pages_served': 0}
+
+
+class FakeBot:
+    """Bot sin navegador con la E/S de AutoOmegaBot"""
+
+    run_io = AutoOmegaBot.run_io
+    close_io = AutoOmegaBot.close_io
+
+    def __init__(self):
+        self._io_executor = None
+        self.lookups = []
+
+    @asynccontextmanager
+    async def create_async_pool(self):
+        yield FakePool()
+
+    def get_cached_result(self, url, params=None):
+        # Caché lenta (disco bloqueado por otro proceso)
+        self.lookups.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return None
+
+    async def run_backtest_async(self, pool, url, params=None):
+        await self.run_io(self.get_cached_result, url, params)
+        await asyncio.sleep(0.01)
+        return {'url': url, 'status': 'completed'}
+
+    def get_engine_stats(self):
+        return {}
+
+
+def test_disk_io_runs_in_one_thread_off_the_loop():
+    bot = FakeBot()
+    written = []
+    loop_threads = set()
+
+    def on_result(index, record):
+        # Escritura lenta del journal/escritor
+        time.sleep(0.02)
+        written.append((index, threading.current_thread().name))
+
+    async def scenario():
+        loop_threads.add(threading.current_thread().name)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        jobs = [(index, f"https://x.com/{index}", None) for index in range(10)]
+        await run_backtests_async(bot, jobs, concurrency=5, on_result=on_result)
+        task.cancel()
+        return ticks
+
+    ticks = asyncio.run(scenario())
+
+    # 10 × (50 + 20) ms de E/S en serie: el loop siguió atendiendo al ticker
+    assert ticks > 50
+    assert sorted(index for index, _ in written) == list(range(10))
+    io_threads = {name for _, name in written} | set(bot.lookups)
+    assert len(io_threads) == 1 and not io_threads & loop_threads
+    assert bot._io_executor is None
@@ -0,0 +1,43 @@
+"""Pruebas de Bot/checkpoint.py"""
+
+from Bot.checkpoint import CheckpointJournal, journal_path_for
+
+
+def test_journal_path_for():
+    assert journal_path_for('/tmp/out/resultados.xlsx') == '/tmp/out/resultados.journal.jsonl'
+
+
+def test_resume_skips_only_completed_with_same_config(tmp_path):
+    path = str(tmp_path / 'run.journal.jsonl')
+    with CheckpointJournal(path, 'hash-a') as journal:
+        journal.append(0, 'u0', {'status': 'completed', 'sharpe_ratio': 1.0})
+        journal.append(1, 'u1', {'status': 'error'})
+        journal.append(2, 'u2', {'status': 'completed'})
+        journal.append(2, 'u2', {'status': 'error'})
+    with CheckpointJournal(path, 'hash-b') as journal:
+        journal.append(3, 'u3', {'status': 'completed'})
+
+    completed = CheckpointJournal(path, 'hash-a').load_completed()
+    assert set(completed) == {'u0'}
+    assert completed['u0']['sharpe_ratio'] == 1.0
+    assert set(CheckpointJournal(path, 'hash-b').load_completed()) == {'u3'}
+
+
+def test_resume_after_truncated_line(tmp_path):
+    path = str(tmp_path / 'run.journal.jsonl')
+    with CheckpointJournal(path, 'h') as journal:
+        journal.append(0, 'u0', {'status': 'completed'})
+    # El proceso murió a mitad de la segunda línea
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"index": 1, "url": "u1", "conf')
+
+    assert set(CheckpointJournal(path, 'h').load_completed()) == {'u0'}
+
+    # Al reanudar, la nueva línea no se pega a la truncada
+    with CheckpointJournal(path, 'h') as journal:
+        journal.append(1, 'u1', {'status': 'completed'})
+    assert set(CheckpointJournal(path, 'h').load_completed()) == {'u0', 'u1'}
+
+
+def test_missing_journal_is_empty(tmp_path):
+    assert CheckpointJournal(str(tmp_path / 'none.jsonl'), 'h').load_completed() == {}
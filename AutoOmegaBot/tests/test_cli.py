@@ -0,0 +1,120 @@
+"""Pruebas de cli.py (el bot se sustituye por uno falso: sin navegador)"""
+
+import json
+
+import pytest
+
+import cli
+from Bot import bot as bot_module
+from Bot.checkpoint import journal_path_for
+from Utiles.utils import DATA_DIR_ENV
+
+
+class FakeBot:
+    """Bot mínimo con la interfaz que usa cli.main()"""
+
+    instances = []
+    outcome = 'completed'
+
+    def __init__(self, links_file, output_file, previous_year, template_file=None,
+                 config=None, resume=False):
+        self.links_file = links_file
+        self.output_file = output_file
+        self.config = config
+        self.resume = resume
+        self.sweep_grid = []
+        self.concurrency = config.get('concurrency')
+        self.workers = config.get('workers')
+        self.processed_count = 0
+        self.on_progress = None
+        FakeBot.instances.append(self)
+
+    def iter_urls(self):
+        return iter(['https://x.com/bt/1', 'https://x.com/bt/2'])
+
+    def execute(self):
+        if self.outcome == 'interrupted':
+            raise KeyboardInterrupt
+        if self.outcome == 'failed':
+            raise RuntimeError('navegador caído')
+        for url in self.iter_urls():
+            self.processed_count += 1
+            status = 'error' if self.outcome == 'url_errors' else 'completed'
+            self.on_progress(self.processed_count, {'url': url, 'status': status})
+
+
+@pytest.fixture
+def links(tmp_path, monkeypatch):
+    monkeypatch.setenv(DATA_DIR_ENV, str(tmp_path / 'data'))
+    monkeypatch.setattr(bot_module, 'AutoOmegaBot', FakeBot)
+    monkeypatch.setattr(FakeBot, 'instances', [])
+    path = tmp_path / 'links.csv'
+    path.write_text('url\nhttps://x.com/bt/1\nhttps://x.com/bt/2\n', encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('outcome, code', [
+    ('completed', cli.EXIT_OK),
+    ('url_errors', cli.EXIT_URL_ERRORS),
+    ('failed', cli.EXIT_FAILED),
+    ('interrupted', cli.EXIT_INTERRUPTED),
+])
+def test_exit_codes(links, tmp_path, monkeypatch, outcome, code):
+    monkeypatch.setattr(FakeBot, 'outcome', outcome)
+    assert cli.main([links, '-o', str(tmp_path / 'out.csv')]) == code
+
+
+def test_missing_links_file_is_usage_error(tmp_path, links):
+    assert cli.main([str(tmp_path / 'none.csv')]) == cli.EXIT_USAGE
+
+
+def test_invalid_concurrency_is_usage_error(links):
+    assert cli.main([links, '--concurrency', '0']) == cli.EXIT_USAGE
+
+
+def test_malformed_config_is_rejected(links, tmp_path, capsys):
+    config = tmp_path / 'config.json'
+    config.write_text('{"concurrency": 4,', encoding='utf-8')
+
+    assert cli.main([links, '-o', str(tmp_path / 'out.csv'), '--config', str(config)]) == cli.EXIT_USAGE
+    assert 'Configuración no válida' in capsys.readouterr().err
+    assert FakeBot.instances == []
+
+
+def test_config_must_be_an_object(links, tmp_path):
+    config = tmp_path / 'config.json'
+    config.write_text('[1, 2]', encoding='utf-8')
+    assert cli.main([links, '--config', str(config)]) == cli.EXIT_USAGE
+
+
+def test_valid_config_and_overrides_reach_the_bot(links, tmp_path):
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({'concurrency': 4, 'ticker': 'QQQ'}), encoding='utf-8')
+
+    assert cli.main([links, '-o', str(tmp_path / 'out.csv'), '--config', str(config),
+                     '--workers', '2']) == cli.EXIT_OK
+    bot = FakeBot.instances[0]
+    assert bot.config['ticker'] == 'QQQ'
+    assert bot.config['concurrency'] == 4
+    assert bot.config['workers'] == 2
+
+
+def test_resume_requires_output(links, capsys):
+    assert cli.main([links, '--resume']) == cli.EXIT_USAGE
+    assert '--resume necesita -o' in capsys.readouterr().err
+    assert FakeBot.instances == []
+
+
+def test_resume_reuses_the_interrupted_run_journal(links, tmp_path, monkeypatch, capsys):
+    output = str(tmp_path / 'out.xlsx')
+    monkeypatch.setattr(FakeBot, 'outcome', 'interrupted')
+    assert cli.main([links, '-o', output]) == cli.EXIT_INTERRUPTED
+    assert f"--resume -o {output}" in capsys.readouterr().err
+
+    monkeypatch.setattr(FakeBot, 'outcome', 'completed')
+    assert cli.main([links, '-o', output, '--resume']) == cli.EXIT_OK
+
+    first, second = FakeBot.instances
+    assert second.resume and not first.resume
+    assert second.output_file == first.output_file == output
+    assert journal_path_for(second.output_file) == journal_path_for(first.output_file)
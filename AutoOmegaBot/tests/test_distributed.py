@@ -0,0 +1,91 @@
+"""Pruebas de la cola con leases de Bot/distributed.py"""
+
+from Bot.distributed import JobQueue, is_loopback
+
+
+def make_queue(count=4, **kwargs):
+    return JobQueue([(index, f"u{index}", None) for index in range(count)], **kwargs)
+
+
+def test_lease_hands_out_each_job_once():
+    jobs = make_queue()
+    first = jobs.lease('w1', 3, now=0)
+    second = jobs.lease('w2', 3, now=0)
+
+    assert [job[0] for job in first] == [0, 1, 2]
+    assert [job[0] for job in second] == [3]
+    assert jobs.lease('w3', 3, now=0) == []
+
+
+def test_complete_dedupes_results():
+    jobs = make_queue(2)
+    jobs.lease('w1', 2, now=0)
+
+    assert jobs.complete('w1', 0, now=1) is True
+    assert jobs.complete('w2', 0, now=1) is False
+    assert jobs.complete('w1', 99, now=1) is False
+    assert jobs.get_stats()['duplicate_results'] == 2
+    assert not jobs.finished
+
+    jobs.complete('w1', 1, now=1)
+    assert jobs.finished
+
+
+def test_expired_lease_is_requeued_first():
+    jobs = make_queue(lease_seconds=10)
+    jobs.lease('w1', 2, now=0)
+
+    assert jobs.expire(now=5) == []
+    assert jobs.expire(now=11) == []
+    assert jobs.get_stats()['jobs_requeued'] == 2
+    assert [job[0] for job in jobs.lease('w2', 4, now=11)] == [0, 1, 2, 3]
+
+
+def test_heartbeat_extends_leases():
+    jobs = make_queue(1, lease_seconds=10)
+    jobs.lease('w1', 1, now=0)
+    jobs.heartbeat('w1', now=8)
+
+    assert jobs.expire(now=15) == []
+    assert jobs.lease('w2', 1, now=15) == []
+    jobs.expire(now=19)
+    assert jobs.lease('w2', 1, now=19) == [(0, 'u0', None)]
+
+
+def test_completed_job_not_requeued_or_redelivered():
+    jobs = make_queue(1, lease_seconds=10)
+    jobs.lease('w1', 1, now=0)
+    jobs.complete('w1', 0, now=1)
+
+    assert jobs.expire(now=100) == []
+    assert jobs.lease('w2', 1, now=100) == []
+
+
+def test_exhausted_job_reported_as_failed():
+    jobs = make_queue(1, lease_seconds=10, max_attempts=2)
+    jobs.lease('w1', 1, now=0)
+    assert jobs.expire(now=11) == []
+    jobs.lease('w2', 1, now=11)
+
+    assert jobs.expire(now=22) == [(0, 'u0', None)]
+    assert jobs.finished
+    assert jobs.lease('w3', 1, now=22) == []
+
+
+def test_active_workers():
+    jobs = make_queue(lease_seconds=10)
+    jobs.lease('w1', 1, now=0)
+    jobs.lease('w2', 1, now=5)
+    jobs.worker_done('w2')
+
+    assert jobs.active_workers(now=6) == ['w1']
+    assert jobs.active_workers(now=11) == []
+
+
+def test_is_loopback():
+    assert is_loopback('127.0.0.1')
+    assert is_loopback('localhost')
+    assert is_loopback('::1')
+    assert not is_loopback('0.0.0.0')
+    assert not is_loopback('')
+    assert not is_loopback('example.com')
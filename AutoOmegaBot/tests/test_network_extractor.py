@@ -0,0 +1,49 @@
+"""Pruebas de Bot/network_extractor.py"""
+
+import pytest
+
+from Bot.network_extractor import NetworkResultExtractor, parse_backtest_payload, to_metric, to_number
+
+
+def test_to_number():
+    assert to_number('1,250.50') == 1250.5
+    assert to_number('$-350') == -350.0
+    assert to_number('65%') == pytest.approx(0.65)
+    assert to_number(True) is None
+    assert to_number('n/a') is None
+
+
+def test_win_rate_is_always_a_fraction():
+    for value in ('65%', 65, '65', 0.65, '0.65'):
+        assert to_metric('win_rate', value) == pytest.approx(0.65)
+    assert to_metric('win_rate', 1) == 1.0
+    # Las demás métricas conservan su valor
+    assert to_metric('profit_loss', 65) == 65.0
+
+
+def test_parse_payload_prefers_top_level_aliases():
+    payload = {'stats': {'sharpe': 0.5}, 'sharpeRatio': 1.4, 'results': [{'netProfit': '1,000', 'winPct': 55}]}
+    metrics = parse_backtest_payload(payload)
+    assert metrics == {'profit_loss': 1000.0, 'win_rate': pytest.approx(0.55),
+                       'max_drawdown': None, 'sharpe_ratio': 1.4}
+
+
+def test_build_result_rejects_payload_without_metrics():
+    extractor = NetworkResultExtractor()
+    assert extractor.build_result({'status': 'ok', 'user': {'id': 7}}) is None
+    assert extractor.get_stats()['network_extractions'] == 0
+
+    result = extractor.build_result({'pnl': 10})
+    assert result['profit_loss'] == 10.0
+    assert result['raw'] == {'pnl': 10}
+    assert extractor.get_stats()['network_extractions'] == 1
+
+
+def test_disabled_after_consecutive_fallbacks():
+    extractor = NetworkResultExtractor(max_consecutive_fallbacks=2)
+    assert extractor.record_fallback() is False
+    extractor.build_result({'pnl': 1})
+    assert extractor.record_fallback() is False
+    assert extractor.record_fallback() is True
+    assert not extractor.enabled
+    assert extractor.get_stats()['network_disabled'] == 1
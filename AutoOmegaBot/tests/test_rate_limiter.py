@@ -0,0 +1,130 @@
+"""Pruebas de Bot/rate_limiter.py"""
+
+import asyncio
+import time
+
+import pytest
+
+from Bot.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    limiter = RateLimiter(str(tmp_path / 'rate_limiter.sqlite'), limits={
+        'default': {'rps': 1.0, 'burst': 2, 'max_in_flight': 1},
+        'X.com': {'rps': 1.0, 'burst': 3, 'max_in_flight': 2},
+    })
+    yield limiter
+    limiter.close()
+
+
+def test_from_config_disabled(tmp_path):
+    assert RateLimiter.from_config({'rate_limit_enabled': False}, str(tmp_path / 'r.sqlite')) is None
+
+
+def test_bucket_for_shares_configured_domain_with_subdomains(limiter):
+    assert limiter.bucket_for('app.x.com')[0] == 'x.com'
+    assert limiter.bucket_for('API.X.COM')[0] == 'x.com'
+    assert limiter.bucket_for('x.com')[1]['burst'] == 3
+    # Un sufijo sin punto no es subdominio
+    assert limiter.bucket_for('notx.com') == ('notx.com', limiter.limits['default'])
+
+
+def test_token_bucket_burst_then_wait(limiter):
+    assert limiter.try_acquire_token('other.org') == 0.0
+    assert limiter.try_acquire_token('other.org') == 0.0
+    assert limiter.try_acquire_token('other.org') > 0.5
+    # Cada host sin configurar tiene su propio bucket
+    assert limiter.try_acquire_token('third.org') == 0.0
+
+
+def test_subdomains_draw_from_one_bucket(limiter):
+    for host in ('app.x.com', 'api.x.com', 'x.com'):
+        assert limiter.try_acquire_token(host) == 0.0
+    assert limiter.try_acquire_token('www.x.com') > 0
+
+
+def test_bucket_shared_between_instances(limiter, tmp_path):
+    other = RateLimiter(limiter.path, limits={'default': {'rps': 1.0, 'burst': 2}})
+    try:
+        assert limiter.try_acquire_token('a.org') == 0.0
+        assert other.try_acquire_token('a.org') == 0.0
+        assert limiter.try_acquire_token('a.org') > 0
+    finally:
+        other.close()
+
+
+def test_slots_limit_and_release(limiter):
+    first = limiter.try_acquire_slot('app.x.com')
+    second = limiter.try_acquire_slot('api.x.com')
+    assert first and second
+    assert limiter.try_acquire_slot('x.com') is None
+
+    limiter.release_slot(first)
+    assert limiter.try_acquire_slot('x.com') is not None
+
+
+def test_expired_slot_is_recovered(tmp_path):
+    limiter = RateLimiter(str(tmp_path / 'r.sqlite'), limits={'default': {'max_in_flight': 1}},
+                          lease_seconds=-1)
+    try:
+        assert limiter.try_acquire_slot('a.org') is not None
+        # La concesión anterior ya caducó (proceso muerto sin liberarla)
+        assert limiter.try_acquire_slot('a.org') is not None
+    finally:
+        limiter.close()
+
+
+def test_unlimited_slots(tmp_path):
+    limiter = RateLimiter(str(tmp_path / 'r.sqlite'), limits={'default': {'max_in_flight': 0}})
+    try:
+        assert all(limiter.try_acquire_slot('a.org') for _ in range(5))
+    finally:
+        limiter.close()
+
+
+def test_async_slot_waits_for_release(limiter):
+    async def scenario():
+        order = []
+
+        async def hold(name):
+            async with limiter.slot_async('a.org', poll_interval=0.01):
+                order.append(name)
+                await asyncio.sleep(0.05)
+
+        await asyncio.gather(hold('first'), hold('second'))
+        return order
+
+    assert sorted(asyncio.run(scenario())) == ['first', 'second']
+    assert limiter.get_stats()['rate_limit_waits'] > 0
+
+
+def test_cancelled_async_slot_does_not_leak_its_lease(limiter, monkeypatch):
+    acquire = limiter.try_acquire_slot
+    entered = asyncio.Event()
+
+    def slow_acquire(domain):
+        lease_id = acquire(domain)
+        time.sleep(0.1)
+        return lease_id
+
+    monkeypatch.setattr(limiter, 'try_acquire_slot', slow_acquire)
+
+    async def scenario():
+        async def hold():
+            async with limiter.slot_async('a.org'):
+                entered.set()
+
+        task = asyncio.create_task(hold())
+        # Cancelar mientras el hilo ya ocupó el hueco pero aún no volvió
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.2)
+
+    asyncio.run(scenario())
+    assert not entered.is_set()
+    monkeypatch.undo()
+    # max_in_flight = 1: el hueco vuelve a estar libre
+    assert limiter.try_acquire_slot('a.org') is not None
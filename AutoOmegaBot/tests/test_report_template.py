@@ -0,0 +1,87 @@
+"""Pruebas de Bot/report_template.py"""
+
+import openpyxl
+import pytest
+
+from Bot.report_template import TemplateCache, parse_template, render_report, shift_formula
+
+
+@pytest.fixture
+def template_file(tmp_path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Informe'
+    sheet['A1'] = 'Total P/L'
+    sheet['B1'] = '=SUM(B3:B3)'
+    sheet['A2'] = 'URL'
+    sheet['B2'] = 'P/L'
+    sheet['A3'] = '{{url}}'
+    sheet['B3'] = '{{profit_loss}}'
+    sheet['A4'] = 'Suma'
+    sheet['B4'] = '=SUM(B3:B3)'
+    sheet['A5'] = 'Doble'
+    sheet['B5'] = '=B4*2'
+    path = tmp_path / 'plantilla.xlsx'
+    workbook.save(path)
+    return str(path)
+
+
+def rows(count):
+    return [{'url': f"https://x.com/bt/{index}", 'profit_loss': str(10 * (index + 1))}
+            for index in range(count)]
+
+
+def read(path):
+    return openpyxl.load_workbook(path)['Informe']
+
+
+def test_shift_formula():
+    assert shift_formula('=SUM(B5:B5)', 5, 10) == '=SUM(B5:B14)'
+    assert shift_formula('=SUM($B$5:$B$5)/B6', 5, 10) == '=SUM($B$5:$B$14)/B15'
+    # Otras hojas, textos entre comillas y nombres de función no se tocan
+    assert shift_formula('=Hoja2!B6+LOG10(B3)&"B6"', 5, 10) == '=Hoja2!B6+LOG10(B3)&"B6"'
+    assert shift_formula('=SUM(B5:B5)', 5, 1) == '=SUM(B5:B5)'
+    assert shift_formula('=SUM(B5:B5)', 5, 0) == '=SUM(B5:B5)'
+
+
+def test_totals_cover_every_data_row(template_file, tmp_path):
+    output = str(tmp_path / 'informe.xlsx')
+    assert render_report(parse_template(template_file), output, iter(rows(3)), count=3) == 3
+
+    sheet = read(output)
+    assert sheet['B1'].value == '=SUM(B3:B5)'
+    assert [sheet.cell(row, 2).value for row in (3, 4, 5)] == [10, 20, 30]
+    assert sheet['A6'].value == 'Suma'
+    assert sheet['B6'].value == '=SUM(B3:B5)'
+    assert sheet['B7'].value == '=B6*2'
+
+
+def test_header_formulas_without_count(template_file, tmp_path):
+    output = str(tmp_path / 'informe.xlsx')
+    render_report(parse_template(template_file), output, iter(rows(4)))
+    assert read(output)['B1'].value == '=SUM(B3:B6)'
+
+
+def test_no_rows_leaves_the_data_row_empty(template_file, tmp_path):
+    output = str(tmp_path / 'informe.xlsx')
+    assert render_report(parse_template(template_file), output, iter([]), count=0) == 0
+
+    sheet = read(output)
+    assert sheet['A3'].value is None
+    assert sheet['B4'].value == '=SUM(B3:B3)'
+
+
+def test_data_values_never_become_formulas(template_file, tmp_path):
+    output = str(tmp_path / 'informe.xlsx')
+    render_report(parse_template(template_file), output, [{'url': '=1+1', 'profit_loss': ''}], count=1)
+    sheet = read(output)
+    assert sheet['A3'].value == '=1+1'
+    assert sheet['A3'].data_type == 's'
+
+
+def test_template_cache_parses_once(template_file, tmp_path):
+    cache = TemplateCache(str(tmp_path / 'cache'))
+    first = cache.get(template_file)
+    assert cache.get(template_file) is first
+    assert TemplateCache(str(tmp_path / 'cache')).get(template_file)['data_row_number'] == 3
+    assert cache.get_stats() == {'template_parses': 1, 'template_cache_hits': 1}
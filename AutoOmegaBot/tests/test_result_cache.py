@@ -0,0 +1,49 @@
+"""Pruebas de Bot/result_cache.py"""
+
+from Bot.result_cache import ResultCache
+
+
+def sum_queries(cache):
+    statements = []
+    cache._connect().set_trace_callback(statements.append)
+    return statements
+
+
+def test_put_does_not_scan_the_table_every_time(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'))
+    statements = sum_queries(cache)
+    for index in range(500):
+        cache.put(f"k{index}", {'profit_loss': index})
+    cache.close()
+
+    assert sum('SUM(size)' in statement for statement in statements) == 1
+
+
+def test_evicts_least_recently_used_below_the_limit(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'), max_bytes=1000)
+    record = {'result': 'x' * 80}
+    for index in range(20):
+        cache.put(f"k{index}", record)
+        if index == 0:
+            # k0 se usa a menudo: no es de las más antiguas
+            continue
+        cache.get('k0')
+
+    conn = cache._connect()
+    total = conn.execute("SELECT SUM(size) FROM results").fetchone()[0]
+    assert total <= 1000
+    assert cache._total == total
+    assert cache.get('k0') == record
+    assert cache.get('k1') is None
+    cache.close()
+
+
+def test_total_follows_replaced_entries(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'))
+    cache.put('a', {'v': 'x' * 10})
+    cache.put('a', {'v': 'x' * 50})
+    cache.put('b', {'v': 1})
+
+    conn = cache._connect()
+    assert cache._total == conn.execute("SELECT SUM(size) FROM results").fetchone()[0]
+    cache.close()
@@ -0,0 +1,83 @@
+"""Pruebas de Bot/result_records.py"""
+
+import math
+
+import pytest
+
+from Bot.result_records import BacktestMetrics, ResultColumns, ResultRecord, parse_result, parse_result_text
+
+
+def test_parse_result_text_inline_labels():
+    metrics = parse_result_text("P/L: 1,250.50 | Win rate: 65% | Max DD: -350.25 | Sharpe: 1.42")
+    assert metrics == {'profit_loss': 1250.50, 'win_rate': pytest.approx(0.65),
+                       'max_drawdown': -350.25, 'sharpe_ratio': 1.42}
+
+
+def test_parse_result_text_values_on_next_line():
+    text = "Net Profit\n$2,000\nWinning Rate\n40 %\nMaximum Drawdown\n(150.5)\nSharpe Ratio\n0.8"
+    metrics = parse_result_text(text)
+    assert metrics['profit_loss'] == 2000.0
+    assert metrics['win_rate'] == pytest.approx(0.40)
+    assert metrics['max_drawdown'] == -150.5
+    assert metrics['sharpe_ratio'] == 0.8
+
+
+def test_parse_result_text_missing_and_empty():
+    assert parse_result_text('') == dict.fromkeys(['profit_loss', 'win_rate', 'max_drawdown', 'sharpe_ratio'])
+    metrics = parse_result_text("Sharpe: 2")
+    assert metrics['sharpe_ratio'] == 2.0
+    assert metrics['profit_loss'] is None
+
+
+def test_parse_result_text_does_not_match_inside_words():
+    # "drawdown" dentro de otra palabra no es la etiqueta
+    assert parse_result_text("redrawdowns 5")['max_drawdown'] is None
+
+
+def test_parse_result_accepts_metric_dict_and_json_text():
+    assert parse_result({'sharpe_ratio': '1.5', 'win_rate': '50%'})['win_rate'] == pytest.approx(0.5)
+    assert parse_result('{"sharpe_ratio": 1.5}')['sharpe_ratio'] == 1.5
+    assert parse_result(None)['sharpe_ratio'] is None
+
+
+def test_result_record_from_record_reads_windows():
+    record = {
+        'url': 'https://x.com/bt/1', 'status': 'completed', 'sweep_key': 'fast=5',
+        'profit_loss': '100', 'sharpe_ratio': 1.2,
+        'custom_profit_loss': '-20.5', 'custom_win_rate': '', 'custom_sharpe_ratio': None,
+    }
+    result = ResultRecord.from_record(record, ['ytd', 'custom'])
+
+    assert result.url == 'https://x.com/bt/1'
+    assert result.sweep_key == 'fast=5'
+    assert result.metrics == BacktestMetrics(profit_loss=100.0, sharpe_ratio=1.2)
+    assert result.windows[1].as_tuple() == (-20.5, None, None, None)
+    assert result.as_dict(['ytd', 'custom'])['custom_results']['profit_loss'] == -20.5
+
+
+def test_result_record_from_error_record():
+    result = ResultRecord.from_record({'url': 'u', 'status': 'error', 'sweep_key': None}, ['ytd'])
+    assert result.sweep_key == ''
+    assert result.status == 'error'
+    assert result.metrics.is_empty()
+
+
+def test_result_columns_store_floats_and_labels():
+    columns = ResultColumns()
+    columns.add({'url': 'a', 'status': 'completed', 'profit_loss': 10.0, 'win_rate': '65%'})
+    columns.add({'url': 'b', 'status': 'error', 'sweep_key': 'fast=5'})
+
+    assert len(columns) == 2
+    assert columns.urls == ['a', 'b']
+    assert columns.sweep_keys == ['', 'fast=5']
+    assert columns.statuses == ['completed', 'error']
+    values = columns.values()
+    assert values.dtype.name == 'float64'
+    assert values[0, :2].tolist() == [10.0, pytest.approx(0.65)]
+    assert all(math.isnan(value) for value in values[1])
+    assert ResultColumns().values().shape == (0, 4)
+
+
+def test_win_rate_without_percent_sign_is_a_fraction():
+    assert parse_result_text("Win rate: 65")['win_rate'] == pytest.approx(0.65)
+    assert parse_result({'win_rate': 65})['win_rate'] == pytest.approx(0.65)
@@ -0,0 +1,127 @@
+"""Pruebas de Bot/result_writer.py"""
+
+import csv
+
+import numpy as np
+import openpyxl
+
+from Bot.result_writer import ResultWriter, sheet_rows
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_out_of_order_results_written_in_index_order(tmp_path):
+    output = str(tmp_path / 'out.csv')
+    with ResultWriter(output) as writer:
+        for index in (2, 0, 3, 1):
+            writer.write(index, {'url': f"u{index}", 'status': 'completed'})
+
+    assert [row['url'] for row in read_csv(output)] == ['u0', 'u1', 'u2', 'u3']
+    assert not (tmp_path / 'out.partial.csv').exists()
+
+
+def test_slow_url_does_not_hold_rows_past_max_pending(tmp_path):
+    output = str(tmp_path / 'out.csv')
+    writer = ResultWriter(output, max_pending=10).open()
+    # La URL 0 no llega hasta el final
+    for index in range(1, 101):
+        writer.write(index, {'url': f"u{index}"})
+        assert len(writer._pending) <= 10
+    assert writer.rows_written >= 90
+
+    writer.write(0, {'url': 'u0'})
+    writer.close()
+
+    urls = [row['url'] for row in read_csv(output)]
+    assert sorted(urls) == sorted(f"u{index}" for index in range(101))
+    assert urls[-1] == 'u0'
+
+
+def test_missing_indexes_flushed_on_close(tmp_path):
+    output = str(tmp_path / 'out.csv')
+    writer = ResultWriter(output).open()
+    writer.write(1, {'url': 'u1'})
+    writer.write(3, {'url': 'u3'})
+    writer.close()
+    assert [row['url'] for row in read_csv(output)] == ['u1', 'u3']
+
+
+def test_excel_keeps_every_url_row_and_types_numbers(tmp_path):
+    output = str(tmp_path / 'out.xlsx')
+    rows = 66000
+    with ResultWriter(output) as writer:
+        for index in range(rows):
+            writer.write(index, {'url': f"https://x.com/bt/{index}", 'status': 'completed',
+                                 'profit_loss': 1.5 * index, 'error': '=1+1'})
+
+    workbook = openpyxl.load_workbook(output, read_only=True)
+    sheet = workbook['Resultados']
+    assert sheet.max_row == rows + 1
+    header = next(sheet.iter_rows(max_row=1, values_only=True))
+    last = dict(zip(header, next(sheet.iter_rows(min_row=rows + 1, values_only=True))))
+    workbook.close()
+
+    assert last['url'] == f"https://x.com/bt/{rows - 1}"
+    assert last['profit_loss'] == 1.5 * (rows - 1)
+    # El texto que empieza por '=' no se convierte en fórmula
+    assert last['error'] == '=1+1'
+
+
+def test_excel_has_no_hyperlinks_or_formulas(tmp_path):
+    output = str(tmp_path / 'out.xlsx')
+    with ResultWriter(output) as writer:
+        writer.write(0, {'url': 'https://x.com/bt/0', 'error': '=HYPERLINK("x")'})
+
+    workbook = openpyxl.load_workbook(output)
+    sheet = workbook['Resultados']
+    assert not sheet._hyperlinks
+    assert sheet['A2'].data_type == 's'
+    assert sheet['L2'].value == '=HYPERLINK("x")'
+    assert sheet['L2'].data_type == 's'
+
+
+def test_extra_sheets_callable_runs_after_every_row(tmp_path):
+    output = str(tmp_path / 'out.csv')
+    written = []
+
+    def extra_sheets():
+        return [('Resumen final', ['count'], [[len(written)]])]
+
+    writer = ResultWriter(output, on_write=lambda record: written.append(record['url'])).open()
+    writer.write(1, {'url': 'u1'})
+    writer.write(0, {'url': 'u0'})
+    writer.write(3, {'url': 'u3'})
+    writer.close(extra_sheets=extra_sheets)
+
+    # on_write ve las filas en el orden en que se escriben
+    assert written == ['u0', 'u1', 'u3']
+    with open(tmp_path / 'out_resumen_final.csv', newline='', encoding='utf-8') as f:
+        assert list(csv.reader(f)) == [['count'], ['3']]
+
+
+def test_sheet_rows_from_column_arrays():
+    rows = list(sheet_rows([np.array([1, 2]), np.array([0.5, np.nan]), np.array(['a', 'b'], dtype=object)]))
+    assert rows == [(1, 0.5, 'a'), (2, None, 'b')]
+
+
+def test_excel_converts_only_metric_columns(tmp_path):
+    output = str(tmp_path / 'out.xlsx')
+    columns = ['url', 'result', 'profit_loss', 'custom_win_rate', 'attempts', 'error']
+    with ResultWriter(output, columns=columns) as writer:
+        writer.write(0, {'url': '007', 'result': '1e5', 'profit_loss': 12.5,
+                         'custom_win_rate': 0.65, 'attempts': 2, 'error': '0042'})
+
+    workbook = openpyxl.load_workbook(output, read_only=True)
+    row = dict(zip(*workbook['Resultados'].iter_rows(values_only=True)))
+    workbook.close()
+
+    # El texto libre se guarda tal cual, aunque parezca un número
+    assert row['url'] == '007'
+    assert row['result'] == '1e5'
+    assert row['error'] == '0042'
+    assert row['profit_loss'] == 12.5
+    assert row['custom_win_rate'] == 0.65
+    assert row['attempts'] == 2
@@ -0,0 +1,88 @@
+"""Pruebas de Bot/retry.py"""
+
+import asyncio
+import sqlite3
+import time
+
+from Bot.retry import CircuitBreaker, RetryPolicy, classify_error, host_of
+
+
+def test_host_and_error_classes():
+    assert host_of('https://App.X.com/bt/1') == 'app.x.com'
+    assert classify_error(TimeoutError('Timeout 30000ms exceeded')) == 'timeout'
+
+
+def test_retry_budget_and_backoff():
+    policy = RetryPolicy(budgets={'timeout': 1}, base_delay=1.0, max_delay=4.0)
+    assert policy.should_retry('timeout', {})
+    assert not policy.should_retry('timeout', {'timeout': 1})
+    assert not policy.should_retry('other', {})
+    assert all(0 <= policy.delay_for(attempt) <= 4.0 for attempt in range(10))
+
+
+def test_breaker_opens_then_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=0.5, window=4, min_requests=2, cooldown=0.05)
+    breaker.record_failure('x.com')
+    assert breaker.try_acquire('x.com') == 0.0
+    breaker.record_failure('x.com')
+    assert breaker.try_acquire('x.com') > 0
+
+    time.sleep(0.06)
+    assert breaker.try_acquire('x.com') == 0.0
+    # Solo una prueba a la vez; release() la libera si se canceló
+    assert breaker.try_acquire('x.com') > 0
+    breaker.release('x.com')
+    assert breaker.try_acquire('x.com') == 0.0
+    breaker.record_success('x.com')
+    assert breaker.try_acquire('x.com') == 0.0
+    assert breaker.get_stats()['breaker_trips'] == 1
+
+
+def test_opening_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'rate_limiter.sqlite')
+    first = CircuitBreaker(min_requests=1, cooldown=30, state_path=path)
+    second = CircuitBreaker(min_requests=1, cooldown=30, state_path=path)
+    try:
+        assert second.try_acquire('x.com') == 0.0
+        first.record_failure('x.com')
+        time.sleep(1.05)
+        assert second.try_acquire('x.com') > 25
+        assert second.get_stats()['breaker_shared_pauses'] == 1
+    finally:
+        first.close()
+        second.close()
+
+
+def test_async_breaker_does_not_block_the_loop_on_a_locked_database(tmp_path):
+    path = str(tmp_path / 'rate_limiter.sqlite')
+    breaker = CircuitBreaker(min_requests=1, cooldown=30, state_path=path)
+    breaker._connect()
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN EXCLUSIVE")
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        failure = asyncio.create_task(breaker.record_failure_async('x.com'))
+        await asyncio.sleep(0.3)
+        ticks_while_locked = ticks
+        blocker.execute("ROLLBACK")
+        await failure
+        task.cancel()
+        return ticks_while_locked
+
+    try:
+        assert asyncio.run(scenario()) > 10
+        other = CircuitBreaker(state_path=path)
+        assert asyncio.run(other.try_acquire_async('x.com')) > 25
+        other.close()
+    finally:
+        blocker.close()
+        breaker.close()
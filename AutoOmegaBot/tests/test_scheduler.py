@@ -0,0 +1,15 @@
+"""Pruebas de Bot/scheduler.py"""
+
+import pytest
+
+from Bot.scheduler import Scheduler
+
+
+@pytest.mark.parametrize('value', ['nan', 'NaN', 'inf', '-inf', 'alta', '', None])
+def test_non_finite_or_missing_priority_goes_last(value):
+    jobs = [(0, {'url': 'a', 'priority': value}),
+            (1, {'url': 'b', 'priority': '2'}),
+            (2, {'url': 'c', 'priority': '1'}),
+            (3, {'url': 'd'})]
+
+    assert Scheduler().order(jobs) == [(2, 'c'), (1, 'b'), (0, 'a'), (3, 'd')]
@@ -0,0 +1,62 @@
+"""Pruebas de Bot/session.py (contexto de Playwright falso)"""
+
+from Bot.session import SessionManager
+
+
+class FakeContext:
+    def __init__(self):
+        self.cookies = []
+        self.scripts = []
+
+    def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    def add_init_script(self, script):
+        self.scripts.append(script)
+
+    def new_page(self):
+        raise AssertionError('no debe iniciar sesión')
+
+
+STATE = {
+    'cookies': [{'name': 'sid', 'value': 'abc', 'domain': 'x.com', 'path': '/'}],
+    'origins': [{'origin': 'https://x.com', 'localStorage': [{'name': 'k', 'value': 'v'}]}],
+}
+
+
+def test_no_session_manager_without_login_url(tmp_path):
+    path = str(tmp_path / 'session_state.json')
+    assert SessionManager.from_config({'login_url': ''}, path) is None
+    assert SessionManager.from_config({'session_enabled': False, 'login_url': 'https://x.com/login'},
+                                      path) is None
+    assert SessionManager.from_config({'login_url': 'https://x.com/login'}, path) is not None
+
+
+def test_saved_state_not_applied_without_login_url(tmp_path):
+    # Un estado guardado (p. ej. por una versión anterior) no pasa a otros contextos
+    manager = SessionManager(str(tmp_path / 'session_state.json'))
+    manager.save_state(STATE)
+    context = FakeContext()
+    manager.ensure(context)
+
+    assert context.cookies == [] and context.scripts == []
+    assert manager.get_stats()['session_reuses'] == 0
+
+
+def test_saved_login_state_applied_to_new_contexts(tmp_path):
+    manager = SessionManager(str(tmp_path / 'session_state.json'), login_url='https://x.com/login')
+    manager.save_state(STATE)
+    context = FakeContext()
+    manager.ensure(context)
+
+    assert context.cookies == STATE['cookies']
+    assert 'https://x.com' in context.scripts[0]
+    assert manager.get_stats()['session_reuses'] == 1
+
+
+def test_save_state_leaves_no_temp_files(tmp_path):
+    manager = SessionManager(str(tmp_path / 'session_state.json'), login_url='https://x.com/login')
+    manager.save_state(STATE)
+    manager.save_state(STATE)
+    assert [path.name for path in tmp_path.iterdir()] == ['session_state.json']
+    assert manager.load_state() == STATE
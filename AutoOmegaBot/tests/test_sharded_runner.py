@@ -0,0 +1,94 @@
+"""Pruebas de Bot/sharded_runner.py"""
+
+import os
+
+from Bot.sharded_runner import ShardedRunner, sum_worker_stats
+from Bot.step_timing import AdaptiveTimeouts
+
+
+def fake_worker(worker_id, job_queue, bot_options, concurrency, result_queue):
+    """Trabajador sin navegador; los de bot_options['die'] mueren a mitad de fragmento"""
+    timeouts = AdaptiveTimeouts()
+    served = 0
+    while True:
+        item = job_queue.get()
+        if item is None:
+            break
+        chunk_id, chunk = item
+        result_queue.put(('taken', worker_id, chunk_id, None))
+        for position, (index, url, params) in enumerate(chunk):
+            if worker_id in bot_options['die'] and position == 1:
+                result_queue.close()
+                result_queue.join_thread()
+                os._exit(3)
+            timeouts.record('goto', 0.01 * (worker_id + 1))
+            served += 1
+            result_queue.put(('result', worker_id, index, {'url': url, 'worker': worker_id}))
+    stats = {'pages_served': served, 'launches': 1, 'step_samples': timeouts.export()}
+    result_queue.put(('done', worker_id, None, stats))
+
+
+class FakeRunner(ShardedRunner):
+    worker_main = staticmethod(fake_worker)
+
+
+class FakeBot:
+    cancelled = False
+
+    def __init__(self, die):
+        self.die = die
+
+    def get_worker_options(self):
+        return {'die': self.die}
+
+    def make_result(self, url, error=None, params=None):
+        return {'url': url, 'error': str(error)}
+
+
+def run(die, jobs, workers=2, concurrency=2):
+    results = {}
+
+    def on_result(index, result):
+        assert index not in results
+        results[index] = result
+
+    runner = FakeRunner(FakeBot(die), workers=workers, concurrency=concurrency)
+    stats = runner.run(jobs, on_result)
+    return runner, results, stats
+
+
+def test_chunks_of_a_dead_worker_go_to_a_replacement():
+    jobs = [(index, f"u{index}", {}) for index in range(8)]
+    runner, results, stats = run({0}, jobs)
+
+    assert sorted(results) == list(range(8))
+    assert all('error' not in result for result in results.values())
+    assert 'código 3' in runner.worker_errors[0]
+    # Tiempos por paso combinados de los trabajadores que terminaron
+    assert stats['step_latency']['goto']['count'] == stats['pages_served']
+    assert stats['pages_served'] == 8 - sum(1 for r in results.values() if r['worker'] == 0)
+
+
+def test_chunk_fails_when_its_replacement_also_dies():
+    jobs = [(index, f"u{index}", {}) for index in range(3)]
+    runner, results, _ = run({0, 1}, jobs, workers=1, concurrency=3)
+
+    # El proceso 0 entrega u0 y muere; su reemplazo entrega u1 y muere
+    assert results[0]['worker'] == 0
+    assert results[1]['worker'] == 1
+    assert 'código 3' in results[2]['error']
+
+
+def test_step_latency_merged_from_worker_samples():
+    fast, slow = AdaptiveTimeouts(), AdaptiveTimeouts()
+    for _ in range(10):
+        fast.record('goto', 0.1)
+        slow.record('goto', 0.3)
+    slow.record_failure('run')
+
+    stats = sum_worker_stats([{'pages_served': 10, 'step_samples': fast.export()},
+                              {'pages_served': 10, 'step_samples': slow.export()}])
+
+    assert stats['step_latency']['goto']['count'] == 20
+    assert stats['step_latency']['goto']['p50_ms'] == 200.0
+    assert stats['step_latency']['run']['failures'] == 1